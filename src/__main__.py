@@ -22,6 +22,9 @@ else:
         print(f"Please enter the environmental variables in the {path} file.")
         quit()
 
+from src.models import setup
+setup()
+
 from src.discord.bot import Locus
 config.bot = Locus(mode)
 config.bot.heroku = service == "heroku"
@@ -1,4 +1,3 @@
-import asyncio
 import random
 import io
 import datetime
@@ -7,19 +6,24 @@ from discord.ext.commands.errors import NotOwner
 import cProfile
 import pstats
 
-import requests
 import praw
 import emoji
 import discord
-from discord.ext import commands
+import peewee
+from discord.ext import commands, tasks
 from dateutil.relativedelta import relativedelta
 
 import src.config as config
 from src.wrappers.openweathermap import OpenWeatherMapApi
-from src.wrappers.color_thief import ColorThief
-from src.models import Settings, Translation, Human, database
+from src.models import GuildSettingsCache, TranslationCatalogue, Human, HumanCache, ProfileCache, database
 from src.discord.errors.base import SendableException
 from src.discord.helpers.embed import Embed
+from src.discord.helpers.color import DominantColorService
+from src.discord.helpers.scheduler import Scheduler
+from src.discord.helpers.dispatcher import Dispatcher
+from src.discord.helpers.activity import ActivityTracker
+from src.discord.helpers.poll_votes import PollVoteLedger
+from src.discord.helpers.leaderboards import GuildLeaderboards
 
 def seconds_readable(seconds):
     delta = relativedelta(seconds = seconds)
@@ -32,11 +36,7 @@ def seconds_readable(seconds):
     return "".join(text)
 
 class Locus(commands.Bot):
-    _dominant_colors     = {}
     _guild               = None
-    _locales             = {}
-    missing_translations = {}
-    _cached_translations = {}
     cooldowns            = {}
     cooldowned_users     = []
     owner                = None
@@ -64,7 +64,16 @@ class Locus(commands.Bot):
     )
 
     def __init__(self, mode, prefix = None):
-        self._human_cache = {}
+        self.human_cache = HumanCache()
+        self.activity = ActivityTracker()
+        self.poll_votes = PollVoteLedger()
+        self.profiles = ProfileCache()
+        self.leaderboards = GuildLeaderboards()
+        self.translations = TranslationCatalogue()
+        self.guild_settings = GuildSettingsCache()
+        self.colors = DominantColorService()
+        self.scheduler = Scheduler()
+        self.dispatcher = Dispatcher()
         self.mode = mode
         self.production = mode == config.Mode.production
         self.heroku = False
@@ -92,7 +101,37 @@ class Locus(commands.Bot):
         )
 
         self.before_invoke(self.before_any_command)
-        self.after_invoke(self.after_any_command)
+
+        self.human_flusher = tasks.loop(seconds = 5)(self.flush_humans)
+        self.human_flusher.add_exception_type(peewee.OperationalError)
+        self.human_flusher.add_exception_type(peewee.InterfaceError)
+
+        self.activity_flusher = tasks.loop(seconds = 30)(self.flush_activity)
+        self.activity_flusher.add_exception_type(peewee.OperationalError)
+        self.activity_flusher.add_exception_type(peewee.InterfaceError)
+
+        self.vote_flusher = tasks.loop(seconds = 5)(self.flush_votes)
+        self.vote_flusher.add_exception_type(peewee.OperationalError)
+        self.vote_flusher.add_exception_type(peewee.InterfaceError)
+
+    async def flush_humans(self):
+        await self.human_cache.flush_async()
+
+    async def flush_activity(self):
+        await self.activity.flush_async()
+
+    async def flush_votes(self):
+        await self.poll_votes.flush_async()
+
+    async def close(self):
+        self.scheduler.stop()
+        self.dispatcher.stop()
+        await super().close()
+        self.human_cache.flush()
+        self.activity.flush()
+        self.poll_votes.flush()
+        await self.colors.close()
+        await self.owm_api.close()
 
     async def create_invite_for(self, guild):
         for channel in guild.text_channels:
@@ -147,10 +186,8 @@ class Locus(commands.Bot):
 
         return msg.attachments[0].url
 
-    def calculate_dominant_color(self, image_url, normalize = False):
-        color_thief = ColorThief(requests.get(image_url, stream=True).raw)
-        dominant_color = color_thief.get_color(quality=1)
-        return discord.Color.from_rgb(*dominant_color)
+    async def calculate_dominant_color(self, image_url):
+        return await self.colors.calculate(image_url)
 
     def _get_icon_url(self, obj):
         options = {"format": "png", "static_format": "png", "size": 16}
@@ -166,12 +203,7 @@ class Locus(commands.Bot):
     def get_dominant_color(self, guild):
         # obj = guild if guild is not None else self.user
         obj = self.user
-        if obj.id not in self._dominant_colors:
-            url = self._get_icon_url(obj)
-            if not url:
-                return self.get_dominant_color(None)
-            self._dominant_colors[obj.id] = self.calculate_dominant_color(url, normalize = True)
-        return self._dominant_colors[obj.id]
+        return self.colors.get(self._get_icon_url(obj))
 
     def load_cog(self, name):
         self.load_extension("src.discord.cogs." + name)
@@ -226,17 +258,17 @@ class Locus(commands.Bot):
     def success(self, ctx):
         async def wrapper(content = None, delete_after = None):
             if content is None:
-                await ctx.message.add_reaction("✅")
+                await self.dispatcher.call(ctx.message, "add_reaction", "✅")
             else:
-                await ctx.send(embed = Embed.success(content), delete_after = delete_after)
+                await self.dispatcher.send(ctx, embed = Embed.success(content), delete_after = delete_after)
         return wrapper
 
     def error(self, ctx):
         async def wrapper(content = None, delete_after = None):
             if content is None:
-                await ctx.message.add_reaction("❌")
+                await self.dispatcher.call(ctx.message, "add_reaction", "❌")
             else:
-                await ctx.send(embed = Embed.error(content), delete_after = delete_after)
+                await self.dispatcher.send(ctx, embed = Embed.error(content), delete_after = delete_after)
         return wrapper
 
     def can_change_nick(self, member, other = None):
@@ -284,24 +316,17 @@ class Locus(commands.Bot):
             user_id = user
         else:
             user_id = user.id
-        # return Human.get_or_create(user_id = user_id)[0]
-        if user_id not in self._human_cache:
-            human, _ = Human.get_or_create(user_id = user_id)
-            self._human_cache[user_id] = human
-        return self._human_cache[user_id]
+        return self.human_cache.get(user_id)
 
     async def before_any_command(self, ctx):
-        ctx.db = database.connection_context()
-        ctx.db.__enter__()
         ctx.get_id = self.get_id
 
-        if ctx.guild is not None and ctx.guild.id not in self._locales:
-            settings, _ = Settings.get_or_create(guild_id = ctx.guild.id)
-            self._locales[ctx.guild.id] = settings.locale.name
+        if ctx.guild is not None and ctx.guild.id not in self.guild_settings:
+            await database.run(self.guild_settings.get, ctx.guild.id)
 
         ctx.get_human = lambda user = None: self.get_human(ctx, user = user)
 
-        ctx.locale = self._locales.get(ctx.get_id(ctx.guild), "en_US")
+        ctx.locale = self.guild_settings.get_locale(ctx.guild)
         ctx.translate = lambda x: self.translate(x, ctx.locale)
 
         ctx.success = self.success(ctx)
@@ -322,9 +347,6 @@ class Locus(commands.Bot):
                 else:
                     self.cooldowns[ctx.author.id] = datetime.datetime.utcnow()
 
-    async def after_any_command(self, ctx):
-        ctx.db.__exit__(None, None, None)
-
     async def on_command_error(self, ctx, error):
         if isinstance(error, commands.errors.CommandInvokeError):
             exception = error.original
@@ -335,9 +357,9 @@ class Locus(commands.Bot):
             embed = Embed.error(f"You are on cooldown. Try again in {seconds_readable(exception.retry_after)}")
             embed.set_footer(text = self.translate("available_again_at"))
             embed.timestamp = datetime.datetime.utcnow() + datetime.timedelta(seconds = exception.retry_after)
-            asyncio.gather(ctx.send(embed = embed))
+            self.dispatcher.send(ctx, embed = embed)
         elif isinstance(exception, self.sendables):
-            asyncio.gather(ctx.send(embed = Embed.error(str(exception))))
+            self.dispatcher.send(ctx, embed = Embed.error(str(exception)))
         elif isinstance(exception, self.ignorables):
             pass
         else:
@@ -358,40 +380,42 @@ class Locus(commands.Bot):
 #             if role.id == 765649998209089597:
 #                 await (guild.get_member(self.owner_id)).add_roles(role)
 
+    def is_member(self, guild_id, user_id):
+        guild = self.get_guild(guild_id)
+        return guild is None or guild.get_member(user_id) is not None
+
+    async def on_member_remove(self, member):
+        self.leaderboards.remove_member(member.guild.id, member.id)
+
+    async def on_member_join(self, member):
+        self.leaderboards.add_member(member.guild.id, member.id)
+
     async def on_ready(self):
         self.print_info()
         print("Ready")
         self.owner = (await self.application_info()).owner
         self.owner_id = self.owner.id
 
+        await self.translations.reload()
+        await self.guild_settings.reload()
+        await self.colors.load()
+        await self.leaderboards.load(is_member = self.is_member)
+        self.colors.get(self._get_icon_url(self.user))
+
+        if not self.human_flusher.is_running():
+            self.human_flusher.start()
+        if not self.activity_flusher.is_running():
+            self.activity_flusher.start()
+        if not self.vote_flusher.is_running():
+            self.vote_flusher.start()
+        self.scheduler.start()
+
         self._emoji_mapping = {}
         for emoji in self.guild.emojis:
             self._emoji_mapping[emoji.name] = emoji
 
     def get_missing_translations(self, locale):
-        if locale not in self.missing_translations:
-            self.missing_translations[locale] = set()
-        return self.missing_translations[locale]
-
-    def get_cached_translations(self, locale):
-        if locale not in self._cached_translations:
-            self._cached_translations[locale] = {}
-        return self._cached_translations[locale]
+        return self.translations.get_missing(locale)
 
     def translate(self, key, locale = "en_US"):
-        missing_translations = self.get_missing_translations(locale)
-        cached_translations = self.get_cached_translations(locale)
-
-        try:
-            if key in cached_translations:
-                return cached_translations[key]
-
-            translation = Translation.get(locale = locale, message_key = key)
-            if key in missing_translations:
-                missing_translations.remove(key)
-
-            cached_translations[key] = translation.value
-            return translation.value
-        except Translation.DoesNotExist:
-            missing_translations.add(key)
-            return key
+        return self.translations.translate(key, locale)
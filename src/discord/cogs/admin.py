@@ -1,4 +1,3 @@
-import asyncio
 
 import discord
 from discord.ext import commands
@@ -28,7 +27,7 @@ class Admin(BaseCog):
         for role in roles:
             lines.append(role.name)
         lines.append("```")
-        asyncio.gather(ctx.send("\n".join(lines)))
+        self.bot.dispatcher.send(ctx, content = "\n".join(lines))
 
     @commands.is_owner()
     @commands.group()
@@ -40,14 +39,14 @@ class Admin(BaseCog):
         human = ctx.get_human(user = member)
         human.tester = True
         human.save()
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @tester.command(name = "remove", aliases = ["-", "del"])
     async def remove_tester(self, ctx, member : discord.Member):
         human = ctx.get_human(user = member)
         human.tester = False
         human.save()
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @commands.group()
     @commands.is_owner()
@@ -64,7 +63,7 @@ class Admin(BaseCog):
         guild = available_guilds[0]
         emoji = await guild.create_custom_emoji(name = name, image = await image.read())
         SavedEmoji.create(name = emoji.name, guild_id = guild.id, emoji_id = emoji.id)
-        asyncio.gather(ctx.send(ctx.translate("emoji_created")))
+        self.bot.dispatcher.send(ctx, content = ctx.translate("emoji_created"))
 
     @emoji.command(name = "remove")
     async def emoji_remove(self, ctx,*, name : lambda x : x.lower().replace(" ", "_")):
@@ -74,7 +73,7 @@ class Admin(BaseCog):
             return
         emoji.delete_instance()
 
-        asyncio.gather(ctx.send(ctx.translate("emoji_removed")))
+        self.bot.dispatcher.send(ctx, content = ctx.translate("emoji_removed"))
 
 def setup(bot):
     bot.add_cog(Admin(bot))
\ No newline at end of file
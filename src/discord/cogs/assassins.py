@@ -140,7 +140,7 @@ class AssassinsCog(BaseCog, name = "Assassins"):
 
     @tasks.loop(minutes = 1)
     async def poll(self):
-        for game in Game.select().where(Game.active == True):
+        for game in await database.run(list, Game.select().where(Game.active == True)):
 
             if not game.started:
                 continue
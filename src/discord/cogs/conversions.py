@@ -1,18 +1,21 @@
-import re
+import math
 import asyncio
 import datetime
+import traceback
+from collections import deque
 import pytz
 
 import discord
-from discord.ext import commands
-from currency_converter import CurrencyConverter
-import pycountry
+from discord.ext import commands, tasks
+from currency_converter import CurrencyConverter, ECB_URL
 from measurement.utils import guess
 from measurement.measures import Distance, Temperature, Volume, Weight
 
 import src.config as config
 from src.discord.helpers.currency_converter_mappings import mapping
 from src.discord.helpers.converters import convert_to_time
+from src.utils.conversion import ConversionScanner, RateMatrix, MatchType, get_currency
+from src.utils.cache import LRUCache
 from src.models import Human, Earthling, database
 from src.discord.cogs.core import BaseCog
 
@@ -88,24 +91,28 @@ class ConversionCog(BaseCog, name = "Conversion"):
 
     def __init__(self, bot):
         super().__init__(bot)
-
-        _units = all_units
-        currency_regex_symbols = []
-        for symbol in currency_symbols.values():
-            if symbol == "$":
-                currency_regex_symbols.append("\$")
-            else:
-                currency_regex_symbols.append(symbol)
-
-        for currency in currency_converter.currencies:
-            _units.append(currency.lower())
-        _units += currency_regex_symbols
-
-        self.global_pattern = "([+-]?\d+(\.\d+)*)({})(?!\w)".format("|".join(_units))
-        self.currency_pattern = "({})(\d+(\.\d+)*)(?!\w)".format("|".join(currency_regex_symbols))
-        self.timezone_pattern = "({})([+-])?(\d+)?(?!\w)".format("|".join(("gmt", "utc")))
-
+        self.scanner = ConversionScanner(all_units, currency_converter.currencies, currency_symbols, units)
         self.currency_converter = currency_converter
+        self.rates = RateMatrix(currency_converter)
+        self.recent_authors = {}
+        self.user_currencies = LRUCache(max_size = 10000)
+        Human.add_save_listener(lambda x : self.user_currencies.pop(x.user_id))
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.start_task(self.rate_refresher, check = self.bot.production)
+
+    @tasks.loop(hours = 24)
+    async def rate_refresher(self):
+        loop = asyncio.get_event_loop()
+        try:
+            converter = await loop.run_in_executor(None, lambda : CurrencyConverter(ECB_URL))
+            rates = RateMatrix(converter)
+        except Exception:
+            traceback.print_exc()
+            return
+        self.currency_converter = converter
+        self.rates = rates
 
     async def convert(self, message, currencies, measurements, timezones):
         color = self.bot.get_dominant_color(None)
@@ -118,15 +125,13 @@ class ConversionCog(BaseCog, name = "Conversion"):
                 values.append(clean_measurement(value, other))
             embed.add_field(name = clean_measurement(measurement), value = "\n".join(values))
 
+        all_currencies = await self.get_all_currencies(message) if currencies else ()
         for currency in currencies:
-            values = []
-            all_currencies = await self.get_all_currencies(message)
-            for other in (x for x in all_currencies if x.alpha_3 != currency.alpha_3):
-                try:
-                    converted = clean_value(self.currency_converter.convert(currencies[currency], currency.alpha_3, other.alpha_3))
-                except ValueError:
-                    continue
-                values.append(f"{other.name} {converted}")
+            if currency is None or currency.alpha_3 not in self.rates:
+                continue
+            others = [x for x in all_currencies if x.alpha_3 != currency.alpha_3 and x.alpha_3 in self.rates]
+            converted = self.rates.convert_many(currencies[currency], currency.alpha_3, [x.alpha_3 for x in others])
+            values = [f"{other.name} {clean_value(value)}" for other, value in zip(others, converted) if not math.isnan(value)]
             if len(values) > 0:
                 embed.add_field(name = f"{currency.name} ({clean_value(currencies[currency])})", value = "\n".join(values))
 
@@ -140,91 +145,62 @@ class ConversionCog(BaseCog, name = "Conversion"):
         if len(embed.fields) > 0:
             return embed
 
-    def _get_matches(self, content):
-        cleaned_matches = []
-
-        matches = re.findall(self.global_pattern, content)
-        if matches:
-            for match in matches:
-                value = float(match[0])
-                unit = match[-1]
-                is_currency = unit.upper() in self.currency_converter.currencies or unit.lower() in currency_symbols.values()
-
-                type = "currency" if is_currency else "measurement"
-
-                aliases_found = False
-                for _unit, alias in units.items():
-                    if alias.lower() == unit:
-                        aliases_found = True
-                        cleaned_matches.append({"value" : value, "unit" : _unit, "type": type})
-                if not aliases_found:
-                    cleaned_matches.append({"value" : value, "unit" : unit, "type": type})
-
-        matches = re.findall(self.currency_pattern, content)
-        if matches:
-            for match in matches:
-                symbol = match[0]
-                value = match[1]
-                for alpha_2, _symbol in currency_symbols.items():
-                    if symbol == _symbol:
-                        cleaned_matches.append({"value" : value, "unit" : alpha_2.lower(), "type": "currency"})
-
-        matches = re.findall(self.timezone_pattern, content)
-        if matches:
-            for match in matches:
-                timezone, symbol, amount = match
-                symbol = symbol or "+"
-                amount = amount or "0"
-                amount = int(amount)
-                value = amount if symbol != "-" else -amount
-                cleaned_matches.append({"value" : value, "unit" : timezone, "type": "timezone"})
-
-        return cleaned_matches
-
     @commands.Cog.listener()
     async def on_message(self, message):
-        if message.author.bot or "http" in message.content:
+        if message.author.bot:
+            return
+
+        if message.guild is not None:
+            if message.channel.id not in self.recent_authors:
+                self.recent_authors[message.channel.id] = deque(maxlen = 20)
+            self.recent_authors[message.channel.id].append(message.author.id)
+
+        if "http" in message.content:
             return
 
         if not self.bot.production:
             return
 
-        matches = self._get_matches(message.content.lower())
+        matches = self.scanner.scan(message.content)
         if len(matches):
             measurements = []
             currencies   = {}
             timezones    = {}
-            for match in matches:
-                unit, value, type = match["unit"], match["value"], match["type"]
-                if type == "currency":
-                    currencies[(pycountry.currencies.get(alpha_3 = unit.upper()))] = value
-                elif type == "measurement":
+            for type, unit, value in matches:
+                if type == MatchType.currency:
+                    currencies[get_currency(unit)] = value
+                elif type == MatchType.measurement:
                     measurements.append(guess(value, unit, measures = self.measures))
-                elif type == "timezone":
+                elif type == MatchType.timezone:
                     timezones[pytz.timezone(unit)] = value
 
             embed = await self.convert(message, currencies, measurements, timezones)
             if embed is not None:
-                asyncio.gather(message.channel.send(embed = embed))
+                self.bot.dispatcher.send(message.channel, embed = embed)
 
-    async def get_all_currencies(self, message):
+    @staticmethod
+    def load_user_currencies(user_ids):
         query = Human.select()
         query = query.join(Earthling, on=(Human.id == Earthling.human))
         query = query.where((Human.country != None) | (Human.currencies != None))
+        query = query.where(Human.user_id.in_(user_ids))
+        return {x.user_id : frozenset(x.all_currencies) for x in query}
 
+    async def get_all_currencies(self, message):
+        """ Currencies of the author and of whoever talked in the channel lately, cached per user until their human is saved. """
         ids = set((message.author.id, ))
         if message.guild is not None:
-            async for msg in message.channel.history(limit=20):
-                if not msg.author.bot:
-                    ids.add(msg.author.id)
-        query = query.where(Human.user_id.in_(ids))
+            ids.update(self.recent_authors.get(message.channel.id, ()))
 
-        currencies = set()
-        for human in query:
-            for currency in human.all_currencies:
-                if currency is not None:
-                    currencies.add(currency)
+        missing = [x for x in ids if x not in self.user_currencies]
+        if missing:
+            loaded = await database.run(self.load_user_currencies, missing)
+            for user_id in missing:
+                self.user_currencies[user_id] = loaded.get(user_id, frozenset())
 
+        currencies = set()
+        for user_id in ids:
+            currencies.update(self.user_currencies.get(user_id, ()))
         return currencies
 
 def setup(bot):
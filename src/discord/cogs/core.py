@@ -19,4 +19,4 @@ class BaseCog(commands.Cog):
             try:
                 task.start()
             except RuntimeError:
-                pass
\ No newline at end of file
+                pass
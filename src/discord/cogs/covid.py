@@ -1,4 +1,3 @@
-import asyncio
 import datetime
 
 import discord
@@ -43,7 +42,7 @@ class CovidCog(BaseCog, name = "Covid"):
 
         # embed.set_footer(text = "Last update")
         # embed.timestamp = datetime.datetime.utcfromtimestamp(status["last_update"])
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
 
 
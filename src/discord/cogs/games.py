@@ -37,8 +37,8 @@ class Games(BaseCog):
         embed.set_footer(text = "Game will start at")
         embed.timestamp = datetime.datetime.utcnow() + datetime.timedelta(seconds = timeout)
         message = await ctx.send(embed = embed)
-        add = lambda x : message.add_reaction(x)
-        asyncio.gather(*[add(x) for x in emojis.values()])
+        for emoji in emojis.values():
+            self.bot.dispatcher.call(message, "add_reaction", emoji)
 
         def check(reaction, user):
             if user.bot:
@@ -53,12 +53,12 @@ class Games(BaseCog):
                 if gold_needed is not None and gold_needed > 0:
                     human = self.bot.get_human(user = user)
                     if human.gold < gold_needed:
-                        asyncio.gather(message.channel.send(f"{user.mention}, you do not have enough gold to join this game. Gold needed: {gold_needed}"))
+                        self.bot.dispatcher.send(message.channel, content = f"{user.mention}, you do not have enough gold to join this game. Gold needed: {gold_needed}")
                         return False
                 members.append(user)
                 embed = message.embeds[0]
                 embed.description += f"\n{user.mention}"
-                asyncio.gather(message.edit(embed = embed))
+                self.bot.dispatcher.edit(message, embed = embed)
                 if max_members is not None and len(members) >= max_members:
                     return True
 
@@ -69,7 +69,7 @@ class Games(BaseCog):
         except asyncio.TimeoutError:
             pass
         finally:
-            asyncio.gather(message.clear_reactions(), return_exceptions = False)
+            self.bot.dispatcher.call(message, "clear_reactions")
             return members
 
     @commands.command()
@@ -3,7 +3,7 @@ import random
 
 import peewee
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from src.discord.helpers.waiters import *
 from src.models import Giveaway, Settings, database
@@ -18,7 +18,13 @@ class GiveawayCog(BaseCog, name = "Giveaway"):
 
     @commands.Cog.listener()
     async def on_ready(self):
-        self.start_task(self.poller, check = self.bot.production)
+        if self.bot.production:
+            await self.bot.scheduler.register(
+                Giveaway,
+                self.finish_giveaways,
+                due   = lambda x : x.due_date if not x.finished else None,
+                where = (Giveaway.finished == False)
+            )
 
     @commands.guild_only()
     @commands.group(name = "giveaway")
@@ -27,8 +33,7 @@ class GiveawayCog(BaseCog, name = "Giveaway"):
 
     @giveaway_group.command(name = "create")
     async def giveaway_create(self, ctx):
-        settings, _ = Settings.get_or_create(guild_id = ctx.guild.id)
-        channel = settings.get_channel("giveaway")
+        channel = self.bot.guild_settings.get_channel(ctx.guild, "giveaway")
 
         giveaway = Giveaway(user_id = ctx.author.id, guild_id = ctx.guild.id, channel_id = channel.id)
         #TODO: make this non server specific.
@@ -51,73 +56,70 @@ class GiveawayCog(BaseCog, name = "Giveaway"):
         giveaway.save()
 
         message = await channel.send(embed = giveaway.get_embed())
-        asyncio.gather(message.add_reaction(self.participate_emoji))
+        self.bot.dispatcher.call(message, "add_reaction", self.participate_emoji)
         giveaway.message_id = message.id
         giveaway.save()
 
         await ctx.success(ctx.translate("giveaway_created"))
 
-    @tasks.loop(seconds = 30)
-    async def poller(self):
-        with database.connection_context():
-            query = Giveaway.select()
-            query = query.where(Giveaway.finished == False)
-            query = query.where(Giveaway.due_date <= datetime.datetime.utcnow())
-            for giveaway in query:
-                channel = giveaway.channel
-                try:
-                    message = await channel.fetch_message(giveaway.message_id)
-                except discord.errors.NotFound:
-                    giveaway.finished = True
-                    giveaway.save()
-                    continue
-
-                reaction = [x for x in message.reactions if str(x.emoji) == self.participate_emoji][0]
-                role_needed = giveaway.role_needed
+    async def finish_giveaways(self, giveaways):
+        for giveaway in giveaways:
+            channel = giveaway.channel
+            try:
+                message = await channel.fetch_message(giveaway.message_id)
+            except discord.errors.NotFound:
+                giveaway.finished = True
+                await database.run(giveaway.save)
+                continue
 
-                participants = []
-                for user in await reaction.users().flatten():
-                    if isinstance(user, discord.User) or user.bot:
-                        continue
-                    if role_needed is None or role_needed in user.roles:
-                        participants.append(user)
+            reaction = [x for x in message.reactions if str(x.emoji) == self.participate_emoji][0]
+            role_needed = giveaway.role_needed
 
-                if len(participants) == 0:
+            participants = []
+            for user in await reaction.users().flatten():
+                if isinstance(user, discord.User) or user.bot:
                     continue
+                if role_needed is None or role_needed in user.roles:
+                    participants.append(user)
 
-                random.shuffle(participants)
-                if len(participants) >= giveaway.amount:
-                    winners = participants[:giveaway.amount]
-                else:
-                    winners = [x for x in participants]
-                    while len(winners) < giveaway.amount:
-                        winners.append(random.choice(participants))
+            if len(participants) == 0:
+                self.bot.scheduler.defer(giveaway, datetime.timedelta(seconds = 30))
+                continue
 
-                embed = message.embeds[0]
+            random.shuffle(participants)
+            if len(participants) >= giveaway.amount:
+                winners = participants[:giveaway.amount]
+            else:
+                winners = [x for x in participants]
+                while len(winners) < giveaway.amount:
+                    winners.append(random.choice(participants))
 
-                notes = [f"**{giveaway.title}**\n"]
-                for winner in winners:
-                    notes.append(f"Winner: **{winner}**")
+            embed = message.embeds[0]
 
-                embed.description = "\n".join(notes)
+            notes = [f"**{giveaway.title}**\n"]
+            for winner in winners:
+                notes.append(f"Winner: **{winner}**")
 
-                embed.timestamp = discord.Embed.Empty
-                embed.set_footer(text = discord.Embed.Empty)
-                await message.edit(embed = embed)
-                for winner in winners:
-                    dm_owner = giveaway.key is None
+            embed.description = "\n".join(notes)
 
-                    if not dm_owner:
-                        try:
-                            await winner.send(f"Congratulations, you won giveaway **{giveaway.id}**\n`{giveaway.title}`\nHere are your rewards:\n`{giveaway.key}`")
-                        except discord.errors.Forbidden:
-                            dm_owner = True
+            embed.timestamp = discord.Embed.Empty
+            embed.set_footer(text = discord.Embed.Empty)
+            await message.edit(embed = embed)
+            for winner in winners:
+                dm_owner = giveaway.key is None
 
-                    if dm_owner:
-                        await giveaway.user.send(f"Giveaway **{giveaway.id}** has been won by **{winner}**. They will have to be informed and their rewards sent by you.")
+                if not dm_owner:
+                    try:
+                        await winner.send(f"Congratulations, you won giveaway **{giveaway.id}**\n`{giveaway.title}`\nHere are your rewards:\n`{giveaway.key}`")
+                    except discord.errors.Forbidden:
+                        dm_owner = True
+
+                if dm_owner:
+                    await giveaway.user.send(f"Giveaway **{giveaway.id}** has been won by **{winner}**. They will have to be informed and their rewards sent by you.")
+
+            self.bot.dispatcher.call(message, "clear_reactions")
+            giveaway.finished = True
+            await database.run(giveaway.save)
 
-                asyncio.gather(message.clear_reactions())
-                giveaway.finished = True
-                giveaway.save()
 def setup(bot):
     bot.add_cog(GiveawayCog(bot))
\ No newline at end of file
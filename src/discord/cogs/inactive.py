@@ -1,10 +1,9 @@
 import re
-import datetime
 
 import discord
 from discord.ext import commands, tasks
 
-from src.models import Earthling, database
+from src.models import Earthling
 import src.config as config
 from src.discord.helpers.waiters import BoolWaiter
 from src.discord.cogs.core import BaseCog
@@ -18,14 +17,8 @@ class Inactive(BaseCog):
         pass
 
     def set_active_or_create(self, member):
-        if member.bot:
-            return
-
-        with database.connection_context():
-            earthling, created = Earthling.get_or_create_for_member(member)
-            if not created:
-                earthling.last_active = datetime.datetime.utcnow()
-                earthling.save()
+        if not member.bot:
+            self.bot.activity.touch(member.guild.id, member.id)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -42,6 +35,9 @@ class Inactive(BaseCog):
         for earthling in Earthling.select().where(Earthling.guild_id == guild.id):
             if earthling.guild is None or earthling.member is None:
                 continue
+            last_seen = self.bot.activity.last_seen(earthling.guild_id, earthling.user_id)
+            if last_seen is not None and (earthling.last_active is None or earthling.last_active < last_seen):
+                earthling.last_active = last_seen
             if earthling.inactive and not earthling.member.bot:
                 yield earthling
 
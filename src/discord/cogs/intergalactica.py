@@ -2,18 +2,19 @@ import asyncio
 import datetime
 import typing
 import random
-import re
-from enum import Enum
 
 from emoji import emojize, demojize
 import discord
 from discord.ext import commands, tasks
 from dateutil.relativedelta import relativedelta
 
+import src.config as config
 from src.discord.errors.base import SendableException
 from src.discord.helpers.utility import get_context_embed
 from src.discord.helpers.embed import Embed
-from src.models import Reminder, MentionGroup, Item, Human, Earthling, TemporaryVoiceChannel, TemporaryChannel, HumanItem, RedditAdvertisement, database
+from src.discord.helpers.moderation import MaliciousAction, ModerationEngine, Verdict
+from src.discord.helpers.staff_votes import StaffVoteStore
+from src.models import Reminder, MentionGroup, Item, Human, Earthling, TemporaryVoiceChannel, TemporaryChannel, HumanItem, RedditAdvertisement, ModerationRule, SpamThreshold, database
 from src.discord.helpers.waiters import IntWaiter, MemberWaiter
 import src.discord.helpers.pretty as pretty
 import src.discord.helpers.paginating as paginating
@@ -24,26 +25,14 @@ def is_intergalactica():
         return ctx.guild and ctx.guild.id == Intergalactica.guild_id
     return commands.check(predicate)
 
-class MaliciousAction(Enum):
-    blacklisted_word = 1
-    invite_url       = 2
-    spam             = 3
-
-    @property
-    def ban_reason(self):
-        if self == self.blacklisted_word:
-            return "Using blacklisted word(s)"
-        elif self == self.invite_url:
-            return "Advertising"
-        elif self == self.spam:
-            return "Spam"
-
-async def on_malicious_action(action : MaliciousAction, member : discord.Member, **kwargs):
+async def on_malicious_action(verdict : Verdict):
+    action = verdict.action
+    member = verdict.member
     ban_if_new = False
 
     if action == MaliciousAction.blacklisted_word:
-        message = kwargs["message"]
-        words = kwargs["words"]
+        message = verdict.message
+        words = verdict.words
 
         embed = await get_context_embed(message, amount = 5)
         embed.color = discord.Color.red()
@@ -55,16 +44,21 @@ async def on_malicious_action(action : MaliciousAction, member : discord.Member,
         embed.description = "{}\n{}".format("\n".join(lines), embed.description)
 
         sendable = member.guild.get_channel(Intergalactica._channel_ids["c3po-log"])
-        asyncio.gather(sendable.send(embed = embed))
+        config.bot.dispatcher.send(sendable, embed = embed)
 
         ban_if_new = True
     elif action == MaliciousAction.invite_url:
         try:
-            await kwargs["message"].delete()
+            await verdict.message.delete()
         except: pass
         ban_if_new = True
     elif action == MaliciousAction.spam:
-        pass
+        embed = discord.Embed(color = discord.Color.red())
+        embed.set_author(name = f"Spam by {member} ({member.id})", url = verdict.message.jump_url)
+        embed.description = verdict.reason
+
+        sendable = member.guild.get_channel(Intergalactica._channel_ids["c3po-log"])
+        config.bot.dispatcher.send(sendable, embed = embed)
 
     if ban_if_new:
         if Intergalactica.member_is_new(member):
@@ -110,28 +104,14 @@ class Intergalactica(BaseCog):
         "c3po-log"       : 817078062784708608,
     }
 
-    async def get_invites(self, message):
-        regex = re.compile(r'discord(?:\.com|app\.com|\.gg)/(?:invite/)?([a-zA-Z0-9\-]{2,32})')
-        invite_urls = regex.findall(message)
-        if len(invite_urls) == 0:
-            return None
-
-        invites = []
-        for url in invite_urls:
-            try:
-                invite = await self.bot.fetch_invite(url)
-            except discord.errors.NotFound:
-                continue
-            else:
-                invites.append(invite)
-        return invites
-
     def get_channel(self, name):
         return self.bot.get_channel(self._channel_ids[name])
 
     def __init__(self, bot):
         super().__init__(bot)
         self.welcome_messages = {}
+        self.moderation = ModerationEngine(bot)
+        self.staff_votes = StaffVoteStore(self.vote_emojis)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -140,25 +120,36 @@ class Intergalactica(BaseCog):
         self.bump_available = datetime.datetime.utcnow() + datetime.timedelta(minutes = 120)
         self.role_needed_for_selfie_vote = self.guild.get_role(self._role_ids["ranks"]["nova"])
 
-        self.start_task(self.reminder_notifier, check = self.bot.production)
+        if self.bot.production:
+            await self.staff_votes.load()
+            await self.bot.scheduler.register(
+                Reminder,
+                self.send_reminders,
+                due   = lambda x : x.due_date if not x.finished else None,
+                where = (Reminder.finished == False)
+            )
+            await self.bot.scheduler.register(
+                TemporaryChannel,
+                self.expire_temp_channels,
+                due   = lambda x : x.expiry_date if x.active else None,
+                where = (TemporaryChannel.active == True) & (TemporaryChannel.expiry_date != None)
+            )
         self.start_task(self.reddit_advertiser, check = self.bot.production)
         self.start_task(self.illegal_member_notifier, check = self.bot.production)
         self.start_task(self.temp_vc_poller, check = self.bot.production)
-        self.start_task(self.temp_channel_checker, check = self.bot.production)
         self.start_task(self.disboard_bump_available_notifier, check = self.bot.production)
         self.start_task(self.introduction_purger, check = self.bot.production)
         await asyncio.sleep( (60 * 60) * 3 )
         self.start_task(self.birthday_poller, check = self.bot.production)
 
     def on_milkyway_purchased(self, channel, member, amount):
-        with database.connection_context():
-            item = Item.get(code = "milky_way")
-            human = self.bot.get_human(user = member)
-            human.add_item(item, amount)
+        item = Item.get(code = "milky_way")
+        human = self.bot.get_human(user = member)
+        human.add_item(item, amount)
 
         embed = discord.Embed(color = self.bot.get_dominant_color(None))
         embed.description = f"Good job in purchasing {amount} milky way(s).\nInstructions:\n`/milkyway create` or `/milkyway extend #channel`"
-        asyncio.gather(channel.send(embed = embed))
+        self.bot.dispatcher.send(channel, embed = embed)
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
@@ -200,78 +191,76 @@ class Intergalactica(BaseCog):
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
+        if payload.member is None or payload.member.bot:
+            return
+        await self.on_staff_vote_reaction(payload, added = True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        user = self.bot.get_user(payload.user_id)
+        if user is None or user.bot:
+            return
+        await self.on_staff_vote_reaction(payload, added = False)
+
+    async def on_staff_vote_reaction(self, payload, added):
         if not self.bot.production:
             return
         if payload.guild_id != self.guild_id:
             return
-        if payload.member is None or payload.member.bot:
-            return
         if payload.channel_id != self._channel_ids["staff_votes"]:
             return
+        emoji = str(payload.emoji)
+        if emoji not in self.vote_emojis:
+            return
 
-        is_skip_vote = lambda x : x == self.vote_emojis[-1]
+        channel = self.bot.get_channel(payload.channel_id)
+        tally = await self.staff_votes.get(channel, payload.message_id)
+        if tally.vote.finished:
+            return
+        if added:
+            changed = await self.staff_votes.add(tally, payload.user_id, emoji)
+        else:
+            changed = await self.staff_votes.remove(tally, payload.user_id, emoji)
 
-        if str(payload.emoji) in self.vote_emojis:
-            def clean_value(value):
-                return int(value) if value % 1 == 0 else round(value, 2)
-            channel = self.bot.get_channel(payload.channel_id)
-            staff_members = [x for x in channel.members if not x.bot]
-            message = await channel.fetch_message(payload.message_id)
+        staff_members = [x for x in channel.members if not x.bot]
+        if not changed or not set(x.id for x in staff_members).issubset(tally.voters):
+            return
+        if not await self.staff_votes.finish(tally):
+            return
 
-            reactions = [x for x in message.reactions if str(x.emoji) in self.vote_emojis]
-            all_user_ids = set()
-            votes = {}
-            skipped_member_count = 0
+        def clean_value(value):
+            return int(value) if value % 1 == 0 else round(value, 2)
 
-            for reaction in reactions:
-                users = await reaction.users().flatten()
-                valid_users = [x for x in users if not x.bot and not x.id in all_user_ids]
-                if is_skip_vote(str(reaction.emoji)):
-                    skipped_member_count = len(valid_users)
+        votes = tally.votes()
+        skipped_member_count = votes[self.vote_emojis[-1]]
 
-                votes[str(reaction.emoji)] = len(valid_users)
+        embed = discord.Embed(color = self.bot.get_dominant_color(None))
+        lines = []
+        lines.append("*(all staff members finished voting)*")
+        lines.append(tally.vote.content)
+        lines.append("")
 
-                for user in users:
-                    if not user.bot:
-                        all_user_ids.add(user.id)
+        for vote, vote_count in votes.items():
+            if vote == self.vote_emojis[-1]:
+                continue
+            total_votes = (len(staff_members)-skipped_member_count)
+            try:
+                percentage = (vote_count/total_votes)*100
+            except ZeroDivisionError:
+                percentage = 0
+
+            cleaned_value = clean_value(percentage)
+            lines.append(f"{vote}: {vote_count} **{cleaned_value}%**")
+            if vote == self.vote_emojis[0] and vote_count == len(staff_members):
+                if "selfie access" in tally.vote.content:
+                    user_id = MemberWaiter.get_id(tally.vote.content)
+                    member = channel.guild.get_member(user_id)
+                    selfie_role = channel.guild.get_role(self._role_ids["selfies"])
+                    await member.add_roles(selfie_role)
+                    embed.set_footer(text = "Selfie role assigned.")
 
-            if len(all_user_ids) == len(staff_members):
-                embed = discord.Embed(color = self.bot.get_dominant_color(None))
-                lines = []
-                lines.append("*(all staff members finished voting)*")
-                lines.append(message.content)
-                lines.append("")
-
-                for vote, vote_count in votes.items():
-                    if not is_skip_vote(vote):
-                        total_votes = (len(staff_members)-skipped_member_count)
-                        try:
-                            percentage = (vote_count/total_votes)*100
-                        except ZeroDivisionError:
-                            percentage = 0
-
-                        cleaned_value = clean_value(percentage)
-                        lines.append(f"{vote}: {vote_count} **{cleaned_value}%**")
-                        if vote == self.vote_emojis[0] and vote_count == len(staff_members):
-                            if "selfie access" in message.content:
-                                user_id = MemberWaiter.get_id(message.content)
-                                member = message.guild.get_member(user_id)
-                                selfie_role = message.guild.get_role(self._role_ids["selfies"])
-                                await member.add_roles(selfie_role)
-                                embed.set_footer(text = "Selfie role assigned.")
-
-                embed.description = "\n".join(lines)
-                asyncio.gather(self.get_channel("staff_chat").send(embed = embed))
-
-    def blacklisted_words_used(self, text):
-        blacklisted_words = ["retard", "nigger"]
-
-        words_used = []
-        for word in blacklisted_words:
-            if word in text:
-                words_used.append(word)
-
-        return words_used
+        embed.description = "\n".join(lines)
+        self.bot.dispatcher.send(self.get_channel("staff_chat"), embed = embed)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -280,29 +269,26 @@ class Intergalactica(BaseCog):
         if message.guild is not None and message.guild.id != self.guild_id:
             return
 
-        words = self.blacklisted_words_used(message.content)
-        if len(words) > 0:
-            await on_malicious_action(MaliciousAction.blacklisted_word, message.author, message = message, words = words)
-
-        invites = await self.get_invites(message.content)
-        if invites:
-            for invite in invites:
-                if invite.guild.id != message.guild.id:
-                    await on_malicious_action(MaliciousAction.invite_url, message.author, message = message)
-            return
+        if message.guild is not None and not message.author.bot:
+            verdicts = await self.moderation.judge(message)
+            for verdict in verdicts:
+                await on_malicious_action(verdict)
+            if any(x.action == MaliciousAction.invite_url for x in verdicts):
+                return
 
         if message.channel.id == self._channel_ids["general"]:
             if self.last_member_join is not None and "welcome" in message.content.lower():
                 time_here = relativedelta(datetime.datetime.utcnow(), self.last_member_join)
                 if time_here.minutes <= 5:
                     emoji = random.choice(("💛", "🧡", "🤍", "💙", "🖤", "💜", "💚", "❤️"))
-                    asyncio.gather(message.add_reaction(emoji))
+                    self.bot.dispatcher.call(message, "add_reaction", emoji)
             elif random.randint(0, 1000) == 1:
-                asyncio.gather(message.add_reaction("🤏"))
+                self.bot.dispatcher.call(message, "add_reaction", "🤏")
 
         if message.channel.id == self._channel_ids["staff_votes"]:
-            coros = [message.add_reaction(x) for x in self.vote_emojis]
-            asyncio.gather(*coros)
+            for emoji in self.vote_emojis:
+                self.bot.dispatcher.call(message, "add_reaction", emoji)
+            await self.staff_votes.create(message)
 
         if message.author.id == 172002275412279296: # tatsu
             if len(message.embeds) > 0:
@@ -335,9 +321,9 @@ class Intergalactica(BaseCog):
             if minutes is  not None:
                 self.bump_available = datetime.datetime.utcnow() + datetime.timedelta(minutes = minutes)
 
-    async def log(self, channel_name, content = None, **kwargs):
+    def log(self, channel_name, content = None, **kwargs):
         channel = self.get_channel(channel_name)
-        await channel.send(content = content, **kwargs)
+        return self.bot.dispatcher.send(channel, content = content, **kwargs)
 
     async def on_member_leave_or_join(self, member, type):
         if not self.bot.production or member.guild.id != self.guild_id:
@@ -354,7 +340,7 @@ class Intergalactica(BaseCog):
         embed.set_author(name = name, icon_url = "https://cdn.discordapp.com/attachments/744172199770062899/768460504649695282/c3p0.png")
         embed.description = text.format(member = member)
 
-        asyncio.gather(welcome_channel.send(embed = embed))
+        self.bot.dispatcher.send(welcome_channel, embed = embed)
 
         if type == "join":
             self.last_member_join = datetime.datetime.utcnow()
@@ -459,7 +445,7 @@ class Intergalactica(BaseCog):
             await temp_channel.user.send(f"Your request for a temporary channel was accepted.")
         except:
             pass
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @commands.has_guild_permissions(administrator = True)
     @temporary_channel.command(name = "deny")
@@ -480,7 +466,7 @@ class Intergalactica(BaseCog):
             await temp_channel.user.send(f"Your request for a temporary channel was denied. Reason: `{temp_channel.deny_reason}`")
         except:
             pass
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @temporary_channel.command(name = "create")
     async def temporary_channel_create(self, ctx):
@@ -527,7 +513,7 @@ class Intergalactica(BaseCog):
             items_to_use = 1
 
         temp_channel.set_expiry_date(datetime.timedelta(days = temp_channel.days * items_to_use))
-        asyncio.gather(temp_channel.update_channel_topic())
+        self.bot.dispatcher.edit(temp_channel.channel, topic = temp_channel.get_topic())
         human_item.amount -= items_to_use
         human_item.save()
         temp_channel.save()
@@ -567,15 +553,15 @@ class Intergalactica(BaseCog):
 
     async def on_rank(self, member, role):
         role_to_add = self.guild.get_role(self._role_ids["5k+"])
-        asyncio.gather(member.add_roles(role_to_add))
+        self.bot.dispatcher.call(member, "add_roles", role_to_add)
 
         if role == self.role_needed_for_selfie_vote:
             if member.guild.get_role(self._role_ids["selfies"]) not in member.roles:
                 time_here = relativedelta(datetime.datetime.utcnow(), member.joined_at)
                 if time_here.hours >= 12:
                     channel = self.get_channel("staff_votes")
-                    asyncio.gather(channel.send(f"Should {member.mention} (**{member}**) get selfie access?"))
-                asyncio.gather(self.log("c3po-log", f"**{member}** {member.mention} has achieved the rank needed for selfies ({role.name})."))
+                    self.bot.dispatcher.send(channel, content = f"Should {member.mention} (**{member}**) get selfie access?")
+                self.log("c3po-log", f"**{member}** {member.mention} has achieved the rank needed for selfies ({role.name}).")
 
     @commands.Cog.listener()
     async def on_member_update(self, before, after):
@@ -625,6 +611,48 @@ class Intergalactica(BaseCog):
 
         await ctx.author.add_roles(role)
 
+    @commands.has_guild_permissions(administrator = True)
+    @commands.group()
+    @commands.guild_only()
+    async def blacklist(self, ctx):
+        pass
+
+    @blacklist.command(name = "add")
+    async def blacklist_add(self, ctx, word : str.lower, whole_word : bool = False):
+        ModerationRule.create(guild_id = ctx.guild.id, word = word, whole_word = whole_word)
+        await ctx.success()
+
+    @blacklist.command(name = "remove")
+    async def blacklist_remove(self, ctx, word : str.lower):
+        query = ModerationRule.delete()
+        query = query.where(ModerationRule.guild_id == ctx.guild.id)
+        query = query.where(ModerationRule.word == word)
+        if query.execute() == 0:
+            raise SendableException("Word not found.")
+        self.moderation.invalidate(ctx.guild.id)
+        await ctx.success()
+
+    @blacklist.command(name = "list")
+    async def blacklist_list(self, ctx):
+        query = ModerationRule.select().where(ModerationRule.guild_id == ctx.guild.id)
+
+        header = pretty.Row(("word", "whole word"), header = True)
+        to_row = lambda x : pretty.Row((x.word, pretty.prettify_value(x.whole_word)))
+        await pretty.TableSource.from_query(query, header, 15, to_row).to_paginator(ctx).wait()
+
+    @commands.has_guild_permissions(administrator = True)
+    @commands.command()
+    @commands.guild_only()
+    async def antispam(self, ctx, messages : int, seconds : int, duplicates : int, mentions : int):
+        """Flag members that send messages within seconds, the same message duplicates times or mentions within seconds. 0 turns a check off."""
+        thresholds, _ = SpamThreshold.get_or_create(guild_id = ctx.guild.id)
+        thresholds.messages   = messages
+        thresholds.seconds    = seconds
+        thresholds.duplicates = duplicates
+        thresholds.mentions   = mentions
+        thresholds.save()
+        await ctx.success()
+
     @commands.group()
     @is_intergalactica()
     async def role(self, ctx):
@@ -638,7 +666,7 @@ class Intergalactica(BaseCog):
     @role.command(name = "color", aliases = ["colour"])
     async def role_color(self, ctx, color : discord.Color = None):
         if color is None:
-            color = self.bot.calculate_dominant_color(self.bot._get_icon_url(ctx.author))
+            color = await self.bot.calculate_dominant_color(self.bot._get_icon_url(ctx.author))
 
         await self.edit_personal_role(ctx, color = color)
 
@@ -662,15 +690,9 @@ class Intergalactica(BaseCog):
                 roles.append(role)
         roles.sort(key = lambda x : x.position)
 
-        table = pretty.Table()
-        table.add_row(pretty.Row(["role", "pos", "in use"], header = True))
-
-        for role in roles:
-            values = [role.name, role.position, len(role.members) > 0]
-            table.add_row(pretty.Row(values))
-        await table.to_paginator(ctx, 20).wait()
-
-        table = pretty.Table()
+        header = pretty.Row(["role", "pos", "in use"], header = True)
+        to_row = lambda x : pretty.Row([x.name, x.position, len(x.members) > 0])
+        await pretty.TableSource.from_list(roles, header, 20, to_row = to_row).to_paginator(ctx).wait()
 
     @commands.is_owner()
     @role.command(name = "link")
@@ -709,7 +731,7 @@ class Intergalactica(BaseCog):
                 role = earthling.personal_role
                 if role is not None and earthling.member is None:
                     roles_deleted.append(role.name)
-                    asyncio.gather(role.delete())
+                    self.bot.dispatcher.call(role, "delete")
 
         embed = self.bot.get_base_embed()
         if len(roles_deleted) > 0:
@@ -719,34 +741,28 @@ class Intergalactica(BaseCog):
         else:
             embed.description = "No roles needed purging."
 
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
-    @tasks.loop(hours = 1)
-    async def temp_channel_checker(self):
-        with database.connection_context():
-            query = TemporaryChannel.select()
-            query = query.where(TemporaryChannel.active == True)
-            query = query.where(TemporaryChannel.expiry_date != None)
-            query = query.where(TemporaryChannel.expiry_date <= datetime.datetime.utcnow())
-            for temp_channel in query:
-                channel = temp_channel.channel
-                temp_channel.active = False
-                if channel is not None:
-                    await channel.delete(reason = "Expired")
-                temp_channel.channel_id = None
-                temp_channel.save()
+    async def expire_temp_channels(self, temp_channels):
+        for temp_channel in temp_channels:
+            channel = temp_channel.channel
+            temp_channel.active = False
+            if channel is not None:
+                await channel.delete(reason = "Expired")
+            temp_channel.channel_id = None
+            await database.run(temp_channel.save)
 
     @tasks.loop(hours = 1)
     async def reddit_advertiser(self):
         query = RedditAdvertisement.select()
         query = query.where(RedditAdvertisement.guild_id == self.guild.id)
 
-        for reddit_advertisement in query:
+        for reddit_advertisement in await database.run(list, query):
             if reddit_advertisement.available:
                 embed = Embed.success(None)
                 submissions = await reddit_advertisement.advertise()
                 embed.set_author(name = "bump_successful", url = submissions[0].shortlink)
-                asyncio.gather(self.log("c3po-log", embed = embed))
+                self.log("c3po-log", embed = embed)
 
                 await asyncio.sleep(10)
                 for submission in submissions:
@@ -765,15 +781,13 @@ class Intergalactica(BaseCog):
 
     @tasks.loop(minutes = 5)
     async def temp_vc_poller(self):
-        with database.connection_context():
-            for temporary_voice_channel in TemporaryVoiceChannel:
-                channel = temporary_voice_channel.channel
-                if channel is None or len(channel.members) == 0:
-                    temporary_voice_channel.delete_instance()
+        for temporary_voice_channel in await database.run(list, TemporaryVoiceChannel.select()):
+            channel = temporary_voice_channel.channel
+            if channel is None or len(channel.members) == 0:
+                temporary_voice_channel.delete_instance()
 
     @tasks.loop(hours = 3)
     async def introduction_purger(self):
-        tasks = []
         total_messages = 0
         messages_to_remove = []
 
@@ -791,27 +805,21 @@ class Intergalactica(BaseCog):
                 title = f"Purged: Introduction by {introduction.author}",
                 description = introduction.content
             )
-            tasks.append(self.log("logs", embed = embed))
-            tasks.append(introduction.delete())
-
-        asyncio.gather(*tasks)
+            self.bot.dispatcher.send(self.get_channel("logs"), embed = embed)
 
-    @tasks.loop(seconds = 30)
-    async def reminder_notifier(self):
-        query = Reminder.select()
-        query = query.where(Reminder.finished == False)
-        query = query.where(Reminder.due_date <= datetime.datetime.utcnow())
+        await asyncio.gather(*[self.bot.dispatcher.call(x, "delete") for x in messages_to_remove], return_exceptions = True)
 
-        for reminder in query:
+    async def send_reminders(self, reminders):
+        for reminder in reminders:
             sendable = reminder.sendable
             if sendable is not None:
                 embed = discord.Embed(color = self.bot.get_dominant_color(None))
                 embed.set_author(name = "Reminder", icon_url = "https://cdn.discordapp.com/attachments/744172199770062899/804862458070040616/1.webp")
                 embed.description = reminder.text
-                asyncio.gather(sendable.send(content = f"<@{reminder.user_id}>", embed = embed))
+                self.bot.dispatcher.send(sendable, content = f"<@{reminder.user_id}>", embed = embed)
 
             reminder.finished = True
-            reminder.save()
+            await database.run(reminder.save)
 
     @tasks.loop(hours = 1)
     async def illegal_member_notifier(self):
@@ -820,11 +828,10 @@ class Intergalactica(BaseCog):
                 continue
 
             if not member_is_legal(member):
-                with database.connection_context():
-                    time_here = relativedelta(datetime.datetime.utcnow(), member.joined_at)
-                    if time_here.hours >= 6:
-                        asyncio.gather(member.kick(reason = "Missing mandatory roles."))
-                        await self.log("c3po-log", f"**{member}** {member.mention} was kicked due to missing roles")
+                time_here = relativedelta(datetime.datetime.utcnow(), member.joined_at)
+                if time_here.hours >= 6:
+                    self.bot.dispatcher.call(member, "kick", reason = "Missing mandatory roles.")
+                    await self.log("c3po-log", f"**{member}** {member.mention} was kicked due to missing roles")
 
     @tasks.loop(hours = 12)
     async def birthday_poller(self):
@@ -838,9 +845,8 @@ class Intergalactica(BaseCog):
         query = query.where(Human.date_of_birth.day == now.day)
         query = query.order_by(Human.date_of_birth.asc())
 
-        with database.connection_context():
-            for human in query:
-                await self.log("c3po-log", f"**{human.user}** {human.mention} Should be celebrating their birthday today.")
+        for human in await database.run(list, query):
+            await self.log("c3po-log", f"**{human.user}** {human.mention} Should be celebrating their birthday today.")
 
 def member_is_legal(member):
     age_roles = Intergalactica._role_ids["age"].values()
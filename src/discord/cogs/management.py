@@ -1,6 +1,5 @@
 import re
 import json
-import asyncio
 import datetime
 
 import discord
@@ -28,8 +27,9 @@ class Management(BaseCog):
         named_channel, created = NamedChannel.get_or_create(name = name, settings = settings)
         named_channel.channel_id = channel.id
         named_channel.save()
+        await self.bot.guild_settings.reload_guild(ctx.guild.id)
 
-        asyncio.gather(ctx.send("OK"))
+        self.bot.dispatcher.send(ctx, content = "OK")
 
     @commands.is_owner()
     @commands.command()
@@ -55,9 +55,10 @@ class Management(BaseCog):
         try:
             Translation.create(message_key = key, value = value)
         except:
-            asyncio.gather(ctx.error())
+            await ctx.error()
         else:
-            asyncio.gather(ctx.success())
+            await self.bot.translations.reload()
+            await ctx.success()
 
     @translation.command(name = "remove")
     async def translation_remove(self, ctx, key, locale = "en_US"):
@@ -68,8 +69,9 @@ class Management(BaseCog):
             raise SendableException(ctx.translate("key_not_found"))
 
         translation.delete_instance()
+        await self.bot.translations.reload()
         missing_translations.add(key)
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @translation.command()
     async def keys(self, ctx, locale = "en_US"):
@@ -79,12 +81,13 @@ class Management(BaseCog):
             try:
                 value = await waiter.wait()
             except Skipped:
-                return
+                return await self.bot.translations.reload()
             else:
                 Translation.create(message_key = key, value = value, locale = locale)
                 missing_translations.remove(key)
 
-        asyncio.gather(ctx.send(ctx.translate("keys_created")))
+        await self.bot.translations.reload()
+        self.bot.dispatcher.send(ctx, content = ctx.translate("keys_created"))
 
     @translation.command()
     async def fromen(self, ctx, locale : Locale):
@@ -105,17 +108,16 @@ class Management(BaseCog):
                 try:
                     value = await waiter.wait()
                 except Skipped:
-                    return
+                    return await self.bot.translations.reload()
                 else:
                     Translation.create(message_key = translation.message_key, value = value, locale = locale)
 
-        asyncio.gather(ctx.send(ctx.translate("translations_created")))
+        await self.bot.translations.reload()
+        self.bot.dispatcher.send(ctx, content = ctx.translate("translations_created"))
 
     @commands.command()
     @commands.has_guild_permissions(administrator = True)
     async def embed(self, ctx, name):
-        settings, _ = Settings.get_or_create(guild_id = ctx.guild.id)
-
         if len(ctx.message.attachments) > 0:
             attachment = ctx.message.attachments[0]
             data = json.loads(await attachment.read())
@@ -124,16 +126,17 @@ class Management(BaseCog):
             embed = discord.Embed.from_dict(embed_data)
             await ctx.send(embed = embed)
 
+            settings, _ = Settings.get_or_create(guild_id = ctx.guild.id)
             named_embed, _ = NamedEmbed.get_or_create(name = name, settings = settings)
             named_embed.data = embed_data
             named_embed.save()
+            await self.bot.guild_settings.reload_guild(ctx.guild.id)
         else:
-            try:
-                named_embed = NamedEmbed.get(name = name, settings = settings)
-            except NamedEmbed.DoesNotExist:
+            embed = self.bot.guild_settings.get_embed(ctx.guild, name)
+            if embed is None:
                 await ctx.send("This embed does not exist")
             else:
-                await ctx.send(embed = named_embed.embed)
+                await ctx.send(embed = embed)
 
     @commands.command()
     @commands.has_guild_permissions(administrator = True)
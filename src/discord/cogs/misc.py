@@ -1,5 +1,4 @@
 import random
-import asyncio
 
 import requests
 import discord
@@ -26,7 +25,7 @@ class MiscCog(BaseCog, name = "Misc"):
             embed.description = definition["definition"]
             embed.description += f"\n\n{definition['example']}"
 
-            asyncio.gather(ctx.send(embed = embed))
+            self.bot.dispatcher.send(ctx, embed = embed)
             break
 
     @commands.command()
@@ -12,7 +12,7 @@ from discord.ext import commands, tasks
 
 import src.config as config
 from src.discord.errors.base import SendableException
-from src.models import database, Subreddit, DailyReminder, Location, PersonalQuestion
+from src.models import Subreddit, DailyReminder, Location, PersonalQuestion, database
 from src.discord.cogs.core import BaseCog
 
 def decode(text):
@@ -65,7 +65,12 @@ class Personal(BaseCog):
 
     @commands.Cog.listener()
     async def on_ready(self):
-        self.start_task(self.water_reminder, check = self.bot.production)
+        if self.bot.production:
+            await self.bot.scheduler.register(
+                DailyReminder,
+                self.send_daily_reminders,
+                due = lambda x : x.next_reminder(self.bot.scheduler.now())
+            )
         self.start_task(self.free_games_notifier, check = self.bot.production)
 
     def notify(self, block = True, **kwargs):
@@ -162,51 +167,38 @@ class Personal(BaseCog):
             text = "empty"
         await self.user.send(text)
 
-    @tasks.loop(seconds = 10)
-    async def water_reminder(self):
-        now = datetime.datetime.utcnow()
-        weekend = now.weekday() in range(5, 7)
-        weekday = not weekend
-
-        query = DailyReminder.select()
-        query = query.where(DailyReminder.time <= now.time())
-        query = query.where(DailyReminder.time.hour == now.time().hour)
-        query = query.where( (DailyReminder.weekday == weekday) | (DailyReminder.weekend == weekend) )
-        query = query.order_by(DailyReminder.time.desc())
-
-        for reminder in query:
-            if reminder.last_reminded != now.date():
-                if reminder.user:
-                    asyncio.gather(reminder.user.send(reminder.text))
-                reminder.last_reminded = now.date()
-                reminder.save()
-                break
+    async def send_daily_reminders(self, reminders):
+        today = self.bot.scheduler.now().date()
+        for reminder in reminders:
+            if reminder.user:
+                self.bot.dispatcher.send(reminder.user, content = reminder.text)
+            reminder.last_reminded = today
+            await database.run(reminder.save)
 
     @tasks.loop(minutes = 1)
     async def free_games_notifier(self):
         ids = [742205149862428702]
         channels = [self.bot.get_channel(x) for x in ids]
 
-        with database.connection_context():
-            for subreddit in Subreddit.select().where(Subreddit.automatic == False):
-                post = subreddit.latest_post
+        for subreddit in await database.run(list, Subreddit.select().where(Subreddit.automatic == False)):
+            post = subreddit.latest_post
 
-                if post is None:
-                    return
+            if post is None:
+                return
 
-                id = post.url.split("comments/")[1].split("/")[0]
-                submission = self.bot.reddit.submission(id)
+            id = post.url.split("comments/")[1].split("/")[0]
+            submission = self.bot.reddit.submission(id)
 
-                skipped_channel_ids = []
+            skipped_channel_ids = []
 
-                game = FreeGame.from_reddit_submission(submission)
-                embed = game.get_embed()
-                if game.type not in (FreeGameType.steam, FreeGameType.gog, FreeGameType.epicgames, FreeGameType.unknown):
-                    skipped_channel_ids.append(784439833975062546)
+            game = FreeGame.from_reddit_submission(submission)
+            embed = game.get_embed()
+            if game.type not in (FreeGameType.steam, FreeGameType.gog, FreeGameType.epicgames, FreeGameType.unknown):
+                skipped_channel_ids.append(784439833975062546)
 
-                channels.append(subreddit.sendable)
-                for channel in [x for x in channels if x.id not in skipped_channel_ids]:
-                    asyncio.gather(channel.send(embed = embed))
+            channels.append(subreddit.sendable)
+            for channel in [x for x in channels if x.id not in skipped_channel_ids]:
+                self.bot.dispatcher.send(channel, embed = embed)
 
 def setup(bot):
     bot.add_cog(Personal(bot))
@@ -14,7 +14,7 @@ from src.discord.helpers.waiters import *
 from src.utils.country import Country
 from src.discord.helpers.paginating import Paginator
 from src.discord.errors.base import SendableException
-from src.discord.helpers.pretty import prettify_dict, limit_str, Table, Row
+from src.discord.helpers.pretty import prettify_dict, limit_str, Table, TableSource, Row
 from src.discord.helpers.exploration_retrieval import ExplorationRetrieval, MailRetrieval
 from src.utils.enums import Gender
 from src.discord.helpers.converters import EnumConverter
@@ -41,8 +41,9 @@ class ItemWaiter(StrWaiter):
         data = [(x.item.name, x.amount) for x in self.inventory]
         data.insert(0, ("name", "amount"))
         table = Table.from_list(data, first_header = True)
-        asyncio.gather(table.to_paginator(self.ctx, 15).wait())
-        await asyncio.sleep(0.5)
+        paginator = table.to_paginator(self.ctx, 15)
+        await paginator.reload()
+        asyncio.ensure_future(paginator.wait())
         return await super().wait(*args, **kwargs)
 
     def convert(self, argument):
@@ -98,16 +99,23 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         embed.set_thumbnail(url = "https://cdn.discordapp.com/attachments/705242963550404658/766680730457604126/pigeon_tiny.png")
         return embed
 
+    def get_snapshot(self, pigeon):
+        return self.bot.profiles.get(self.bot.human_cache.get_by_id(pigeon.human_id))
+
     def get_pigeon_channel(self, guild):
-        with database.connection_context():
-            settings, _ = Settings.get_or_create(guild_id = guild.id)
-        return settings.get_channel("pigeon")
+        return self.bot.guild_settings.get_channel(guild, "pigeon")
 
     @commands.Cog.listener()
     async def on_ready(self):
         Pigeon.emojis["gold"] = self.bot.gold_emoji
-        self.start_task(self.date_ticker, check = self.bot.production)
-        self.start_task(self.fight_ticker, check = self.bot.production)
+        if self.bot.production:
+            for cls, callback in ((Date, self.resolve_dates), (Fight, self.resolve_fights)):
+                await self.bot.scheduler.register(
+                    cls,
+                    callback,
+                    due   = lambda x : x.end_date if x.accepted and not x.finished else None,
+                    where = (cls.finished == False) & (cls.accepted == True)
+                )
         await asyncio.sleep(60 * 60)
         self.start_task(self.stats_ticker, check = self.bot.production)
 
@@ -168,7 +176,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         pigeon = get_active_pigeon(member, human = human)
 
         if pigeon is not None:
-            return asyncio.gather(ctx.send(ctx.translate("pigeon_already_purchased").format(name = pigeon.name)))
+            return self.bot.dispatcher.send(ctx, content = ctx.translate("pigeon_already_purchased").format(name = pigeon.name))
 
         pigeon = Pigeon(human = human)
         await pigeon.editor_for(ctx, "name")
@@ -184,7 +192,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
             embed.description = ctx.translate("pigeon_purchased_for").format(member = member) + winnings_value
         else:
             embed.description = ctx.translate("pigeon_purchased") + winnings_value
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @pigeon.command(name = "languages", aliases = ["lang"])
     async def pigeon_languages(self, ctx):
@@ -192,7 +200,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         table = Table(padding = 0)
         table.add_row(Row(["name", "%", "rank"], header = True))
 
-        for language_mastery in ctx.pigeon.language_masteries.order_by(LanguageMastery.mastery.desc()):
+        for language_mastery in self.get_snapshot(ctx.pigeon).language_masteries:
             values = [str(language_mastery.language.name), str(language_mastery.mastery)+"%", str(language_mastery.rank)]
             table.add_row(Row(values))
 
@@ -203,7 +211,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         """Change your pigeons gender."""
         ctx.pigeon.gender = gender
         ctx.pigeon.save()
-        asyncio.gather(ctx.send(ctx.translate("gender_set").format(gender = gender.name)))
+        self.bot.dispatcher.send(ctx, content = ctx.translate("gender_set").format(gender = gender.name))
 
     @pigeon.command(name = "name", aliases = ["rename"])
     async def pigeon_name(self, ctx):
@@ -214,7 +222,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         ctx.pigeon.save()
         embed = self.get_base_embed(ctx.guild)
         embed.description = f"Okay. Name has been set to {ctx.pigeon.name}" + "\n" + get_winnings_value(gold = -cost)
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @pigeon.command(name = "fight")
     @commands.max_concurrency(1, per = commands.BucketType.user)
@@ -253,7 +261,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         footer.append(f"use '{ctx.prefix}pigeon accept' to accept")
         footer.append(f"or '{ctx.prefix}pigeon reject' to reject")
         embed.set_footer(text = "\n".join(footer))
-        asyncio.gather(channel.send(embed = embed)) 
+        self.bot.dispatcher.send(channel, embed = embed) 
 
     @pigeon.command(name = "pvp")
     async def pigeon_pvp(self, ctx):
@@ -264,7 +272,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
 
         pigeon.pvp = not pigeon.pvp
         pigeon.save()
-        asyncio.gather(ctx.send(f"Okay. PvP is now " + ("on" if pigeon.pvp else "off")))
+        self.bot.dispatcher.send(ctx, content = f"Okay. PvP is now " + ("on" if pigeon.pvp else "off"))
 
     @pigeon.command(name = "rob")
     async def pigeon_rob(self, ctx, member : discord.Member):
@@ -336,7 +344,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         footer.append(f"use '{ctx.prefix}pigeon accept' to accept")
         footer.append(f"or '{ctx.prefix}pigeon reject' to reject")
         embed.set_footer(text = "\n".join(footer))
-        asyncio.gather(channel.send(embed = embed))
+        self.bot.dispatcher.send(channel, embed = embed)
 
     @pigeon.command(name = "accept")
     async def pigeon_accept(self, ctx):
@@ -403,15 +411,12 @@ class PigeonCog(BaseCog, name = "Pigeon"):
     @pigeon.command(name = "relationships")
     async def pigeon_relationships(self, ctx):
         """View your pigeons relationships."""
-        query = PigeonRelationship.select()
-        query = query.where((PigeonRelationship.pigeon1 == ctx.pigeon) | (PigeonRelationship.pigeon2 == ctx.pigeon))
-        query = query.order_by(PigeonRelationship.score.asc())
+        snapshot = self.get_snapshot(ctx.pigeon)
 
         table = Table(padding = 0)
         table.add_row(Row(["name", "score", "title"], header = True))
 
-        for relationship in query:
-            other = relationship.pigeon1 if relationship.pigeon1 != ctx.pigeon else relationship.pigeon2
+        for relationship, other in snapshot.other_pigeons():
             values = [limit_str(other.name, 10), relationship.score, relationship.title]
             table.add_row(Row(values))
 
@@ -450,7 +455,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
                 text       = ctx.translate("pigeon_ready_to_be_retrieved"),
                 due_date   = exploration.end_date
             )
-            asyncio.gather(ctx.success(ctx.translate("reminder_created")))
+            await ctx.success(ctx.translate("reminder_created"))
 
     @pigeon.command(name = "retrieve", aliases = ["return"] )
     @commands.max_concurrency(1, per = commands.BucketType.user)
@@ -472,12 +477,12 @@ class PigeonCog(BaseCog, name = "Pigeon"):
                 retrieval = ExplorationRetrieval(activity)
                 embed = retrieval.embed
                 retrieval.commit()
-                return asyncio.gather(ctx.send(embed = embed))
+                return self.bot.dispatcher.send(ctx, embed = embed)
             else:
                 embed.description = f"**{pigeon.name}** is still on {pigeon.gender.get_posessive_pronoun()} way to explore!"
                 embed.set_footer(text = "Check back at", icon_url = "https://www.animatedimages.org/data/media/678/animated-pigeon-image-0045.gif")
                 embed.timestamp = activity.end_date
-                return asyncio.gather(ctx.send(embed = embed))
+                return self.bot.dispatcher.send(ctx, embed = embed)
         elif isinstance(activity, Mail):
             if activity.end_date_passed:
                 retrieval = MailRetrieval(activity)
@@ -491,12 +496,12 @@ class PigeonCog(BaseCog, name = "Pigeon"):
                     text       = ctx.translate("pigeon_inbox_unread_mail"),
                     due_date   = datetime.datetime.utcnow()
                 )
-                return asyncio.gather(ctx.send(embed = embed))
+                return self.bot.dispatcher.send(ctx, embed = embed)
             else:
                 embed.description = f"**{pigeon.name}** is still on {pigeon.gender.get_posessive_pronoun()} way to send a message!"
                 embed.set_footer(text = "Check back at", icon_url = "https://www.animatedimages.org/data/media/678/animated-pigeon-image-0045.gif")
                 embed.timestamp = activity.end_date
-                return asyncio.gather(ctx.send(embed = embed))
+                return self.bot.dispatcher.send(ctx, embed = embed)
 
     @pigeon.command(name = "mail", aliases = ["message", "send", "letter"])
     @commands.max_concurrency(1, per = commands.BucketType.user)
@@ -560,7 +565,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
                 text       = ctx.translate("pigeon_ready_to_be_retrieved"),
                 due_date   = mail.end_date
             )
-            asyncio.gather(ctx.success(ctx.translate("reminder_created")))
+            await ctx.success(ctx.translate("reminder_created"))
 
     @commands.command()
     async def inbox(self, ctx):
@@ -690,20 +695,14 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         lines.append(f"Rejections: {rejections}")
         embed.add_field(name = f"Dates {Pigeon.Status.dating.value}", value = "\n".join(lines), inline = False)
 
-        query = f"""SELECT in_possession, items_discovered, total_items FROM
-            (SELECT COUNT(id) as items_discovered FROM human_item WHERE found = 1 AND human_id = {pigeon.human.id}) as hi1,
-            (SELECT SUM(amount) AS in_possession FROM human_item WHERE human_id = {pigeon.human.id}) as hi2,
-            (SELECT COUNT(id) AS total_items FROM item) as i1"""
-
-        cursor = database.execute_sql(query)
-        in_possession, items_discovered, total_items = cursor.fetchone()
+        snapshot = self.get_snapshot(pigeon)
         lines = []
-        lines.append(f"Items discovered {items_discovered} / {total_items}")
-        lines.append(f"Total items {in_possession}")
+        lines.append(f"Items discovered {snapshot.items_discovered} / {Item.select().count()}")
+        lines.append(f"Total items {snapshot.items_in_possession}")
 
         embed.add_field(name = f"Human", value = "\n".join(lines), inline = False)
 
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @pigeon.command(name = "history")
     async def pigeon_history(self, ctx, member : discord.Member = None):
@@ -717,7 +716,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
 
         for pigeon in query:
             lines.append(pigeon.name)
-        asyncio.gather(ctx.send("```\n{}```".format("\n".join(lines))))
+        self.bot.dispatcher.send(ctx, content = "```\n{}```".format("\n".join(lines)))
 
     @pigeon.command(name = "status")
     async def pigeon_status(self, ctx, member : discord.Member = None):
@@ -725,7 +724,8 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         if member is not None:
             self.pigeon_check(ctx, member = member)
 
-        pigeon = ctx.pigeon
+        snapshot = self.get_snapshot(ctx.pigeon)
+        pigeon = snapshot.pigeon
 
         data = {}
         emojis = []
@@ -748,38 +748,28 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         embed.description = f"```\n{lines}```"
 
         lines = []
-        for pigeon_buff in pigeon.buffs:
+        for pigeon_buff in snapshot.active_buffs:
             buff = pigeon_buff.buff
             lines.append(f"**{buff.name}**: *{buff.description}*")
         if len(lines) > 0:
             embed.add_field(name = "Buffs", value = "\n".join(lines))
 
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @pigeon.command(name = "scoreboard")
     @commands.guild_only()
     async def pigeon_scoreboard(self, ctx):
         """View the scoreboard."""
-        query = Pigeon.select()
-        query = query.join(Human, on = (Pigeon.human == Human.id) )
-        query = query.join(Earthling, on = (Human.id == Earthling.human) )
-        query = query.where(Pigeon.condition == Pigeon.Condition.active)
-        query = query.where(Earthling.guild_id == ctx.guild.id)
-        query = query.order_by(Pigeon.experience.desc())
+        leaderboards = self.bot.leaderboards
+        board = leaderboards.get_experience(ctx.guild.id)
 
-        table = Table(padding = 0)
-        table.add_row(Row(["rank", "exp", "pigeon", "owner"], header = True))
+        def to_row(rank, human_id, experience):
+            member = ctx.guild.get_member(leaderboards.user_id(human_id))
+            return Row([rank, experience, limit_str(leaderboards.pigeon_name(human_id), 10), limit_str(member, 10)])
 
-        i = 0
-        for pigeon in query:
-            user = pigeon.human.user
-            if user is None:
-                continue
-            values = [f"{i+1}", str(pigeon.experience), limit_str(pigeon.name, 10), limit_str(user, 10)]
-            table.add_row(Row(values))
-            i += 1
-
-        await table.to_paginator(ctx, 15).wait()
+        header = Row(["rank", "exp", "pigeon", "owner"], header = True)
+        source = TableSource.from_leaderboard(board, header, 15, to_row)
+        await source.to_paginator(ctx, start_page = board.page_of(leaderboards.human_id(ctx.author.id), 15)).wait()
 
     def increase_stats(self, ctx, attr_name, attr_increase, cost, message):
         pigeon = ctx.pigeon
@@ -799,7 +789,7 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         embed = self.get_base_embed(ctx.guild )
         embed.description = message.format(pigeon = pigeon)
         embed.description += get_winnings_value(**{attr_name : attr_increase, "gold" : -cost})
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @commands.cooldown(1, (45 * 60), type=commands.BucketType.user)
     @pigeon.command(name = "clean")
@@ -888,153 +878,177 @@ class PigeonCog(BaseCog, name = "Pigeon"):
         embed.set_footer(text = f"-{price} relations")
         await ctx.send(embed = embed)
 
-    @tasks.loop(seconds=30)
-    async def date_ticker(self):
-        with database.connection_context():
-            query = Date.select()
-            query = query.where(Date.finished == False)
-            query = query.where(Date.accepted == True)
-            query = query.where(Date.end_date <= datetime.datetime.utcnow())
-
-            for date in query:
-                guild = date.guild
-                channel = self.get_pigeon_channel(guild)
+    def announce(self, announcements):
+        """ Queues (channel, kwargs) pairs on the dispatcher, which keeps them in order per channel. """
+        for channel, kwargs in announcements:
+            self.bot.dispatcher.send(channel, **kwargs)
 
-                embed = self.get_base_embed(guild)
+    def get_announcement_channel(self, guild):
+        try:
+            return self.get_pigeon_channel(guild)
+        except SendableException:
+            return None
 
-                score = 0
-                lines = []
-                for pigeon in (date.pigeon1, date.pigeon2):
-                    other = date.pigeon1 if pigeon == date.pigeon2 else date.pigeon2
-
-                    if pigeon.cleanliness >= 60:
-                        lines.append(f"{pigeon.name} smells like fresh fries, delicious (+10)")
-                        score += 10
-                    elif pigeon.cleanliness >= 40:
-                        lines.append(f"{pigeon.name} has a slight body odor, but it's tolerable (+0)")
-                    elif pigeon.cleanliness >= 20:
-                        lines.append(f"{pigeon.name} has a clear body odor. (-10)")
-                        score -= 10
-                    else:
-                        lines.append(f"{pigeon.name} is caked in feces, absolutely disgusting! (-20)")
-                        score -= 20
-
-                    if pigeon.food >= 60:
-                        lines.append(f"{pigeon.name} ellegantly and majestically enjoys {pigeon.gender.get_posessive_pronoun()} fry. (+10)")
-                        score += 10
-                    elif pigeon.food >= 30:
-                        lines.append(f"{pigeon.name} is clearly a bit hungry but still manages to (barely) not embarrass {pigeon.gender.get_pronoun(object = True)}self (+0)")
-                    else:
-                        lines.append(f"{pigeon.name} is starving. As soon as {pigeon.gender.get_pronoun()} sees a fry {pigeon.gender.get_pronoun()} starts to drool, runs at it like a wild animal and devours it in one go. How unappealing. (-10)")
-                        score -= 10
-
-                    if pigeon.health <= 30:
-                        lines.append(f"{pigeon.name} is covered in blood. {pigeon.gender.get_pronoun()} tries to make it work but accidentally drips some blood on {other.name}s fry . Not a good sauce. (-10)")
-                        score -= 10
-
-                    if pigeon.happiness >= 60:
-                        lines.append(f"{pigeon.name} smiled in confidence the entire date. (+10)")
-                        score += 10
-                    elif pigeon.happiness >= 30:
-                        lines.append(f"{pigeon.name} was clearly not in his best spirits. Slightly bringing his date down as well. (-5)")
-                        score -= 5
-                    else:
-                        lines.append(f"{pigeon.name} is miserable. From the start, {pigeon.gender.get_pronoun()} starts asking what the point of this date even is, what the point of anything is, and why {pigeon.gender.get_pronoun()} should even bother eating at all. (-10)")
-                        score -= 10
-
-                lines = "\n- " + ("\n\n- ".join(lines))
-                embed.description = f"{lines}\n\nScore: **{score}**"
-                embed.set_footer(text = f"{score // 10} relations")
-                asyncio.gather(channel.send(embed = embed))
-
-                for pigeon in date.pigeons:
-                    pigeon.status = Pigeon.Status.idle
-                    pigeon.save()
-
-                date.score = score
-
-                relationship = PigeonRelationship.get_or_create_for(date.pigeon1, date.pigeon2)
-                relationship.score += date.score // 10
-                relationship.save()
-
-                date.finished = True
-                date.save()
-
-    @tasks.loop(seconds=30)
-    async def fight_ticker(self):
-        with database.connection_context():
-            query = Fight.select()
-            query = query.where(Fight.finished == False)
-            query = query.where(Fight.accepted == True)
-            query = query.where(Fight.end_date <= datetime.datetime.utcnow())
-            for fight in query:
-                won = random.randint(0, 1) == 0
-                guild = fight.guild
-                channel = self.get_pigeon_channel(guild)
-
-                if won:
-                    winner = fight.challenger
-                    loser = fight.challengee
-                else:
-                    winner = fight.challengee
-                    loser = fight.challenger
-
-                embed = self.get_base_embed(guild)
-                embed.description = f"`{winner.name}` creeps into `{loser.name}`’s room. `{winner.name}`’s jaw unhinges and swallows `{loser.name}` whole."
-
-                winner_data = {"experience" : 30, "health" : -10}
-                loser_data = {"experience" : 5, "health" : -25}
-
-                embed.add_field(
-                    name = f"💩 {loser.name} ({loser.human.user})",
-                    value = get_winnings_value(**loser_data, gold = -fight.bet)
-                )
-                embed.add_field(
-                    name = f"🏆 {winner.name} ({winner.human.user})",
-                    value = get_winnings_value(**winner_data, gold = fight.bet)
-                )
+    def score_date(self, date):
+        score = 0
+        lines = []
+        for pigeon in (date.pigeon1, date.pigeon2):
+            other = date.pigeon1 if pigeon == date.pigeon2 else date.pigeon2
+
+            if pigeon.cleanliness >= 60:
+                lines.append(f"{pigeon.name} smells like fresh fries, delicious (+10)")
+                score += 10
+            elif pigeon.cleanliness >= 40:
+                lines.append(f"{pigeon.name} has a slight body odor, but it's tolerable (+0)")
+            elif pigeon.cleanliness >= 20:
+                lines.append(f"{pigeon.name} has a clear body odor. (-10)")
+                score -= 10
+            else:
+                lines.append(f"{pigeon.name} is caked in feces, absolutely disgusting! (-20)")
+                score -= 20
+
+            if pigeon.food >= 60:
+                lines.append(f"{pigeon.name} ellegantly and majestically enjoys {pigeon.gender.get_posessive_pronoun()} fry. (+10)")
+                score += 10
+            elif pigeon.food >= 30:
+                lines.append(f"{pigeon.name} is clearly a bit hungry but still manages to (barely) not embarrass {pigeon.gender.get_pronoun(object = True)}self (+0)")
+            else:
+                lines.append(f"{pigeon.name} is starving. As soon as {pigeon.gender.get_pronoun()} sees a fry {pigeon.gender.get_pronoun()} starts to drool, runs at it like a wild animal and devours it in one go. How unappealing. (-10)")
+                score -= 10
+
+            if pigeon.health <= 30:
+                lines.append(f"{pigeon.name} is covered in blood. {pigeon.gender.get_pronoun()} tries to make it work but accidentally drips some blood on {other.name}s fry . Not a good sauce. (-10)")
+                score -= 10
+
+            if pigeon.happiness >= 60:
+                lines.append(f"{pigeon.name} smiled in confidence the entire date. (+10)")
+                score += 10
+            elif pigeon.happiness >= 30:
+                lines.append(f"{pigeon.name} was clearly not in his best spirits. Slightly bringing his date down as well. (-5)")
+                score -= 5
+            else:
+                lines.append(f"{pigeon.name} is miserable. From the start, {pigeon.gender.get_pronoun()} starts asking what the point of this date even is, what the point of anything is, and why {pigeon.gender.get_pronoun()} should even bother eating at all. (-10)")
+                score -= 10
+
+        return score, lines
+
+    async def resolve_dates(self, dates):
+        await database.run(Date.prefetch_pigeons, dates)
+        pairs = [(x.pigeon1_id, x.pigeon2_id) for x in dates]
+        relationships = await database.run(PigeonRelationship.get_many_for, pairs)
+
+        announcements = []
+        pigeons = []
+        for date in dates:
+            guild = date.guild
+            channel = self.get_announcement_channel(guild)
+
+            embed = self.get_base_embed(guild)
+            score, lines = self.score_date(date)
+
+            lines = "\n- " + ("\n\n- ".join(lines))
+            embed.description = f"{lines}\n\nScore: **{score}**"
+            embed.set_footer(text = f"{score // 10} relations")
+            if channel is not None:
+                announcements.append((channel, {"embed" : embed}))
+
+            for pigeon in date.pigeons:
+                pigeon.status = Pigeon.Status.idle
+                pigeons.append(pigeon)
+
+            date.score = score
+            relationships[frozenset((date.pigeon1_id, date.pigeon2_id))].score += date.score // 10
+            date.finished = True
+
+        def commit():
+            Pigeon.bulk_update(pigeons, fields = [Pigeon.status], batch_size = 1000)
+            Date.bulk_update(dates, fields = [Date.score, Date.finished], batch_size = 1000)
+            existing = [x for x in relationships.values() if x.id is not None]
+            if existing:
+                PigeonRelationship.bulk_update(existing, fields = [PigeonRelationship.score], batch_size = 1000)
+            created = [x for x in relationships.values() if x.id is None]
+            if created:
+                PigeonRelationship.bulk_create(created, batch_size = 1000)
+
+        await database.atomic_run(commit)
+        self.bot.profiles.invalidate(*[x.human_id for x in pigeons])
+        self.announce(announcements)
+
+    async def resolve_fights(self, fights):
+        await database.run(Fight.prefetch_pigeons, fights)
+
+        announcements = []
+        pigeons = []
+        deaths = []
+        golds = {}
+        for fight in fights:
+            for pigeon in fight.pigeons:
+                pigeon.human = self.bot.human_cache.merge(pigeon.human)
+
+            won = random.randint(0, 1) == 0
+            guild = fight.guild
+            channel = self.get_announcement_channel(guild)
+
+            if won:
+                winner = fight.challenger
+                loser = fight.challengee
+            else:
+                winner = fight.challengee
+                loser = fight.challenger
 
-                asyncio.gather(channel.send(content = f"{winner.human.mention} | {loser.human.mention}", embed = embed))
+            embed = self.get_base_embed(guild)
+            embed.description = f"`{winner.name}` creeps into `{loser.name}`’s room. `{winner.name}`’s jaw unhinges and swallows `{loser.name}` whole."
 
-                winner.status = Pigeon.Status.idle
-                loser.status = Pigeon.Status.idle
+            winner_data = {"experience" : 30, "health" : -10}
+            loser_data = {"experience" : 5, "health" : -25}
 
-                winner_data["gold"] = fight.bet*2
-                winner.update_stats(winner_data)
-                loser.update_stats(loser_data)
+            embed.add_field(
+                name = f"💩 {loser.name} ({loser.human.user})",
+                value = get_winnings_value(**loser_data, gold = -fight.bet)
+            )
+            embed.add_field(
+                name = f"🏆 {winner.name} ({winner.human.user})",
+                value = get_winnings_value(**winner_data, gold = fight.bet)
+            )
 
-                fight.won = won
-                fight.finished = True
-                fight.save()
+            if channel is not None:
+                announcements.append((channel, {"content" : f"{winner.human.mention} | {loser.human.mention}", "embed" : embed}))
+
+            winner.status = Pigeon.Status.idle
+            loser.status = Pigeon.Status.idle
+
+            golds[winner.human_id] = golds.get(winner.human_id, 0) + fight.bet*2
+            for pigeon, data in ((winner, winner_data), (loser, loser_data)):
+                if pigeon.apply_stats(data):
+                    deaths.append(pigeon.human_id)
+                pigeons.append(pigeon)
+
+            fight.won = won
+            fight.finished = True
+
+        def commit():
+            fields = [Pigeon.experience, Pigeon.health, Pigeon.status, Pigeon.condition]
+            Pigeon.bulk_update(pigeons, fields = fields, batch_size = 1000)
+            Fight.bulk_update(fights, fields = [Fight.won, Fight.finished], batch_size = 1000)
+            self.bot.human_cache.add_gold(golds)
+            if deaths:
+                text = self.bot.translate("pigeon_dead")
+                SystemMessage.insert_many([{"human" : x, "text" : text} for x in deaths]).execute()
+
+        await database.atomic_run(commit)
+        self.bot.profiles.invalidate(*[x.human_id for x in pigeons])
+        for pigeon in pigeons:
+            pigeon.human.gold += golds.pop(pigeon.human_id, 0)
+            self.bot.leaderboards.update_human(pigeon.human)
+            self.bot.leaderboards.update_pigeon(pigeon)
+        self.announce(announcements)
 
     @tasks.loop(hours = 1)
     async def stats_ticker(self):
-        with database.connection_context():
-            query = Pigeon.select()
-            query = query.where(Pigeon.condition == Pigeon.Condition.active)
-            query = query.where(Pigeon.status == Pigeon.Status.idle)
-
-            for pigeon in query:
-                data = {
-                    "food"        : -1,
-                    "health"      : -0,
-                    "happiness"   : -1,
-                    "cleanliness" : -1,
-                }
-
-                for pigeon_buff in pigeon.buffs:
-                    if pigeon_buff.buff.code == "fully_fed":
-                        data["food"] = 0
-                    if pigeon_buff.buff.code == "bleeding":
-                        data["health"] += -2
-
-                if pigeon.food <= 20 or pigeon.cleanliness <= 20:
-                    data["health"] += -1
-                if pigeon.food == 0:
-                    data["health"] += -2
-
-                pigeon.update_stats(data)
-                pigeon.save()
+        dead = await database.atomic_run(Pigeon.decay_stats)
+        self.bot.profiles.clear()
+        for pigeon_id, human_id in dead:
+            self.bot.leaderboards.remove_pigeon(pigeon_id, human_id)
 
 def get_winnings_value(**kwargs):
     lines = []
@@ -2,7 +2,7 @@ import typing
 import datetime
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from emoji import emojize
 
 from src.discord.helpers.waiters import *
@@ -10,22 +10,33 @@ from src.discord.helpers.pretty import prettify_dict
 from src.discord.helpers.embed import Embed
 from src.discord.errors.base import SendableException
 import src.config as config
-from src.models import Change, Parameter, Poll, PollTemplate, Vote, database
+from src.models import Change, Parameter, Poll, PollTemplate, database
 from src.discord.cogs.core import BaseCog
 
 class PollCog(BaseCog, name = "Poll"):
 
     def __init__(self, bot):
         super().__init__(bot)
-        self.any_active_polls = (Poll.select().where(Poll.ended == False).count() > 0)
+        self.votes = bot.poll_votes
+
+    @property
+    def any_active_polls(self):
+        return self.votes.message_ids
 
     @commands.Cog.listener()
     async def on_ready(self):
-        self.start_task(self.poller, check = self.bot.production)
+        if self.bot.production:
+            await self.votes.load()
+            await self.bot.scheduler.register(
+                Poll,
+                self.end_polls,
+                due   = lambda x : x.due_date if not x.ended else None,
+                where = (Poll.ended == False)
+            )
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
-        if not self.any_active_polls:
+        if payload.message_id not in self.votes:
             return
         if not self.bot.production:
             return
@@ -37,49 +48,22 @@ class PollCog(BaseCog, name = "Poll"):
         if member.bot:
             return
 
-        channel = self.bot.get_channel(payload.channel_id)
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except discord.errors.NotFound:
-            return
-
-        if not message.author.bot:
+        poll = self.votes.get(payload.message_id)
+        option_id = poll.options.get(emoji)
+        if option_id is None:
             return
 
-        with database.connection_context():
-            try:
-                poll = Poll.get(message_id = payload.message_id, ended = False)
-            except Poll.DoesNotExist:
-                return
-
-            allowed_reactions = {x.reaction:x for x in poll.options}
+        if poll.anonymous:
+            channel = self.bot.get_channel(payload.channel_id)
+            self.bot.dispatcher.call(channel.get_partial_message(payload.message_id), "remove_reaction", emoji, member)
 
-            if emoji not in allowed_reactions:
-                return
+        if poll.role_id is not None:
+            role = member.guild.get_role(poll.role_id)
+            if role not in member.roles:
+                #TODO: translate!
+                return self.bot.dispatcher.send(member, embed = Embed.error(f"To vote for this poll you need the **{role}** role."))
 
-            if poll.anonymous:
-                asyncio.gather(message.remove_reaction(emoji, member))
-
-            option = allowed_reactions[emoji]
-
-            if poll.role_id_needed_to_vote is not None:
-                role = member.guild.get_role(poll.role_id_needed_to_vote)
-                if role not in member.roles:
-                    #TODO: translate!
-                    return asyncio.gather(member.send(embed = Embed.error(f"To vote for this poll you need the **{role}** role.")))
-
-            new_vote, created = Vote.get_or_create(option = option, user_id = member.id)
-
-            votes = [new_vote]
-            for option in poll.options:
-                vote = option.votes.where(Vote.user_id == member.id).first()
-                if vote is not None and vote not in votes:
-                    votes.append(vote)
-            votes.sort(key = lambda x : x.voted_on)
-
-            for i in range(0, len(votes)-poll.max_votes_per_user):
-                vote = votes[i]
-                vote.delete_instance()
+        self.votes.vote(payload.message_id, member.id, option_id)
 
     async def setup_poll(self, ctx, poll):
         prompt = lambda x : ctx.translate(f"poll_{x}_prompt")
@@ -171,7 +155,7 @@ class PollCog(BaseCog, name = "Poll"):
 
         poll.save()
 
-        asyncio.gather(ctx.send("OK"))
+        self.bot.dispatcher.send(ctx, content = "OK")
 
     @poll_group.command(name = "templateview")
     async def template_view(self, ctx, name):
@@ -207,7 +191,7 @@ class PollCog(BaseCog, name = "Poll"):
             title       = f"Config of poll-template '{name}'",
             description = f"```\n{lines}```"
         )
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @poll_group.command(name = "create")
     async def poll_create(self, ctx, template_name):
@@ -243,9 +227,9 @@ class PollCog(BaseCog, name = "Poll"):
 
         message = await poll.send()
         poll.message_id = message.id
-        self.any_active_polls = True
 
         poll.save()
+        self.votes.add_poll(poll)
 
     @poll_group.group(name = "change")
     async def change(self, ctx):
@@ -270,8 +254,8 @@ class PollCog(BaseCog, name = "Poll"):
 
         message = await poll.send()
         poll.message_id = message.id
-        self.any_active_polls = True
         poll.save()
+        self.votes.add_poll(poll)
 
     @change.command("create")
     async def change_create(self, ctx, type : str,  name : str):
@@ -291,33 +275,28 @@ class PollCog(BaseCog, name = "Poll"):
 
         message = await poll.send()
         poll.message_id = message.id
-        self.any_active_polls = True
         poll.save()
-
-    @tasks.loop(minutes=2)
-    async def poller(self):
-        with database:
-            query = Poll.select()
-            query = query.where(Poll.ended == False)
-            query = query.where(Poll.due_date <= datetime.datetime.utcnow())
-            for poll in query:
-                self.any_active_polls = True
-                if poll.type == Poll.Type.bool and poll.passed:
-                    for change in poll.changes:
-                        await change.implement()
-                        change.implemented = True
-                        change.save()
-
-                await poll.send_results()
-                poll.ended = True
-                if poll.delete_after_results:
-                    try:
-                        message = await poll.channel.fetch_message(poll.message_id)
-                        await message.delete()
-                    except:
-                        pass
-                self.any_active_polls = False
-                poll.save()
+        self.votes.add_poll(poll)
+
+    async def end_polls(self, polls):
+        await self.votes.flush_async()
+        for poll in polls:
+            if poll.type == Poll.Type.bool and poll.passed:
+                for change in poll.changes:
+                    await change.implement()
+                    change.implemented = True
+                    await database.run(change.save)
+
+            await poll.send_results()
+            poll.ended = True
+            if poll.delete_after_results:
+                try:
+                    message = await poll.channel.fetch_message(poll.message_id)
+                    await message.delete()
+                except:
+                    pass
+            self.votes.remove_poll(poll.message_id)
+            await database.run(poll.save)
 
 def setup(bot):
     bot.add_cog(PollCog(bot))
\ No newline at end of file
@@ -3,7 +3,7 @@ import datetime
 import random
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 
 from src.wrappers.zalgo import Zalgo
 import src.config as config
@@ -18,10 +18,39 @@ pranks_in_progress = []
 class Prank(BaseCog):
     def __init__(self, bot):
         super().__init__(bot)
+        self.nicknames = None
 
     @commands.Cog.listener()
     async def on_ready(self):
-        self.start_task(self.prank_poller, check = self.bot.production)
+        if not self.bot.production:
+            return
+
+        for cls in (NicknamePrank, RolePrank, EmojiPrank):
+            await self.bot.scheduler.register(
+                cls,
+                self.finish_pranks,
+                due   = lambda x : x.end_date if not x.finished else None,
+                where = (cls.finished == False)
+            )
+
+        if self.nicknames is None:
+            def fetch():
+                query = NicknamePrank.select(NicknamePrank, Prankster)
+                query = query.join(Prankster, on = (NicknamePrank.victim == Prankster.id))
+                query = query.where(NicknamePrank.finished == False)
+                return list(query)
+            self.nicknames = {}
+            for prank in await database.run(fetch):
+                self.track_nickname(prank)
+            NicknamePrank.add_save_listener(self.track_nickname)
+
+    def track_nickname(self, prank):
+        """ Keeps the nickname of every active nickname prank in memory so on_member_update can reapply it. """
+        key = (prank.victim.guild_id, prank.victim.user_id)
+        if prank.finished:
+            self.nicknames.pop(key, None)
+        else:
+            self.nicknames[key] = prank.new_nickname
 
     def get_random_words(self, zalgo = True, nick = True):
         generator = self.bot.get_random_reddit_words(
@@ -64,13 +93,26 @@ class Prank(BaseCog):
         if not self.bot.production:
             return
 
-        prankstee, _ = Prankster.get_or_create(user_id = message.author.id, guild_id = message.guild.id)
-        if not prankstee.pranked:
-            return
-        if prankstee.prank_type != Prankster.PrankType.emoji:
+        def fetch():
+            prankstee = Prankster.get_or_none(user_id = message.author.id, guild_id = message.guild.id)
+            if prankstee is not None and prankstee.pranked and prankstee.prank_type == Prankster.PrankType.emoji:
+                return prankstee, prankstee.current_prank
+            return prankstee, None
+
+        prankstee, prank = await database.run(fetch)
+        if prankstee is None:
+            # created on the loop thread, the leaderboards listen to the save.
+            Prankster.create(user_id = message.author.id, guild_id = message.guild.id)
+        elif prank is not None:
+            self.bot.dispatcher.call(message, "add_reaction", prank.emoji)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if not self.nicknames:
             return
-        prank = prankstee.current_prank
-        asyncio.gather(message.add_reaction(prank.emoji), return_exceptions = False)
+        nickname = self.nicknames.get((after.guild.id, after.id))
+        if nickname is not None and after.display_name != nickname:
+            self.bot.dispatcher.edit(after, nick = nickname)
 
     @commands.command()
     async def zalgo(self, ctx):
@@ -93,7 +135,7 @@ class Prank(BaseCog):
         prankster.enabled = values[ctx.invoked_with]
         prankster.last_pranked = None
         prankster.save()
-        asyncio.gather(ctx.send(f"Okay. Pranking is now " + ("on" if prankster.enabled else "off")))
+        self.bot.dispatcher.send(ctx, content = f"Okay. Pranking is now " + ("on" if prankster.enabled else "off"))
 
     @prank.command(name = "list")
     async def prank_list(self, ctx):
@@ -113,23 +155,12 @@ class Prank(BaseCog):
 
     @prank.command(name = "scoreboard")
     async def prank_scoreboard(self, ctx):
-        query = Prankster.select()
-        query = query.where(Prankster.guild_id == ctx.guild.id)
-
-        table = pretty.Table()
-        table.add_row(pretty.Row(("Prankster", "People pranked (nick)"), header = True))
-
-        for prankster in query:
-            member = prankster.member
-            if member is not None:
-                query = NicknamePrank.select()
-                query = query.where(NicknamePrank.finished == True)
-                query = query.where(NicknamePrank.pranked_by == prankster)
-                table.add_row(pretty.Row((str(member), query.count())))
+        board = self.bot.leaderboards.get_pranks(ctx.guild.id)
 
-        table.sort(1, int)
-
-        await table.to_paginator(ctx, 15).wait()
+        header = pretty.Row(("Prankster", "People pranked (nick)"), header = True)
+        to_row = lambda x, y, z : pretty.Row((ctx.guild.get_member(y), z))
+        source = pretty.TableSource.from_leaderboard(board, header, 15, to_row)
+        await source.to_paginator(ctx, start_page = board.page_of(ctx.author.id, 15)).wait()
 
     @prank.command(name = "stats")
     async def prank_stats(self, ctx, member : discord.Member = None):
@@ -156,7 +187,7 @@ class Prank(BaseCog):
 
         embed.add_field(name = f"Nickname Pranks", value = "\n".join(lines), inline = False)
 
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     async def prank_check(self, ctx, member, name = "human"):
         if member.bot:
@@ -330,28 +361,17 @@ class Prank(BaseCog):
                 human.add_item(Item.get(code = prank.item_code), 1)
             await ctx.success(ctx.translate("prank_reverted"))
 
-    @tasks.loop(minutes = 1)
-    async def prank_poller(self):
-        with database.connection_context():
-            pranks = [NicknamePrank, RolePrank, EmojiPrank]
-
-            for cls in pranks:
-                query = cls.select()
-                query = query.where(cls.finished == False)
-                if cls != NicknamePrank:
-                    query = query.where(cls.end_date <= datetime.datetime.utcnow())
-                for prank in query:
-                    if cls != NicknamePrank or prank.end_date_passed:
-                        prank.finished = True
-                        prank.victim.pranked = False
-                        prank.victim.prank_type = None
-                        prank.save()
-                        prank.victim.save()
-                        if prank.victim.member:
-                            asyncio.gather(prank.revert())
-                    else:
-                        if prank.should_reapply:
-                            asyncio.gather(prank.apply())
+    async def finish_pranks(self, pranks):
+        reverts = []
+        for prank in pranks:
+            prank.finished = True
+            prank.victim.pranked = False
+            prank.victim.prank_type = None
+            prank.save()
+            prank.victim.save()
+            if prank.victim.member:
+                reverts.append(prank.revert())
+        await asyncio.gather(*reverts, return_exceptions = True)
 
 def setup(bot):
     bot.add_cog(Prank(bot))
\ No newline at end of file
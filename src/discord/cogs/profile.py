@@ -11,30 +11,49 @@ import pycountry
 from src.models import Human, Earthling, HumanItem, Pigeon, Mail, Item, database
 from src.discord.helpers.converters import convert_to_date, EnumConverter
 from src.discord.helpers.waiters import *
+from src.discord.helpers.embed import Embed
 import src.discord.helpers.pretty as pretty
 from src.discord.errors.base import SendableException
 from src.utils.zodiac import ZodiacSign
 from src.discord.cogs.core import BaseCog
 
 def is_tester(member):
-    with database.connection_context():
-        human = config.bot.get_human(user = member)
-        return human.tester
+    human = config.bot.get_human(user = member)
+    return human.tester
 
 class CityWaiter(StrWaiter):
+    """ Looks the city up after the message arrived, with the async OWM client, since wait_for checks can not await. """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, max_words = None, **kwargs)
 
-    def convert(self, argument):
+    async def fetch(self, argument):
         if argument.isdigit():
-            city = self.bot.owm_api.by_id(argument)
-        else:
-            city = self.bot.owm_api.by_q(*argument.split(","))
+            return await self.bot.owm_api.fetch_by_id(argument)
+        return await self.bot.owm_api.fetch_by_q(*argument.split(",")[:2])
 
-        if city is None:
-            raise ConversionFailed("City was not found.")
+    async def wait(self, raw = False):
+        await self.ctx.channel.send(embed = self.embed)
 
-        return city
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.timeout
+        while True:
+            try:
+                message = await self.bot.wait_for("message", timeout = max(deadline - loop.time(), 0), check = self.check)
+            except asyncio.TimeoutError:
+                if self.verbose:
+                    await self.ctx.send("Timed out.")
+                return None
+
+            city = await self.fetch(self.converted)
+            if city is not None:
+                break
+            self.bot.dispatcher.send(message.channel, embed = Embed.error("City was not found. Try again."))
+
+        self.converted = city
+        if self.end_prompt is not None:
+            await message.channel.send(self.end_prompt.format(value = city))
+        return message if raw else city
 
 class Profile(BaseCog):
     def __init__(self, bot):
@@ -47,7 +66,7 @@ class Profile(BaseCog):
 
     @commands.command()
     async def parrot(self, ctx, *, text):
-        asyncio.gather(ctx.message.delete(), return_exceptions = False)
+        self.bot.dispatcher.call(ctx.message, "delete")
         with ctx.typing():
             cost = 10
 
@@ -55,7 +74,7 @@ class Profile(BaseCog):
             if human.gold < cost:
                 raise SendableException(ctx.translate("not_enough_gold").format(cost = cost))
 
-            asyncio.gather(ctx.send(text))
+            self.bot.dispatcher.send(ctx, content = text)
             human.gold -= cost
             human.save()
 
@@ -91,23 +110,13 @@ class Profile(BaseCog):
     @commands.command()
     @commands.guild_only()
     async def scoreboard(self, ctx):
-        query = Human.select()
-        query = query.join(Earthling, on=(Human.id == Earthling.human))
-        query = query.where(Earthling.guild_id == ctx.guild.id)
-        query = query.order_by(Human.gold.desc())
-
-        table = pretty.Table()
-        table.add_row(pretty.Row(["rank", "gold", "member"], header = True))
+        leaderboards = self.bot.leaderboards
+        board = leaderboards.get_gold(ctx.guild.id)
 
-        i = 0
-        for human in query:
-            user = human.user
-            if user is None:
-                continue
-            values = [f"{i+1}", str(human.gold), str(user)]
-            table.add_row(pretty.Row(values))
-            i += 1
-        await table.to_paginator(ctx, 15).wait()
+        header = pretty.Row(["rank", "gold", "member"], header = True)
+        to_row = lambda x, y, z : pretty.Row([x, z, ctx.guild.get_member(leaderboards.user_id(y))])
+        source = pretty.TableSource.from_leaderboard(board, header, 15, to_row)
+        await source.to_paginator(ctx, start_page = board.page_of(leaderboards.human_id(ctx.author.id), 15)).wait()
 
     @commands.group(aliases = ["balance", "wallet", "gold"])
     async def profile(self, ctx, members : commands.Greedy[discord.Member]):
@@ -118,7 +127,7 @@ class Profile(BaseCog):
 
         embed = discord.Embed(color = ctx.author.color)
         human = ctx.bot.get_human(user = member)
-        field = human.get_embed_field()
+        field = await human.get_embed_field()
         embed.title = field["name"]
         values = field["value"]
 
@@ -126,9 +135,9 @@ class Profile(BaseCog):
             embed.set_thumbnail(url = human.country.flag())
 
         footer = []
-        unread_mail = human.inbox.where(Mail.read == False).where(Mail.finished == True)
-        if len(unread_mail) > 0:
-            footer.append(f"You have {unread_mail.count()} unread mail! use '{ctx.prefix}inbox' to view")
+        unread_mail = self.bot.profiles.get(human).unread_mail
+        if unread_mail > 0:
+            footer.append(f"You have {unread_mail} unread mail! use '{ctx.prefix}inbox' to view")
 
         # embed.timestamp = human.next_birthday
         # if embed.timestamp is not None:
@@ -147,13 +156,14 @@ class Profile(BaseCog):
 
         humans = [ctx.get_human(user = x) for x in (ctx.author, member)]
         for human in humans:
-            embed.add_field(**human.get_embed_field(show_all = True))
+            embed.add_field(**(await human.get_embed_field(show_all = True)))
 
         cities = [x.city for x in humans]
         if None not in cities:
-            cities = [self.bot.owm_api.by_q(x.city, x.country.alpha_2 if self.country else None) for x in humans]
-            distance_in_km = int(cities[0].get_distance(cities[1]))
-            embed.set_footer(text = f"{distance_in_km}km away")
+            cities = await asyncio.gather(*[self.bot.owm_api.fetch_by_q(x.city, x.country.alpha_2 if x.country else None, max_age = None) for x in humans])
+            if None not in cities:
+                distance_in_km = int(cities[0].get_distance(cities[1]))
+                embed.set_footer(text = f"{distance_in_km}km away")
 
         await ctx.send(embed = embed)
 
@@ -168,7 +178,7 @@ class Profile(BaseCog):
         human.country       = None if "country" in fields else human.country
         human.date_of_birth = None if "dateofbirth" in fields else human.date_of_birth
         human.save()
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @profile.command(name = "setup")
     @commands.max_concurrency(1, per = commands.BucketType.user)
@@ -189,7 +199,7 @@ class Profile(BaseCog):
         if "country" in fields:
             await human.editor_for(ctx, "country")
 
-        timezone = human.calculate_timezone()
+        timezone = await human.calculate_timezone()
         if timezone is not None:
             human.timezone = timezone
 
@@ -253,7 +263,7 @@ class Profile(BaseCog):
 
     @commands.command()
     async def daily(self, ctx):
-        asyncio.gather(ctx.send(ctx.translate("not_implemented_yet")))
+        self.bot.dispatcher.send(ctx, content = ctx.translate("not_implemented_yet"))
 
     @commands.group()
     async def item(self, ctx):
@@ -366,13 +376,11 @@ class Profile(BaseCog):
 
     @item.command(name = "list")
     async def item_list(self, ctx):
-        items = Item.select().order_by(Item.chance.desc())
+        query = Item.select().order_by(Item.chance.desc(), Item.id)
 
-        table = pretty.Table()
-        table.add_row(pretty.Row(("name", "rarity"), header = True))
-        for item in items:
-            table.add_row(pretty.Row((item.name, item.rarity.name)))
-        await table.to_paginator(ctx, 15).wait()
+        header = pretty.Row(("name", "rarity"), header = True)
+        to_row = lambda x : pretty.Row((x.name, x.rarity.name))
+        await pretty.TableSource.from_query(query, header, 15, to_row).to_paginator(ctx).wait()
 
     @item.command(name = "usable")
     async def item_usable(self, ctx):
@@ -386,10 +394,11 @@ class Profile(BaseCog):
     async def inventory(self, ctx, member : discord.Member = None):
         human = ctx.get_human(user = (member or ctx.author))
 
-        data = [(x.item.name, x.amount) for x in human.human_items if x.amount > 0]
-        data.insert(0, ("name", "amount"))
-        table = pretty.Table.from_list(data, first_header = True)
-        await table.to_paginator(ctx, 15).wait()
+        human_items = [x for x in self.bot.profiles.get(human).human_items if x.amount > 0]
+
+        header = pretty.Row(("name", "amount"), header = True)
+        to_row = lambda x : pretty.Row((x.item.name, x.amount))
+        await pretty.TableSource.from_list(human_items, header, 15, to_row = to_row).to_paginator(ctx).wait()
 
     @item.command(name = "view")
     async def item_view(self, ctx,*, name):
@@ -402,19 +411,18 @@ class Profile(BaseCog):
 
     @tasks.loop(hours = 24)
     async def earthling_purger(self):
-        with database.connection_context():
-            to_purge = []
-            earthlings = list(Earthling)
-            for earthling in earthlings:
-                if earthling.guild is None or earthling.member is None:
-                    to_purge.append(earthling)
-
-            if len(to_purge) != len(earthlings):
-                for earthling in to_purge:
-                    role = earthling.personal_role
-                    if role is not None:
-                        await role.delete()
-                    earthling.delete_instance()
+        to_purge = []
+        earthlings = await database.run(list, Earthling.select())
+        for earthling in earthlings:
+            if earthling.guild is None or earthling.member is None:
+                to_purge.append(earthling)
+
+        if len(to_purge) != len(earthlings):
+            for earthling in to_purge:
+                role = earthling.personal_role
+                if role is not None:
+                    await role.delete()
+                earthling.delete_instance()
 
 def setup(bot):
     bot.add_cog(Profile(bot))
\ No newline at end of file
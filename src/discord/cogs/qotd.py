@@ -91,7 +91,8 @@ class QotdCog(BaseCog, name = "Question of the day"):
 
     @tasks.loop(minutes = 5)
     async def poller(self):
-        with database.connection_context():
+        def ask():
+            asked = []
             query = CategoryChannel.select()
             query = query.where( (CategoryChannel.last_day == None) | (CategoryChannel.last_day < datetime.datetime.utcnow().date()) )
             for category_channel in query:
@@ -110,8 +111,11 @@ class QotdCog(BaseCog, name = "Question of the day"):
                 question_config.save()
                 category_channel.last_day = datetime.datetime.utcnow().date()
                 category_channel.save()
+                asked.append((category_channel, question))
+            return asked
 
-                asyncio.gather(category_channel.channel.send(question.value))
+        for category_channel, question in await database.run(ask):
+            self.bot.dispatcher.send(category_channel.channel, content = question.value)
 
 def setup(bot):
     bot.add_cog(QotdCog(bot))
\ No newline at end of file
@@ -47,7 +47,7 @@ class RedditCog(BaseCog, name = "Reddit"):
 
         names = "\n".join(names)
         embed.description = f"```\n{names}```"
-        asyncio.gather(ctx.send(embed = embed))
+        self.bot.dispatcher.send(ctx, embed = embed)
 
     @reddit.command(name = "add", aliases = ["+"])
     async def reddit_add(self, ctx, subreddit : SubredditConverter, post_type : EnumConverter(Subreddit.PostType) = Subreddit.PostType.hot):
@@ -66,7 +66,7 @@ class RedditCog(BaseCog, name = "Reddit"):
         )
 
         await subreddit.send()
-        asyncio.gather(ctx.success())
+        await ctx.success()
 
     @reddit.command(name = "remove", aliases = ["-"])
     async def reddit_remove(self, ctx, subreddit : SubredditConverter, post_type : EnumConverter(Subreddit.PostType) = Subreddit.PostType.hot):
@@ -76,9 +76,12 @@ class RedditCog(BaseCog, name = "Reddit"):
 
     @tasks.loop(hours = 1)
     async def feed_sender(self):
-        for subreddit in Subreddit.select().where(Subreddit.automatic == True).order_by(Subreddit.channel_id.desc()):
+        query = Subreddit.select()
+        query = query.where(Subreddit.automatic == True)
+        query = query.order_by(Subreddit.channel_id.desc())
+        for subreddit in await database.run(list, query):
             try:
-                asyncio.gather(subreddit.send())
+                await subreddit.send()
             except Exception as e:
                 print(subreddit.id, e)
                 pass
@@ -0,0 +1,89 @@
+import datetime
+
+from src.models import Human, Earthling, database
+
+class ActivityTracker:
+    """ Last activity per (guild_id, user_id), kept in memory and written to Earthling.last_active in bulk by flush().
+        Missing humans and earthlings are created in the same flush.
+    """
+
+    def __init__(self):
+        self._seen      = {}
+        self._known     = set()
+        self._human_ids = {}
+        self.flushes    = 0
+        self.written    = 0
+
+    def __len__(self):
+        return len(self._seen)
+
+    def touch(self, guild_id, user_id, when = None):
+        self._seen[(guild_id, user_id)] = when or datetime.datetime.utcnow()
+
+    def last_seen(self, guild_id, user_id):
+        """ Activity that has not been flushed yet, None when there is none. """
+        return self._seen.get((guild_id, user_id))
+
+    def _restore(self, pending):
+        for key, when in pending.items():
+            if key not in self._seen or self._seen[key] < when:
+                self._seen[key] = when
+
+    def _load_human_ids(self, user_ids):
+        missing = [x for x in user_ids if x not in self._human_ids]
+        if not missing:
+            return
+        Human.insert_many([{"user_id" : x} for x in missing]).on_conflict_ignore().execute()
+        for human_id, user_id in Human.select(Human.id, Human.user_id).where(Human.user_id.in_(missing)).tuples():
+            self._human_ids[user_id] = human_id
+
+    def _find_new(self, keys):
+        unknown = [x for x in keys if x not in self._known]
+        if not unknown:
+            return []
+
+        query = Earthling.select(Earthling.guild_id, Earthling.user_id)
+        query = query.where(Earthling.guild_id.in_(list(set(x[0] for x in unknown))))
+        query = query.where(Earthling.user_id.in_(list(set(x[1] for x in unknown))))
+        existing = set(query.tuples())
+        return [x for x in unknown if x not in existing]
+
+    def _write(self, pending):
+        self._load_human_ids(set(x[1] for x in pending))
+        new = self._find_new(pending)
+
+        rows = []
+        for (guild_id, user_id), when in pending.items():
+            rows.append({"guild_id" : guild_id, "user_id" : user_id, "human" : self._human_ids[user_id], "last_active" : when})
+        Earthling.insert_many(rows).on_conflict(preserve = [Earthling.last_active]).execute()
+        self._known.update(pending)
+
+        if not new:
+            return []
+        query = Earthling.select(Earthling, Human)
+        query = query.join(Human, on = (Earthling.human == Human.id))
+        query = query.where(Earthling.guild_id.in_(list(set(x[0] for x in new))))
+        query = query.where(Earthling.user_id.in_(list(set(x[1] for x in new))))
+        new = set(new)
+        return [x for x in query if (x.guild_id, x.user_id) in new]
+
+    def flush(self):
+        """ Writes everything seen since the last flush, returns the earthlings that were created. """
+        pending, self._seen = self._seen, {}
+        if not pending:
+            return []
+        try:
+            with database.atomic():
+                created = self._write(pending)
+        except Exception:
+            self._restore(pending)
+            raise
+        self.flushes += 1
+        self.written += len(pending)
+        return created
+
+    async def flush_async(self):
+        created = await database.run(self.flush)
+        for earthling in created:
+            earthling.notify_saved()
+        return created
@@ -1,10 +1,9 @@
 from discord.ext import commands
-from src.models import Human, database
+from src.models import Human
 import src.config as config
 
 def is_tester():
     def predicate(ctx):
-        with database.connection_context():
-            human = config.bot.get_human(user = ctx.author)
-            return human.tester
+        human = config.bot.get_human(user = ctx.author)
+        return human.tester
     return commands.check(predicate)
\ No newline at end of file
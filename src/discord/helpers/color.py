@@ -0,0 +1,103 @@
+import io
+import asyncio
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+import discord
+
+from src.models import DominantColor, database
+from src.utils.cache import LRUCache
+from src.wrappers.color_thief import ColorThief
+
+def compute_dominant_color(data, quality = 1):
+    return ColorThief(io.BytesIO(data)).get_color(quality = quality)
+
+class DominantColorService:
+    """ Dominant colours of images, computed in a process pool and persisted by url.
+        get() never waits: it returns the known or default colour and computes missing ones in the background.
+        Urls that failed are not tried again by get() for failure_ttl seconds.
+    """
+
+    def __init__(self, default = None, max_workers = 2, failure_ttl = 3600):
+        self.default     = default or discord.Color.blurple()
+        self.max_workers = max_workers
+        self._colors     = {}
+        self._failed     = LRUCache(max_size = 4096, ttl = failure_ttl)
+        self._pending    = {}
+        self._executor   = None
+        self._session    = None
+
+    @staticmethod
+    def hash(url):
+        return hashlib.sha1(str(url).encode("utf8")).hexdigest()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers = self.max_workers)
+        return self._executor
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout = aiohttp.ClientTimeout(total = 10))
+        return self._session
+
+    async def load(self):
+        def fetch():
+            return list(DominantColor.select(DominantColor.url_hash, DominantColor.color).tuples())
+        for url_hash, color in await database.run(fetch):
+            self._colors[url_hash] = discord.Color(color)
+
+    async def _calculate(self, url, url_hash):
+        try:
+            async with self.session.get(str(url)) as response:
+                response.raise_for_status()
+                data = await response.read()
+
+            loop = asyncio.get_event_loop()
+            color = discord.Color.from_rgb(*await loop.run_in_executor(self.executor, compute_dominant_color, data))
+            self._colors[url_hash] = color
+
+            def persist():
+                query = DominantColor.insert(url_hash = url_hash, url = str(url), color = color.value)
+                query.on_conflict(preserve = [DominantColor.color]).execute()
+            await database.run(persist)
+            return color
+        except Exception:
+            self._failed[url_hash] = True
+            raise
+        finally:
+            self._pending.pop(url_hash, None)
+
+    def _schedule(self, url):
+        url_hash = self.hash(url)
+        if url_hash not in self._pending:
+            task = asyncio.ensure_future(self._calculate(url, url_hash))
+            task.add_done_callback(lambda x : x.cancelled() or x.exception())
+            self._pending[url_hash] = task
+        return self._pending[url_hash]
+
+    def get(self, url):
+        if url is None:
+            return self.default
+        url_hash = self.hash(url)
+        color = self._colors.get(url_hash)
+        if color is None:
+            if url_hash not in self._failed:
+                self._schedule(url)
+            return self.default
+        return color
+
+    async def calculate(self, url):
+        color = self._colors.get(self.hash(url))
+        if color is not None:
+            return color
+        return await self._schedule(url)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait = False)
@@ -0,0 +1,186 @@
+import time
+import random
+import asyncio
+import traceback
+from collections import deque
+
+import discord
+
+class TokenBucket:
+    """ Allows rate actions per per seconds, refilled continuously. """
+
+    __slots__ = ("rate", "per", "clock", "tokens", "updated")
+
+    def __init__(self, rate, per, clock = time.monotonic):
+        self.rate    = rate
+        self.per     = per
+        self.clock   = clock
+        self.tokens  = float(rate)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens  = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def delay(self):
+        """ Seconds until a token is available, 0 when one is available now. """
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    async def acquire(self):
+        delay = self.delay()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self.delay()
+        self.consume()
+
+class Job:
+    __slots__ = ("method", "target", "args", "kwargs", "future", "attempts")
+
+    def __init__(self, method, target, kwargs, future, args = ()):
+        self.method   = method
+        self.target   = target
+        self.args     = args
+        self.kwargs   = kwargs
+        self.future   = future
+        self.attempts = 0
+
+    def __call__(self):
+        return getattr(self.target, self.method)(*self.args, **self.kwargs)
+
+class Dispatcher:
+    """ Sends, edits and other requests go through one queue per channel, paced by a token bucket per channel and a global one.
+        Pending edits of the same message are merged into one, failed requests are retried with backoff
+        when Discord is rate limiting or having trouble. Returned futures resolve to what discord.py returns.
+    """
+
+    channel_rate = (5, 5)
+    global_rate  = (50, 1)
+    max_retries  = 3
+    base_delay   = 1
+
+    def __init__(self, concurrency = 8, clock = time.monotonic):
+        self.clock     = clock
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket    = TokenBucket(*self.global_rate, clock = clock)
+        self._buckets  = {}
+        self._queues   = {}
+        self._edits    = {}
+        self._workers  = {}
+        self.metrics   = {"sent": 0, "edited": 0, "called": 0, "coalesced": 0, "retried": 0, "failed": 0, "waited": 0.0}
+
+    @property
+    def pending(self):
+        return sum(len(x) for x in self._queues.values())
+
+    @staticmethod
+    def channel_key(sendable):
+        channel = getattr(sendable, "channel", sendable)
+        if isinstance(channel, (discord.User, discord.Member)):
+            return ("user", channel.id)
+        return getattr(channel, "id", id(channel))
+
+    def _future(self):
+        future = asyncio.get_event_loop().create_future()
+        # failures are already logged by the dispatcher, callers that do not await are not warned twice.
+        future.add_done_callback(lambda x : x.cancelled() or x.exception())
+        return future
+
+    def send(self, sendable, **kwargs):
+        """ Queues sendable.send(**kwargs), sendable being anything discord.py can send to. """
+        job = Job("send", sendable, kwargs, self._future())
+        self._enqueue(self.channel_key(sendable), job)
+        return job.future
+
+    def edit(self, message, **kwargs):
+        """ Queues message.edit(**kwargs), merged into an edit of the same message that has not been made yet. """
+        job = self._edits.get(message.id)
+        if job is not None:
+            job.kwargs.update(kwargs)
+            self.metrics["coalesced"] += 1
+            return job.future
+
+        job = Job("edit", message, kwargs, self._future())
+        self._edits[message.id] = job
+        self._enqueue(self.channel_key(message), job)
+        return job.future
+
+    def call(self, target, method, *args, **kwargs):
+        """ Queues target.method(*args, **kwargs) with the requests of the channel of target, for reactions, deletes and the like. """
+        job = Job(method, target, kwargs, self._future(), args)
+        self._enqueue(self.channel_key(target), job)
+        return job.future
+
+    def _enqueue(self, key, job):
+        self._queues.setdefault(key, deque()).append(job)
+        worker = self._workers.get(key)
+        if worker is None or worker.done():
+            self._workers[key] = asyncio.ensure_future(self._work(key))
+
+    def _bucket(self, key):
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(*self.channel_rate, clock = self.clock)
+        return self._buckets[key]
+
+    async def _work(self, key):
+        queue = self._queues[key]
+        bucket = self._bucket(key)
+        while queue:
+            job = queue.popleft()
+            if job.method == "edit" and self._edits.get(job.target.id) is job:
+                del self._edits[job.target.id]
+
+            started = self.clock()
+            await bucket.acquire()
+            await self.bucket.acquire()
+            self.metrics["waited"] += self.clock() - started
+
+            await self._perform(job)
+
+        self._queues.pop(key, None)
+        self._workers.pop(key, None)
+
+    def _should_retry(self, exception):
+        if isinstance(exception, discord.HTTPException):
+            return exception.status == 429 or exception.status >= 500
+        return isinstance(exception, (asyncio.TimeoutError, OSError))
+
+    async def _perform(self, job):
+        while True:
+            try:
+                # the semaphore is only held for the request itself, not for the backoff.
+                async with self.semaphore:
+                    result = await job()
+            except Exception as e:
+                if self._should_retry(e) and job.attempts < self.max_retries:
+                    job.attempts += 1
+                    self.metrics["retried"] += 1
+                    await asyncio.sleep(self.base_delay * (2 ** job.attempts) * random.uniform(0.5, 1.5))
+                    continue
+                self.metrics["failed"] += 1
+                traceback.print_exc()
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+
+            self.metrics[{"send" : "sent", "edit" : "edited"}.get(job.method, "called")] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+            return
+
+    def stop(self):
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+        self._edits.clear()
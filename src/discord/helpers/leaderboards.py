@@ -0,0 +1,218 @@
+from src.models import Human, Earthling, Pigeon, Prankster, NicknamePrank, database
+from src.utils.leaderboard import Leaderboard
+
+class GuildLeaderboards:
+    """ Per guild leaderboards for gold, pigeon experience and nickname pranks.
+        Seeded once from the database, then kept up to date by save listeners and by the bulk writers.
+        Members that left a guild are taken off its boards and put back when they rejoin.
+    """
+
+    def __init__(self):
+        self.gold        = {}
+        self.experience  = {}
+        self.pranks      = {}
+        self._guilds     = {}
+        self._users      = {}
+        self._humans     = {}
+        self._gold       = {}
+        self._pigeons    = {}
+        self._pranksters = {}
+        self._counted    = set()
+        self._away       = {}
+        self.loaded      = False
+
+    def user_id(self, human_id):
+        return self._users.get(human_id)
+
+    def human_id(self, user_id):
+        return self._humans.get(user_id)
+
+    def is_away(self, guild_id, user_id):
+        return (guild_id, user_id) in self._away
+
+    def pigeon_name(self, human_id):
+        pigeon = self._pigeons.get(human_id)
+        if pigeon is not None:
+            return pigeon[1]
+
+    def _board(self, boards, guild_id):
+        if guild_id not in boards:
+            boards[guild_id] = Leaderboard()
+        return boards[guild_id]
+
+    def get_gold(self, guild_id):
+        return self._board(self.gold, guild_id)
+
+    def get_experience(self, guild_id):
+        return self._board(self.experience, guild_id)
+
+    def get_pranks(self, guild_id):
+        return self._board(self.pranks, guild_id)
+
+    @staticmethod
+    def _fetch():
+        query = Earthling.select(Earthling.guild_id, Earthling.user_id, Human.id, Human.gold)
+        query = query.join(Human, on = (Earthling.human == Human.id))
+        earthlings = list(query.tuples())
+
+        query = Pigeon.select(Pigeon.id, Pigeon.human, Pigeon.name, Pigeon.experience)
+        query = query.where(Pigeon.condition == Pigeon.Condition.active)
+        pigeons = list(query.tuples())
+
+        pranksters = list(Prankster.select(Prankster.id, Prankster.guild_id, Prankster.user_id).tuples())
+
+        query = NicknamePrank.select(NicknamePrank.id, NicknamePrank.pranked_by)
+        query = query.where(NicknamePrank.finished == True)
+        pranks = list(query.tuples())
+
+        return earthlings, pigeons, pranksters, pranks
+
+    async def load(self, is_member = None):
+        """ is_member(guild_id, user_id) tells which members are still in their guild, everyone is when it is None. """
+        earthlings, pigeons, pranksters, pranks = await database.run(self._fetch)
+
+        gold = {}
+        self._guilds = {}
+        self._users  = {}
+        self._humans = {}
+        self._gold   = {}
+        for guild_id, user_id, human_id, amount in earthlings:
+            gold.setdefault(guild_id, {})[human_id] = amount
+            self._guilds.setdefault(human_id, set()).add(guild_id)
+            self._users[human_id] = user_id
+            self._humans[user_id] = human_id
+            self._gold[human_id]  = amount
+
+        experience = {}
+        self._pigeons = {}
+        for pigeon_id, human_id, name, amount in pigeons:
+            self._pigeons[human_id] = (pigeon_id, name, amount)
+            for guild_id in self._guilds.get(human_id, ()):
+                experience.setdefault(guild_id, {})[human_id] = amount
+
+        counts = {}
+        self._pranksters = {}
+        for prankster_id, guild_id, user_id in pranksters:
+            self._pranksters[prankster_id] = (guild_id, user_id)
+            counts.setdefault(guild_id, {})[user_id] = 0
+        self._counted = set()
+        for prank_id, prankster_id in pranks:
+            self._counted.add(prank_id)
+            if prankster_id in self._pranksters:
+                guild_id, user_id = self._pranksters[prankster_id]
+                counts[guild_id][user_id] += 1
+
+        self.gold       = {k : Leaderboard(v) for k, v in gold.items()}
+        self.experience = {k : Leaderboard(v) for k, v in experience.items()}
+        self.pranks     = {k : Leaderboard(v) for k, v in counts.items()}
+
+        self._away = {}
+        if is_member is not None:
+            members = set((x[0], x[1]) for x in earthlings) | set(self._pranksters.values())
+            for guild_id, user_id in members:
+                if not is_member(guild_id, user_id):
+                    self.remove_member(guild_id, user_id)
+
+        if not self.loaded:
+            Human.add_save_listener(self.update_human)
+            Earthling.add_save_listener(self.update_earthling)
+            Pigeon.add_save_listener(self.update_pigeon)
+            Prankster.add_save_listener(self.update_prankster)
+            NicknamePrank.add_save_listener(self.update_prank)
+            Earthling.add_delete_listener(self.remove_earthling)
+        self.loaded = True
+
+    def _present_guilds(self, human_id):
+        user_id = self._users.get(human_id)
+        return [x for x in self._guilds.get(human_id, ()) if (x, user_id) not in self._away]
+
+    def _set_scores(self, guild_id, human_id):
+        self.get_gold(guild_id).set(human_id, self._gold.get(human_id, 0))
+        pigeon = self._pigeons.get(human_id)
+        if pigeon is not None:
+            self.get_experience(guild_id).set(human_id, pigeon[2])
+
+    def remove_member(self, guild_id, user_id):
+        """ Takes a member that left off the boards of the guild, prank counts are kept until they rejoin. """
+        if (guild_id, user_id) in self._away:
+            return
+        pranks = self.get_pranks(guild_id)
+        self._away[(guild_id, user_id)] = pranks.score(user_id)
+        pranks.remove(user_id)
+        human_id = self._humans.get(user_id)
+        if human_id is not None:
+            self.get_gold(guild_id).remove(human_id)
+            self.get_experience(guild_id).remove(human_id)
+
+    def add_member(self, guild_id, user_id):
+        if (guild_id, user_id) not in self._away:
+            return
+        count = self._away.pop((guild_id, user_id))
+        if count is not None:
+            self.get_pranks(guild_id).set(user_id, count)
+        human_id = self._humans.get(user_id)
+        if human_id is not None and guild_id in self._guilds.get(human_id, ()):
+            self._set_scores(guild_id, human_id)
+
+    def remove_earthling(self, earthling):
+        human_id = earthling.global_human_id
+        self._guilds.get(human_id, set()).discard(earthling.guild_id)
+        self._away.pop((earthling.guild_id, earthling.user_id), None)
+        self.get_gold(earthling.guild_id).remove(human_id)
+        self.get_experience(earthling.guild_id).remove(human_id)
+        self.get_pranks(earthling.guild_id).remove(earthling.user_id)
+
+    def update_human(self, human):
+        self._gold[human.id] = human.gold
+        for guild_id in self._present_guilds(human.id):
+            self.get_gold(guild_id).set(human.id, human.gold)
+
+    def update_earthling(self, earthling):
+        human_id = earthling.global_human_id
+        guilds = self._guilds.setdefault(human_id, set())
+        if earthling.guild_id in guilds:
+            return
+        guilds.add(earthling.guild_id)
+        self._users[human_id]           = earthling.user_id
+        self._humans[earthling.user_id] = human_id
+        self._gold[human_id]            = earthling.human.gold
+        if (earthling.guild_id, earthling.user_id) not in self._away:
+            self._set_scores(earthling.guild_id, human_id)
+
+    def update_pigeon(self, pigeon):
+        if pigeon.condition == Pigeon.Condition.active:
+            self._pigeons[pigeon.human_id] = (pigeon.id, pigeon.name, pigeon.experience)
+            for guild_id in self._present_guilds(pigeon.human_id):
+                self.get_experience(guild_id).set(pigeon.human_id, pigeon.experience)
+        else:
+            self.remove_pigeon(pigeon.id, pigeon.human_id)
+
+    def remove_pigeon(self, pigeon_id, human_id):
+        current = self._pigeons.get(human_id)
+        if current is None or current[0] != pigeon_id:
+            return
+        del self._pigeons[human_id]
+        for guild_id in self._guilds.get(human_id, ()):
+            self.get_experience(guild_id).remove(human_id)
+
+    def update_prankster(self, prankster):
+        self._pranksters[prankster.id] = (prankster.guild_id, prankster.user_id)
+        key = (prankster.guild_id, prankster.user_id)
+        if key in self._away:
+            if self._away[key] is None:
+                self._away[key] = 0
+            return
+        board = self.get_pranks(prankster.guild_id)
+        if prankster.user_id not in board:
+            board.set(prankster.user_id, 0)
+
+    def update_prank(self, prank):
+        if not prank.finished or prank.id in self._counted:
+            return
+        self._counted.add(prank.id)
+        if prank.pranked_by_id in self._pranksters:
+            key = self._pranksters[prank.pranked_by_id]
+            if key in self._away:
+                self._away[key] = (self._away[key] or 0) + 1
+            else:
+                self.get_pranks(key[0]).add(key[1], 1)
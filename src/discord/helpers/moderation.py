@@ -0,0 +1,257 @@
+import re
+import time
+import asyncio
+from enum import Enum
+from collections import deque
+
+import discord
+
+from src.models import ModerationRule, SpamThreshold, database
+from src.utils.cache import LRUCache
+
+class MaliciousAction(Enum):
+    blacklisted_word = 1
+    invite_url       = 2
+    spam             = 3
+
+    @property
+    def ban_reason(self):
+        if self == self.blacklisted_word:
+            return "Using blacklisted word(s)"
+        elif self == self.invite_url:
+            return "Advertising"
+        elif self == self.spam:
+            return "Spam"
+
+invite_pattern = re.compile(r'discord(?:\.com|app\.com|\.gg)/(?:invite/)?([a-zA-Z0-9\-]{2,32})')
+
+_leetspeak = str.maketrans("013457@$", "oieastas")
+
+def normalize(text):
+    """ Lowercase with leetspeak replaced by letters, one character for every character. """
+    return text.lower().translate(_leetspeak)
+
+class WordAutomaton:
+    """ Aho-Corasick automaton, finds every word in one pass over the normalized text.
+        Words added with whole_word only match when they are not part of a longer word.
+    """
+
+    def __init__(self, words):
+        self._goto   = [{}]
+        self._fail   = [0]
+        self._output = [[]]
+
+        for word, whole_word in words:
+            word = normalize(word)
+            if not word:
+                continue
+            state = 0
+            for character in word:
+                next_state = self._goto[state].get(character)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][character] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((word, whole_word))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and character not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(character, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __bool__(self):
+        return len(self._goto) > 1
+
+    def find(self, text):
+        if not self:
+            return []
+
+        text = normalize(text)
+        found = []
+        state = 0
+        for i, character in enumerate(text):
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+
+            for word, whole_word in self._output[state]:
+                if whole_word:
+                    start = i - len(word) + 1
+                    if (start > 0 and text[start-1].isalnum()) or (i+1 < len(text) and text[i+1].isalnum()):
+                        continue
+                if word not in found:
+                    found.append(word)
+        return found
+
+class SpamDetector:
+    """ Recent (time, content hash, mentions) of every user in a ring buffer and recent message times per channel.
+        Both are LRU evicted, so memory stays bounded by max_users and max_channels, and every check looks at a bounded number of entries.
+        While a channel gets more than channel_factor times the message threshold the per user threshold is halved.
+    """
+
+    buffer_size          = 16
+    duplicate_seconds    = 60
+    duplicate_min_length = 8
+    channel_factor       = 3
+
+    def __init__(self, max_users = 100000, max_channels = 10000, clock = time.monotonic):
+        self.clock     = clock
+        self._users    = LRUCache(max_size = max_users)
+        self._channels = LRUCache(max_size = max_channels)
+        self.flagged   = 0
+
+    def _buffer(self, cache, key, size):
+        buffer = cache.get(key)
+        if buffer is None or buffer.maxlen != size:
+            buffer = deque(buffer or (), maxlen = size)
+            cache[key] = buffer
+        return buffer
+
+    @staticmethod
+    def _burst(times, count, seconds, now):
+        """ Whether the last count times all fall within seconds of now. """
+        return count > 0 and len(times) >= count and now - times[-count] <= seconds
+
+    def observe(self, guild_id, channel_id, user_id, content, mentions, thresholds, now = None):
+        """ Records a message, returns why it is spam or None. A flagged user starts over with an empty buffer.
+            Content shorter than duplicate_min_length (attachments, short replies, commands) is never counted as a duplicate.
+        """
+        now = self.clock() if now is None else now
+
+        # with the message check off there is no burst to detect, per user or per channel.
+        raid = False
+        if thresholds.messages > 0:
+            channel = self._buffer(self._channels, channel_id, thresholds.messages * self.channel_factor)
+            channel.append(now)
+            raid = self._burst(channel, channel.maxlen, thresholds.seconds, now)
+
+        size = max(self.buffer_size, thresholds.messages, thresholds.duplicates)
+        entries = self._buffer(self._users, (guild_id, user_id), size)
+        content = content.strip().lower()
+        entries.append((now, hash(content) if len(content) >= self.duplicate_min_length else None, mentions))
+
+        reason = None
+        messages = max(thresholds.messages // 2, 2) if raid else thresholds.messages
+        if thresholds.messages > 0 and self._burst([x[0] for x in entries], messages, thresholds.seconds, now):
+            reason = f"{messages} messages within {thresholds.seconds} seconds"
+        elif thresholds.duplicates > 0 and len(entries) >= thresholds.duplicates:
+            recent = list(entries)[-thresholds.duplicates:]
+            hashes = set(x[1] for x in recent)
+            if len(hashes) == 1 and None not in hashes and now - recent[0][0] <= self.duplicate_seconds:
+                reason = f"The same message {thresholds.duplicates} times"
+        if reason is None and thresholds.mentions > 0:
+            if sum(x[2] for x in entries if now - x[0] <= thresholds.seconds) >= thresholds.mentions:
+                reason = f"{thresholds.mentions} or more mentions within {thresholds.seconds} seconds"
+
+        if reason is not None:
+            entries.clear()
+            self.flagged += 1
+        return reason
+
+class Verdict:
+    __slots__ = ("action", "member", "message", "words", "invites", "reason")
+
+    def __init__(self, action, member, message = None, words = (), invites = (), reason = None):
+        self.action  = action
+        self.member  = member
+        self.message = message
+        self.words   = words
+        self.invites = invites
+        self.reason  = reason
+
+class ModerationEngine:
+    """ Judges messages against the word rules of their guild and against invites to other guilds.
+        Rules are compiled per guild on first use and again after one is saved, invite lookups are cached for invite_ttl seconds.
+    """
+
+    default_words = ("retard", "nigger")
+
+    def __init__(self, bot, invite_ttl = 3600):
+        self.bot         = bot
+        self.spam        = SpamDetector()
+        self._automatons = {}
+        self._thresholds = {}
+        self._invites    = LRUCache(max_size = 4096, ttl = invite_ttl)
+        ModerationRule.add_save_listener(lambda x : self.invalidate(x.guild_id))
+        SpamThreshold.add_save_listener(lambda x : self._thresholds.pop(x.guild_id, None))
+
+    def invalidate(self, guild_id):
+        self._automatons.pop(guild_id, None)
+
+    @staticmethod
+    def load_thresholds(guild_id):
+        return SpamThreshold.get_or_none(SpamThreshold.guild_id == guild_id) or SpamThreshold(guild_id = guild_id)
+
+    async def get_thresholds(self, guild_id):
+        thresholds = self._thresholds.get(guild_id)
+        if thresholds is None:
+            thresholds = await database.run(self.load_thresholds, guild_id)
+            self._thresholds[guild_id] = thresholds
+        return thresholds
+
+    @staticmethod
+    def load_rules(guild_id):
+        query = ModerationRule.select(ModerationRule.word, ModerationRule.whole_word)
+        query = query.where(ModerationRule.guild_id == guild_id)
+        return list(query.tuples())
+
+    async def get_automaton(self, guild_id):
+        """ The rules of the guild, the default words always apply on top of them. """
+        automaton = self._automatons.get(guild_id)
+        if automaton is None:
+            rules = await database.run(self.load_rules, guild_id)
+            words = set(x[0] for x in rules)
+            rules.extend((x, False) for x in self.default_words if x not in words)
+            automaton = WordAutomaton(rules)
+            self._automatons[guild_id] = automaton
+        return automaton
+
+    async def _fetch_guild_id(self, code):
+        try:
+            invite = await self.bot.fetch_invite(code)
+        except discord.errors.NotFound:
+            return None
+        return invite.guild.id if invite.guild is not None else None
+
+    async def resolve_invites(self, codes):
+        """ Guild id per invite code, None for invites that do not exist. Codes that could not be looked up are left out. """
+        codes = list(dict.fromkeys(codes))
+        missing = [x for x in codes if x not in self._invites]
+        results = await asyncio.gather(*[self._fetch_guild_id(x) for x in missing], return_exceptions = True)
+        for code, result in zip(missing, results):
+            if not isinstance(result, Exception):
+                self._invites[code] = result
+        return {x : self._invites.peek(x) for x in codes if x in self._invites}
+
+    async def judge(self, message):
+        guild_id = message.guild.id if message.guild is not None else None
+        verdicts = []
+
+        thresholds = await self.get_thresholds(guild_id)
+        mentions = len(message.mentions) + len(message.role_mentions) + int(message.mention_everyone)
+        reason = self.spam.observe(guild_id, message.channel.id, message.author.id, message.content, mentions, thresholds)
+        if reason is not None:
+            verdicts.append(Verdict(MaliciousAction.spam, message.author, message = message, reason = reason))
+
+        automaton = await self.get_automaton(guild_id)
+        words = automaton.find(message.content)
+        if words:
+            verdicts.append(Verdict(MaliciousAction.blacklisted_word, message.author, message = message, words = words))
+
+        codes = invite_pattern.findall(message.content)
+        if codes:
+            guild_ids = await self.resolve_invites(codes)
+            invites = [x for x, y in guild_ids.items() if y is not None and y != guild_id]
+            if invites:
+                verdicts.append(Verdict(MaliciousAction.invite_url, message.author, message = message, invites = invites))
+
+        return verdicts
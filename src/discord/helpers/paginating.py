@@ -1,9 +1,34 @@
+import math
 import asyncio
+import inspect
 from enum import Enum
 
 import discord
 
-from src.utils.general import split_list
+from src.utils.cache import LRUCache
+
+class PageSource:
+    """ Renders pages on demand. render(index) returns a Page, or an awaitable of one. """
+
+    def __init__(self, render, page_count):
+        self._render    = render
+        self.page_count = page_count
+
+    def render(self, index):
+        return self._render(index)
+
+class ListSource(PageSource):
+    """ Pages that are already built. """
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def render(self, index):
+        return self.pages[index]
 
 class Paginator:
     class Action(Enum):
@@ -13,54 +38,61 @@ class Paginator:
 
     _actions = {"⬅️": Action.previous, "➡️" : Action.next, "⏹️": Action.stop}
 
-    __slots__ = ("_pages", "_current_page", "_message", "_ctx")
-    def __init__(self, ctx, pages = None):
-        self._pages = pages or []
-        self._current_page = 0
-        self._message = None
-        self._ctx = ctx
+    __slots__ = ("_source", "_rendered", "_current_page", "_message", "_ctx")
+    def __init__(self, ctx, pages = None, source = None, cache_size = 5, start_page = 0):
+        self._source       = source or ListSource(pages or [])
+        self._rendered     = LRUCache(max_size = cache_size)
+        self._current_page = start_page
+        self._message      = None
+        self._ctx          = ctx
 
     def add_page(self, page):
-        self._pages.append(page)
+        self._source.pages.append(page)
 
     @property
-    def current_page(self):
-        return self._pages[self._current_page]
+    def page_count(self):
+        return self._source.page_count
+
+    async def get_page(self, index):
+        """ Renders a page the first time it is shown, the last few rendered pages are kept around. """
+        page = self._rendered.get(index)
+        if page is None:
+            page = self._source.render(index)
+            if inspect.isawaitable(page):
+                page = await page
+            page.set_page_number(index+1, self.page_count)
+            self._rendered[index] = page
+        return page
 
     async def reload(self):
-        page = self.current_page
+        page = await self.get_page(self._current_page)
+        dispatcher = self._ctx.bot.dispatcher
         if self._message is None:
-            self._message = await self._ctx.send(embed = page.embed)
+            self._message = await dispatcher.send(self._ctx, embed = page.embed)
         else:
-            await self._message.edit(embed = page.embed)
+            await dispatcher.edit(self._message, embed = page.embed)
 
     def previous(self):
         if self._current_page == 0:
-            self._current_page = len(self._pages)-1
+            self._current_page = self.page_count-1
         else:
             self._current_page -= 1
 
-        asyncio.gather(self.reload())
+        asyncio.ensure_future(self.reload())
 
     def next(self):
-        if self._current_page == len(self._pages)-1:
+        if self._current_page == self.page_count-1:
             self._current_page = 0
         else:
             self._current_page += 1
 
-        asyncio.gather(self.reload())
+        asyncio.ensure_future(self.reload())
 
-    async def clear_reactions(self):
-        try:
-            await self._message.clear_reactions()
-        except:
-            pass
+    def clear_reactions(self):
+        return self._ctx.bot.dispatcher.call(self._message, "clear_reactions")
 
-    async def remove_reaction(self, reaction, user):
-        try:
-            await self._message.remove_reaction(reaction, user)
-        except:
-            pass
+    def remove_reaction(self, reaction, user):
+        return self._ctx.bot.dispatcher.call(self._message, "remove_reaction", reaction, user)
 
     def __check(self, reaction, user):
         if user.id != self._ctx.author.id:
@@ -76,60 +108,54 @@ class Paginator:
             return True
         elif action == self.Action.next:
             self.next()
-            asyncio.gather(self.remove_reaction(reaction, user))
+            self.remove_reaction(reaction, user)
         elif action == self.Action.previous:
             self.previous()
-            asyncio.gather(self.remove_reaction(reaction, user))
+            self.remove_reaction(reaction, user)
 
         return False
 
     async def wait(self, timeout = 360):
-        self.__show_pages()
-        await self.reload()
-        if len(self._pages) == 1:
+        if self._message is None:
+            await self.reload()
+        if self.page_count <= 1:
             return
         for emoji in self._actions.keys():
-            asyncio.gather(self._message.add_reaction(emoji))
+            self._ctx.bot.dispatcher.call(self._message, "add_reaction", emoji)
         try:
             await self._ctx.bot.wait_for("reaction_add", timeout = timeout, check = self.__check)
         except asyncio.TimeoutError:
             pass
 
-        asyncio.gather(self.clear_reactions())
-
-    def __show_pages(self):
-        for i, page in enumerate(self._pages):
-            page.set_page_number(i+1, len(self._pages))
+        self.clear_reactions()
 
     @classmethod
     def from_embed(cls, ctx, embed : discord.Embed, max_fields = 10):
-        paginator = cls(ctx)
-        if len(embed.fields) <= max_fields:
-            paginator.add_page(embed)
-            return paginator
+        fields = embed.fields
+        if len(fields) <= max_fields:
+            return cls(ctx, pages = [Page(embed)])
 
-        field_groups = split_list(embed.fields, max_fields)
-
-        for fields in field_groups:
+        def render(index):
             base_embed             = discord.Embed()
             base_embed.color       = embed.color
             base_embed.description = embed.description
 
-            for field in fields:
+            for field in fields[index * max_fields:(index + 1) * max_fields]:
                 base_embed.add_field(name = field.name, value = field.value, inline = field.inline)
-            paginator.add_page(Page(base_embed))
+            return Page(base_embed)
 
-        return paginator
+        return cls(ctx, source = PageSource(render, math.ceil(len(fields) / max_fields)))
 
 class Page:
-    __slots__ = ("embed", )
+    __slots__ = ("embed", "footer")
     def __init__(self, embed):
-        self.embed = embed
+        self.embed  = embed
+        self.footer = None
 
     def set_page_number(self, index, total):
-        text = ""
-
-        if self.embed.footer or self.embed.footer.text:
-            text = self.embed.footer.text
+        if self.footer is None:
+            self.footer = ""
+            if self.embed.footer or self.embed.footer.text:
+                self.footer = self.embed.footer.text
 
-        self.embed.set_footer(text = text + f"\nPage {index}/{total}")
+        self.embed.set_footer(text = self.footer + f"\nPage {index}/{total}")
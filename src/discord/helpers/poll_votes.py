@@ -0,0 +1,161 @@
+import datetime
+
+import peewee
+
+from src.models import Poll, Option, Vote, database
+
+class PollEntry:
+    __slots__ = ("poll_id", "max_votes", "anonymous", "role_id", "options", "votes", "counts")
+
+    def __init__(self, poll_id, max_votes, anonymous, role_id):
+        self.poll_id   = poll_id
+        self.max_votes = max_votes
+        self.anonymous = anonymous
+        self.role_id   = role_id
+        self.options   = {}
+        self.votes     = {}
+        self.counts    = {}
+
+    def add_option(self, option_id, reaction):
+        self.options[reaction] = option_id
+        self.counts[option_id] = 0
+
+class PollVoteLedger:
+    """ Options, counts and the votes of every user of the active polls, by message id.
+        Votes are applied in memory right away and written to the database in bulk by flush(), 1000 rows per query.
+    """
+
+    def __init__(self):
+        self._polls   = {}
+        self._inserts = {}
+        self._deletes = set()
+        self.loaded   = False
+        self.flushes  = 0
+        self.written  = 0
+
+    def __contains__(self, message_id):
+        return message_id in self._polls
+
+    @property
+    def message_ids(self):
+        return set(self._polls)
+
+    @property
+    def pending(self):
+        return len(self._inserts) + len(self._deletes)
+
+    def get(self, message_id):
+        return self._polls.get(message_id)
+
+    def counts(self, message_id):
+        """ Votes per option id, None when the poll is not in the ledger. """
+        entry = self._polls.get(message_id)
+        if entry is not None:
+            return dict(entry.counts)
+
+    @staticmethod
+    def _fetch():
+        polls = list(Poll.select().where((Poll.ended == False) & (Poll.message_id != None)))
+        if not polls:
+            return polls, [], []
+        options = list(Option.select(Option.id, Option.poll, Option.reaction).where(Option.poll.in_([x.id for x in polls])))
+        query = Vote.select(Vote.option, Vote.user_id)
+        query = query.where(Vote.option.in_([x.id for x in options]))
+        query = query.order_by(Vote.voted_on)
+        return polls, options, list(query.tuples())
+
+    async def load(self):
+        """ Loads once, on_ready fires again after a reconnect while the ledger is already up to date. """
+        if self.loaded:
+            return
+        polls, options, votes = await database.run(self._fetch)
+        self.loaded = True
+
+        by_id = {}
+        for poll in polls:
+            if poll.message_id in self._polls:
+                continue
+            by_id[poll.id] = self._polls[poll.message_id] = PollEntry(poll.id, poll.max_votes_per_user, poll.anonymous, poll.role_id_needed_to_vote)
+
+        entries = {}
+        for option in options:
+            entry = by_id.get(option.poll_id)
+            if entry is None:
+                continue
+            entry.add_option(option.id, option.reaction)
+            entries[option.id] = entry
+
+        for option_id, user_id in votes:
+            entry = entries.get(option_id)
+            if entry is None:
+                continue
+            entry.votes.setdefault(user_id, []).append(option_id)
+            entry.counts[option_id] += 1
+
+    def add_poll(self, poll):
+        entry = PollEntry(poll.id, poll.max_votes_per_user, poll.anonymous, poll.role_id_needed_to_vote)
+        for option in poll.options:
+            entry.add_option(option.id, option.reaction)
+        self._polls[poll.message_id] = entry
+
+    def remove_poll(self, message_id):
+        self._polls.pop(message_id, None)
+
+    def vote(self, message_id, user_id, option_id):
+        """ Adds a vote, dropping the oldest votes of the user beyond max_votes. Returns the option ids that were dropped. """
+        entry = self._polls[message_id]
+        votes = entry.votes.setdefault(user_id, [])
+        if option_id in votes:
+            return []
+
+        votes.append(option_id)
+        entry.counts[option_id] += 1
+        self._inserts[(option_id, user_id)] = datetime.datetime.utcnow()
+
+        dropped = []
+        while len(votes) > max(entry.max_votes, 1):
+            dropped_id = votes.pop(0)
+            entry.counts[dropped_id] -= 1
+            if self._inserts.pop((dropped_id, user_id), None) is None:
+                self._deletes.add((dropped_id, user_id))
+            dropped.append(dropped_id)
+        return dropped
+
+    def _collect(self):
+        inserts, self._inserts = self._inserts, {}
+        deletes, self._deletes = self._deletes, set()
+        return inserts, deletes
+
+    def _restore(self, inserts, deletes):
+        for key, voted_on in inserts.items():
+            if key in self._deletes:
+                # dropped again since, the row was never written.
+                self._deletes.discard(key)
+            else:
+                self._inserts.setdefault(key, voted_on)
+        self._deletes.update(deletes)
+
+    @staticmethod
+    def _write(inserts, deletes):
+        for keys in peewee.chunked(deletes, 1000):
+            Vote.delete().where(peewee.Tuple(Vote.option, Vote.user_id).in_(keys)).execute()
+        rows = [{"option" : x, "user_id" : y, "voted_on" : z} for (x, y), z in inserts.items()]
+        for batch in peewee.chunked(rows, 1000):
+            Vote.insert_many(batch).on_conflict_ignore().execute()
+
+    def flush(self):
+        inserts, deletes = self._collect()
+        if not inserts and not deletes:
+            return 0
+        try:
+            with database.atomic():
+                self._write(inserts, deletes)
+        except Exception:
+            self._restore(inserts, deletes)
+            raise
+        self.flushes += 1
+        self.written += len(inserts) + len(deletes)
+        return len(inserts) + len(deletes)
+
+    async def flush_async(self):
+        return await database.run(self.flush)
@@ -1,9 +1,9 @@
+import math
 from enum import Enum
 
 import discord
 
-from src.utils.general import split_list
-from src.discord.helpers.paginating import Page, Paginator
+from src.discord.helpers.paginating import Page, PageSource, Paginator
 
 def prettify_value(value):
     if isinstance(value, bool):
@@ -63,18 +63,8 @@ class Table:
         self._rows.insert(0, header)
 
     def to_paginator(self, ctx, rows_per_page):
-        paginator = Paginator(ctx)
-        row_groups = split_list([x for x in self._rows if not x.header], rows_per_page)
-        header = self.header
-        for rows in row_groups:
-            table = self.__class__(rows = rows)
-            if header is not None:
-                table.add_row(header)
-            embed = discord.Embed(color = ctx.guild_color)
-            embed.description = table.generate()
-            paginator.add_page(Page(embed))
-
-        return paginator
+        rows = [x for x in self._rows if not x.header]
+        return TableSource.from_list(rows, self.header, rows_per_page).to_paginator(ctx)
 
     @property
     def header(self):
@@ -120,6 +110,57 @@ class Table:
 
         return "```md\n" + ( "\n".join(lines) ) + "```"
 
+class TableSource(PageSource):
+    """ Renders one page of a table at a time, column widths are those of the rows on that page.
+        fetch(offset, limit) returns the Rows of a page and may be a coroutine function.
+    """
+
+    def __init__(self, header, fetch, row_count, rows_per_page):
+        self.header        = header
+        self.fetch         = fetch
+        self.rows_per_page = rows_per_page
+        self.color         = discord.Embed.Empty
+        self.page_count    = max(math.ceil(row_count / rows_per_page), 1)
+
+    @classmethod
+    def from_list(cls, items, header, rows_per_page, to_row = None):
+        """ Pages over a list, to_row is only called for the items on pages that are shown. """
+        def fetch(offset, limit):
+            page = items[offset:offset + limit]
+            return page if to_row is None else [to_row(x) for x in page]
+        return cls(header, fetch, len(items), rows_per_page)
+
+    @classmethod
+    def from_leaderboard(cls, board, header, rows_per_page, to_row):
+        """ Pages over a Leaderboard by slicing it, to_row(rank, key, score) is only called for the entries on pages that are shown. """
+        def fetch(offset, limit):
+            return [to_row(offset + i + 1, key, score) for i, (key, score) in enumerate(board.slice(offset, limit))]
+        return cls(header, fetch, len(board), rows_per_page)
+
+    @classmethod
+    def from_query(cls, query, header, rows_per_page, to_row):
+        """ Pages over a query with LIMIT / OFFSET, so only the rows of the shown pages are fetched. """
+        database = query.model._meta.database
+        async def fetch(offset, limit):
+            return await database.run(lambda : [to_row(x) for x in query.limit(limit).offset(offset)])
+        return cls(header, fetch, query.count(), rows_per_page)
+
+    def to_paginator(self, ctx, start_page = 0):
+        self.color = ctx.guild_color
+        return Paginator(ctx, source = self, start_page = start_page)
+
+    async def render(self, index):
+        rows = self.fetch(index * self.rows_per_page, self.rows_per_page)
+        if not isinstance(rows, list):
+            rows = await rows
+
+        table = Table(rows = list(rows))
+        if self.header is not None:
+            table.add_row(self.header)
+        embed = discord.Embed(color = self.color)
+        embed.description = table.generate()
+        return Page(embed)
+
 class Row(list):
     def __init__(self, data, header = False):
         self.header = header
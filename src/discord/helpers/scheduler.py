@@ -0,0 +1,210 @@
+import heapq
+import asyncio
+import datetime
+import itertools
+import traceback
+
+from src.models import database
+
+class Job:
+    __slots__ = ("model", "callback", "where", "due")
+
+    def __init__(self, model, callback, where, due):
+        self.model    = model
+        self.callback = callback
+        self.where    = where
+        self.due      = due
+
+    def query(self, ids = None):
+        query = self.model.select()
+        if self.where is not None:
+            query = query.where(self.where)
+        if ids is not None:
+            query = query.where(self.model.id.in_(ids))
+        return query
+
+class Scheduler:
+    """ Single heap of due times shared by every cog. Sleeps until the earliest entry is due instead of polling.
+        Rows are registered per model: pending rows are loaded once, saves keep the heap up to date
+        and due rows are re-fetched in one query per model right before they are handed to the callback.
+    """
+
+    retry_delay = datetime.timedelta(minutes = 1)
+
+    def __init__(self, clock = datetime.datetime.utcnow):
+        self.clock     = clock
+        self._heap     = []
+        self._entries  = {}
+        self._jobs     = {}
+        self._calls    = {}
+        self._counter  = itertools.count()
+        self._wakeup   = asyncio.Event()
+        self._task     = None
+        self._loop     = None
+        self.fired     = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def now(self):
+        return self.clock()
+
+    @property
+    def next_due(self):
+        self._discard_stale()
+        if self._heap:
+            return self._heap[0][0]
+
+    def _discard_stale(self):
+        while self._heap and self._entries.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def schedule(self, key, due):
+        seq = next(self._counter)
+        self._entries[key] = seq
+        heapq.heappush(self._heap, (due, seq, key))
+        if self._heap[0][1] == seq:
+            self._wakeup.set()
+
+    def cancel(self, key):
+        self._entries.pop(key, None)
+        self._calls.pop(key, None)
+
+    def call_at(self, due, callback, key = None):
+        """ Schedules a coroutine function that is not backed by a model. """
+        if key is None:
+            key = ("call", next(self._counter))
+        self._calls[key] = callback
+        self.schedule(key, due)
+        return key
+
+    def defer(self, instance, delay):
+        """ Fires a row again after delay, for callbacks that could not finish it yet. """
+        self.schedule((type(instance), instance.id), self.now() + delay)
+
+    def update(self, instance):
+        job = self._jobs.get(type(instance))
+        if job is None or instance.id is None:
+            return
+        key = (job.model, instance.id)
+        due = job.due(instance)
+        if due is None:
+            self.cancel(key)
+        else:
+            self.schedule(key, due)
+
+    def _on_save(self, instance):
+        try:
+            running = asyncio.get_event_loop() is self._loop
+        except RuntimeError:
+            running = False
+
+        if self._loop is None or running:
+            self.update(instance)
+        else:
+            self._loop.call_soon_threadsafe(self.update, instance)
+
+    async def register(self, model, callback, due, where = None):
+        """ callback receives a list of due rows, due maps a row to its due datetime or None when it is not pending.
+            where narrows the rows that are loaded and re-fetched down to the pending ones.
+        """
+        if model in self._jobs:
+            return
+
+        job = Job(model, callback, where, due)
+        self._jobs[model] = job
+        model.add_save_listener(self._on_save)
+
+        for instance in await database.run(lambda : list(job.query())):
+            self.update(instance)
+
+    def pop_due(self):
+        now = self.now()
+        keys = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, key = heapq.heappop(self._heap)
+            if self._entries.get(key) == seq:
+                del self._entries[key]
+                keys.append(key)
+        return keys
+
+    async def run_pending(self):
+        """ Fires everything that is due according to the clock. Exposed separately so a fake clock can drive it. """
+        keys = self.pop_due()
+        if not keys:
+            return 0
+
+        ids = {}
+        calls = []
+        for key in keys:
+            if key in self._calls:
+                calls.append(self._calls.pop(key))
+            else:
+                ids.setdefault(key[0], []).append(key[1])
+
+        coros = [self._fire(self._jobs[model], model_ids) for model, model_ids in ids.items()]
+        coros.extend(self._call(x) for x in calls)
+        await asyncio.gather(*coros)
+        self.fired += len(keys)
+        return len(keys)
+
+    async def _call(self, callback):
+        try:
+            await callback()
+        except Exception:
+            traceback.print_exc()
+
+    async def _fire(self, job, ids):
+        now = self.now()
+        rows = []
+        try:
+            instances = await database.run(lambda : list(job.query(ids)))
+        except Exception:
+            traceback.print_exc()
+            for id in ids:
+                self.schedule((job.model, id), now + self.retry_delay)
+            return
+
+        for instance in instances:
+            due = job.due(instance)
+            if due is None:
+                continue
+            if due > now:
+                self.schedule((job.model, instance.id), due)
+            else:
+                rows.append(instance)
+
+        if not rows:
+            return
+
+        try:
+            await job.callback(rows)
+        except Exception:
+            traceback.print_exc()
+            for instance in rows:
+                self.schedule((job.model, instance.id), now + self.retry_delay)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_pending()
+            except Exception:
+                traceback.print_exc()
+
+            next_due = self.next_due
+            self._wakeup.clear()
+            timeout = None if next_due is None else max((next_due - self.now()).total_seconds(), 0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_event_loop()
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
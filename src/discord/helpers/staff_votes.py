@@ -0,0 +1,137 @@
+import asyncio
+
+from src.models import StaffVote, StaffVoteBallot, database
+
+class StaffVoteTally:
+    """ The ballots of one staff vote. A member that reacted with several emojis is counted for the first one in emojis. """
+
+    __slots__ = ("vote", "emojis", "ballots")
+
+    def __init__(self, vote, emojis, ballots = ()):
+        self.vote    = vote
+        self.emojis  = emojis
+        self.ballots = {}
+        for user_id, emoji in ballots:
+            self.add(user_id, emoji)
+
+    @property
+    def voters(self):
+        return set(self.ballots)
+
+    def add(self, user_id, emoji):
+        emojis = self.ballots.setdefault(user_id, set())
+        if emoji in emojis:
+            return False
+        emojis.add(emoji)
+        return True
+
+    def remove(self, user_id, emoji):
+        emojis = self.ballots.get(user_id)
+        if emojis is None or emoji not in emojis:
+            return False
+        emojis.remove(emoji)
+        if not emojis:
+            del self.ballots[user_id]
+        return True
+
+    def votes(self):
+        votes = dict.fromkeys(self.emojis, 0)
+        for emojis in self.ballots.values():
+            votes[min(emojis, key = self.emojis.index)] += 1
+        return votes
+
+class StaffVoteStore:
+    """ Tallies of the staff votes, kept up to date from reaction events and written to the database as ballots.
+        A vote message that is not known yet is read from Discord once, after that reactions cost no API calls.
+    """
+
+    def __init__(self, emojis):
+        self.emojis   = emojis
+        self._tallies = {}
+        self._lock    = asyncio.Lock()
+
+    def _fetch(self):
+        votes = {x.id : x for x in StaffVote.select().where(StaffVote.finished == False)}
+        ballots = {x : [] for x in votes}
+        if votes:
+            query = StaffVoteBallot.select(StaffVoteBallot.vote, StaffVoteBallot.user_id, StaffVoteBallot.emoji)
+            query = query.where(StaffVoteBallot.vote.in_(list(votes)))
+            for vote_id, user_id, emoji in query.tuples():
+                ballots[vote_id].append((user_id, emoji))
+        return {x.message_id : StaffVoteTally(x, self.emojis, ballots[x.id]) for x in votes.values()}
+
+    async def load(self):
+        self._tallies = await database.run(self._fetch)
+
+    async def create(self, message):
+        """ Shares the lock with get(), so a reaction that arrives first cannot create the vote twice. """
+        async with self._lock:
+            if message.id in self._tallies:
+                return
+            defaults = {"channel_id" : message.channel.id, "content" : message.content}
+            vote, _ = await database.run(StaffVote.get_or_create, message_id = message.id, defaults = defaults)
+            self._tallies[message.id] = StaffVoteTally(vote, self.emojis)
+
+    def _get_stored(self, message_id):
+        vote = StaffVote.get_or_none(StaffVote.message_id == message_id)
+        if vote is not None:
+            ballots = [] if vote.finished else [(x.user_id, x.emoji) for x in vote.ballots]
+            return StaffVoteTally(vote, self.emojis, ballots)
+
+    async def _seed(self, channel, message_id):
+        message = await channel.fetch_message(message_id)
+        ballots = []
+        for reaction in message.reactions:
+            if str(reaction.emoji) in self.emojis:
+                async for user in reaction.users():
+                    if not user.bot:
+                        ballots.append((user.id, str(reaction.emoji)))
+
+        def create():
+            defaults = {"channel_id" : channel.id, "content" : message.content}
+            vote, _ = StaffVote.get_or_create(message_id = message.id, defaults = defaults)
+            if ballots:
+                rows = [{"vote" : vote.id, "user_id" : x, "emoji" : y} for x, y in ballots]
+                StaffVoteBallot.insert_many(rows).on_conflict_ignore().execute()
+            return vote
+        vote = await database.atomic_run(create)
+        return StaffVoteTally(vote, self.emojis, ballots)
+
+    async def get(self, channel, message_id):
+        tally = self._tallies.get(message_id)
+        if tally is not None:
+            return tally
+
+        async with self._lock:
+            tally = self._tallies.get(message_id)
+            if tally is None:
+                tally = await database.run(self._get_stored, message_id)
+                if tally is None:
+                    tally = await self._seed(channel, message_id)
+                self._tallies[message_id] = tally
+        return tally
+
+    async def add(self, tally, user_id, emoji):
+        if not tally.add(user_id, emoji):
+            return False
+        query = StaffVoteBallot.insert(vote = tally.vote.id, user_id = user_id, emoji = emoji).on_conflict_ignore()
+        await database.run(query.execute)
+        return True
+
+    async def remove(self, tally, user_id, emoji):
+        if not tally.remove(user_id, emoji):
+            return False
+        query = StaffVoteBallot.delete()
+        query = query.where(StaffVoteBallot.vote == tally.vote.id)
+        query = query.where(StaffVoteBallot.user_id == user_id)
+        query = query.where(StaffVoteBallot.emoji == emoji)
+        await database.run(query.execute)
+        return True
+
+    async def finish(self, tally):
+        """ Marks the vote as finished, returns False when it already was. """
+        if tally.vote.finished:
+            return False
+        tally.vote.finished = True
+        await database.run(tally.vote.save)
+        return True
@@ -1,4 +1,4 @@
-from src.models import Human, database
+from src.models import Human
 import src.config as config
 
 
@@ -54,13 +54,11 @@ class DiscordIdentity(BaseIdentity):
         return self.member.name
 
     def add_points(self, points):
-        with database.connection_context():
-            human = config.bot.get_human(user=self.member)
-            human.gold += points
-            human.save()
+        human = config.bot.get_human(user=self.member)
+        human.gold += points
+        human.save()
 
     def remove_points(self, points):
-        with database.connection_context():
-            human = config.bot.get_human(user=self.member)
-            human.gold -= points
-            human.save()
+        human = config.bot.get_human(user=self.member)
+        human.gold -= points
+        human.save()
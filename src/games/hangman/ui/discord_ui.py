@@ -8,15 +8,9 @@ import requests
 
 import src.config as config
 from .ui import UI
+from src.discord.helpers.embed import Embed
 from src.utils.general import html_to_discord
 
-async def delete_message(message):
-    try:
-        await message.delete()
-        return True
-    except:
-        return False
-
 class DiscordUI(UI):
     def __init__(self, ctx):
         self.message = None
@@ -37,7 +31,7 @@ class DiscordUI(UI):
             if len(message.content) == 1 and " " not in message.content:
                 letter = message.content.lower()
                 if not dm:
-                    asyncio.gather(delete_message(message))
+                    self.ctx.bot.dispatcher.call(message, "delete")
                 else:
                     self.invalid_messages += 1
                 if letter not in letters_used:
@@ -46,7 +40,7 @@ class DiscordUI(UI):
                     self.send_error(f"Letter '{letter}' has already been used")
             elif len(message.content) == len(word):
                 if not dm:
-                    asyncio.gather(delete_message(message))
+                    self.ctx.bot.dispatcher.call(message, "delete")
                 else:
                     self.invalid_messages += 1
                 return True
@@ -58,7 +52,7 @@ class DiscordUI(UI):
         return __check2
 
     def send_error(self, text, delete_after = 10):
-        asyncio.gather(self.ctx.error(text, delete_after = delete_after))
+        self.ctx.bot.dispatcher.send(self.ctx, embed = Embed.error(text), delete_after = delete_after)
 
     async def get_guess(self, word, player, letters_used):
         try:
@@ -67,7 +61,7 @@ class DiscordUI(UI):
             guess = None
 
         if self.mention_message is not None:
-            asyncio.gather(delete_message(self.mention_message))
+            self.ctx.bot.dispatcher.call(self.mention_message, "delete")
 
         return guess.content.lower() if guess is not None else None
 
@@ -97,11 +91,11 @@ class DiscordUI(UI):
         embed.add_field(name = "\uFEFF", value = "\n".join(guess_info), inline = False)
         if self.message is None or self.invalid_messages > 3:
             if self.message is not None:
-                asyncio.gather(delete_message(self.message))
+                self.ctx.bot.dispatcher.call(self.message, "delete")
             self.message = await self.ctx.send(content = content, embed = embed)
             self.invalid_messages = 0
         else:
-            asyncio.gather(self.message.edit(content = content, embed = embed))
+            self.ctx.bot.dispatcher.edit(self.message, content = content, embed = embed)
 
         if current_player is not None and len(game.players) > 1:
             self.mention_message = await self.ctx.send(f"{current_player.identity.member.mention}, your turn! {self.timeout}s...", delete_after = self.timeout)
@@ -1,14 +1,15 @@
 from .base import BaseModel
-from .human import Human, Item, HumanItem, ItemCategory
-from .intergalactica import Earthling, Reminder, TemporaryVoiceChannel, TemporaryChannel, RedditAdvertisement
-from .settings import Settings, NamedEmbed, NamedChannel, Translation, Locale
+from .human import Human, HumanCache, Item, HumanItem, ItemCategory
+from .intergalactica import Earthling, Reminder, TemporaryVoiceChannel, TemporaryChannel, RedditAdvertisement, ModerationRule, SpamThreshold, StaffVote, StaffVoteBallot
+from .settings import Settings, GuildSettingsCache, NamedEmbed, NamedChannel, Translation, TranslationCatalogue, Locale
 from .ticket import Ticket, Reply
 from .poll import Change, Parameter, Poll, PollTemplate, Vote, Option
 from .scene import Scene, Scenario
 from .pigeon import Pigeon, PigeonRelationship, Buff, PigeonBuff, Fight, Exploration, Mail, LanguageMastery, SystemMessage, Date
-from .admin import SavedEmoji, Location, Giveaway, DailyReminder, PersonalQuestion, Word
+from .admin import SavedEmoji, DominantColor, Location, Giveaway, DailyReminder, PersonalQuestion, Word
 from .prank import NicknamePrank, Prankster, EmojiPrank, RolePrank
 from .reddit import Subreddit
+from .snapshot import ProfileSnapshot, ProfileCache
 from .qotd import Category, Question, CategoryChannel, QuestionConfig
 from .intergalactica import MentionGroup, MentionMember
 from .farming import Farm, Crop, FarmCrop
@@ -33,8 +34,8 @@ def setup():
         # database.drop_tables([Pigeon, PigeonRelationship, Buff, PigeonBuff, Fight, Exploration, Mail, LanguageMastery, SystemMessage, Date])
         database.create_tables([Pigeon, PigeonRelationship, Buff, PigeonBuff, Fight, Exploration, Mail, LanguageMastery, SystemMessage, Date])
 
-        # database.drop_tables([SavedEmoji, Location, Giveaway, DailyReminder, PersonalQuestion, Word])
-        database.create_tables([SavedEmoji, Location, Giveaway, DailyReminder, PersonalQuestion, Word])
+        # database.drop_tables([SavedEmoji, DominantColor, Location, Giveaway, DailyReminder, PersonalQuestion, Word])
+        database.create_tables([SavedEmoji, DominantColor, Location, Giveaway, DailyReminder, PersonalQuestion, Word])
 
         # database.drop_tables([Subreddit])
         database.create_tables([Subreddit])
@@ -48,8 +49,8 @@ def setup():
         # database.drop_tables([Human, Item, HumanItem, ItemCategory])
         database.create_tables([Human, Item, HumanItem, ItemCategory])
 
-        # database.drop_tables([Earthling, TemporaryChannel, Reminder, TemporaryVoiceChannel, RedditAdvertisement])
-        database.create_tables([Earthling, TemporaryChannel, Reminder, TemporaryVoiceChannel, RedditAdvertisement])
+        # database.drop_tables([Earthling, TemporaryChannel, Reminder, TemporaryVoiceChannel, RedditAdvertisement, ModerationRule, SpamThreshold, StaffVote, StaffVoteBallot])
+        database.create_tables([Earthling, TemporaryChannel, Reminder, TemporaryVoiceChannel, RedditAdvertisement, ModerationRule, SpamThreshold, StaffVote, StaffVoteBallot])
 
         # database.drop_tables([Settings, NamedEmbed, NamedChannel, Locale, Translation])
         database.create_tables([Settings, NamedEmbed, NamedChannel, Locale, Translation])
@@ -59,5 +60,3 @@ def setup():
 
         # database.drop_tables([Change, Parameter, Poll, PollTemplate, Option, Vote])
         database.create_tables([Change, Parameter, Poll, PollTemplate, Option, Vote])
-
-setup()
\ No newline at end of file
@@ -1,5 +1,4 @@
 import datetime
-import asyncio
 
 import peewee
 import discord
@@ -14,9 +13,14 @@ class SavedEmoji(BaseModel):
     def delete_instance(self, *args, **kwargs):
         emoji = self.bot.get_emoji(self.emoji_id)
         if emoji is not None:
-            asyncio.gather(emoji.delete())
+            self.bot.dispatcher.call(emoji, "delete")
         super().delete_instance(*args, **kwargs)
 
+class DominantColor(BaseModel):
+    url_hash    = peewee.CharField        (null = False, unique = True, max_length = 40)
+    url         = peewee.TextField        (null = False)
+    color       = peewee.IntegerField     (null = False)
+
 class Giveaway(BaseModel):
     guild_id        = peewee.BigIntegerField  (null = False)
     channel_id      = peewee.BigIntegerField  (null = False)
@@ -76,13 +80,27 @@ class DailyReminder(BaseModel):
     user_id       = peewee.BigIntegerField (null = False)
     last_reminded = peewee.DateField       (null = True)
 
+    def applies_to(self, date):
+        weekend = date.weekday() in range(5, 7)
+        return self.weekday == (not weekend) or self.weekend == weekend
+
+    def next_reminder(self, now):
+        """ First moment from now on this reminder is due. It stays due until the end of its hour. """
+        date = now.date()
+        for _ in range(8):
+            due = datetime.datetime.combine(date, self.time)
+            missed = now >= due.replace(minute = 0, second = 0, microsecond = 0) + datetime.timedelta(hours = 1)
+            if not missed and date != self.last_reminded and self.applies_to(date):
+                return due
+            date += datetime.timedelta(days = 1)
+
 class PersonalQuestion(BaseModel):
     value = peewee.TextField    (null = False)
     asked = peewee.BooleanField (null = False, default = False)
 
     @classmethod
     def get_random(cls):
-        return cls.select().where(cls.asked == False).order_by(peewee.fn.Rand()).first()
+        return super().get_random(cls.select().where(cls.asked == False))
 
     @property
     def embed(self):
@@ -58,7 +58,7 @@ class Game(BaseModel):
     def living_players(self):
         return self.players.where(Player.alive == True)
 
-    async def log(self, *args, **kwargs):
+    async def log(self, content = None, **kwargs):
         #TODO: setup a non hardcoded way for logs.
         if self.guild_id == 742146159711092757:
             log_channel_id = 754056523277271170
@@ -68,7 +68,7 @@ class Game(BaseModel):
             return
 
         channel = self.guild.get_channel(log_channel_id)
-        return await channel.send(*args, **kwargs)
+        return await self.bot.dispatcher.send(channel, content = content, **kwargs)
 
     @property
     def ended(self):
@@ -84,7 +84,7 @@ class Game(BaseModel):
         self.active = False
         self.save()
 
-        asyncio.gather(self.log(f"The game has ended. Winner: {winner.member}"))
+        asyncio.ensure_future(self.log(f"The game has ended. Winner: {winner.member}"))
 
     @property
     def new_round_available(self):
@@ -101,8 +101,6 @@ class Game(BaseModel):
         if players is None:
             players = list(self.living_players)
 
-        coros = []
-
         for player in players:
             if player.cycle_immunity:
                 continue
@@ -113,13 +111,11 @@ class Game(BaseModel):
             random.shuffle(players_without_player)
 
             for player_to_notify in players_without_player[:self.cycle_count-1]:
-                coros.append(player_to_notify.member.send(f"**{player.member}**s code is **{player.code}**"))
+                self.bot.dispatcher.send(player_to_notify.member, content = f"**{player.member}**s code is **{player.code}**")
                 leak_count += 1
 
             if leak_count > 0:
-                coros.append(player.member.send(f"Oh no! Your code was leaked to {leak_count} people."))
-
-        asyncio.gather(*coros)
+                self.bot.dispatcher.send(player.member, content = f"Oh no! Your code was leaked to {leak_count} people.")
 
 
     def assign_new_code_to_players(self , players = None):
@@ -154,7 +150,8 @@ class Game(BaseModel):
         if players is None:
             players = list(self.living_players)
 
-        asyncio.gather(*[x.send_status() for x in players])
+        for player in players:
+            player.send_status()
 
     def next_round(self):
 
@@ -191,12 +188,10 @@ class Game(BaseModel):
                          inline = False )
 
 
-        coros = [self.log(embed = embed)]
+        asyncio.ensure_future(self.log(embed = embed))
 
         for player in players:
-            coros.append(player.member.send(embed = dm_embed))
-
-        asyncio.gather(*coros)
+            self.bot.dispatcher.send(player.member, embed = dm_embed)
 
         self.next_cycle()
 
@@ -235,11 +230,9 @@ class Game(BaseModel):
             _embed.color = self.bot.get_dominant_color(self.guild)
             _embed.timestamp = self.cycle_end_date
 
-        coros = []
         for player in players:
-            coros.append(player.member.send(embed = dm_embed))
-        coros.append(self.log(embed = embed))
-        asyncio.gather(*coros)
+            self.bot.dispatcher.send(player.member, embed = dm_embed)
+        asyncio.ensure_future(self.log(embed = embed))
 
         Player.update(kill_command_available = True, cycle_immunity = False).where( (Player.game == self) & (Player.alive == True) ).execute()
 
@@ -278,9 +271,9 @@ class Player(BaseModel):
     kills                   = peewee.IntegerField    (default = 0)
     cycle_immunity          = peewee.BooleanField    (default = False)
 
-    async def send_status(self):
+    def send_status(self):
         if self.member is not None:
-            await self.member.send(embed = self.embed)
+            return self.bot.dispatcher.send(self.member, embed = self.embed)
 
     @property
     def embed(self):
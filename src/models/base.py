@@ -1,7 +1,13 @@
 import os
 import json
+import random
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 import peewee
+from playhouse.pool import PooledMySQLDatabase
+from playhouse.shortcuts import ReconnectMixin
 import pycountry
 import emoji
 
@@ -10,8 +16,62 @@ from src.discord.helpers.pretty import prettify_value
 from src.utils.country import Country
 import src.config as config
 
+class Database(ReconnectMixin, PooledMySQLDatabase):
+    """ Pooled MySQL database that can run blocking peewee calls on a worker thread.
+        Every worker thread checks a connection out of the pool for the duration of a call.
+        Queries that still run on the event loop share one long lived connection, which reconnects after the server drops it.
+    """
+
+    def __init__(self, *args, max_workers = 8, **kwargs):
+        kwargs.setdefault("max_connections", max_workers * 2)
+        kwargs.setdefault("stale_timeout", 300)
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "database")
+
+    def _run(self, callback, *args, **kwargs):
+        with self.connection_context():
+            return callback(*args, **kwargs)
+
+    async def run(self, callback, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self._run, callback, *args, **kwargs))
+
+    async def atomic_run(self, callback, *args, **kwargs):
+        def wrapper():
+            with self.atomic():
+                return callback(*args, **kwargs)
+        return await self.run(wrapper)
+
+_save_listeners   = {}
+_delete_listeners = {}
+
 class BaseModel(peewee.Model):
 
+    @classmethod
+    def add_save_listener(cls, callback):
+        """ Calls callback(instance) after every save of exactly this model. """
+        _save_listeners.setdefault(cls, []).append(callback)
+
+    def notify_saved(self):
+        for callback in _save_listeners.get(self.__class__, ()):
+            callback(self)
+
+    def save(self, *args, **kwargs):
+        rows = super().save(*args, **kwargs)
+        self.notify_saved()
+        return rows
+
+    @classmethod
+    def add_delete_listener(cls, callback):
+        """ Calls callback(instance) after every delete_instance of exactly this model. """
+        _delete_listeners.setdefault(cls, []).append(callback)
+
+    def delete_instance(self, *args, **kwargs):
+        rows = super().delete_instance(*args, **kwargs)
+        for callback in _delete_listeners.get(self.__class__, ()):
+            callback(self)
+        return rows
+
     @classmethod
     def pluck(cls, attr):
         query = cls.select(getattr(cls, attr))
@@ -80,8 +140,12 @@ class BaseModel(peewee.Model):
             return f"<@{self.user_id}>"
 
     @classmethod
-    def get_random(cls):
-        return cls.select().order_by(peewee.fn.Rand()).limit(1).first()
+    def get_random(cls, query = None):
+        """ Random row of query, by count and offset instead of sorting the table with ORDER BY RAND(). """
+        query = query if query is not None else cls.select()
+        count = query.count()
+        if count > 0:
+            return query.offset(random.randrange(count)).limit(1).first()
 
     @property
     def bot(self):
@@ -126,12 +190,13 @@ class BaseModel(peewee.Model):
         legacy_table_names = False
         only_save_dirty = True
         table_settings = ["DEFAULT CHARSET=utf8"]
-        database = peewee.MySQLDatabase(
+        database = Database(
             config.environ["mysql_db_name"],
-            user     = config.environ["mysql_user"],
-            password = config.environ["mysql_password"],
-            host     = config.environ["mysql_host"],
-            port     = int(config.environ["mysql_port"])
+            user        = config.environ["mysql_user"],
+            password    = config.environ["mysql_password"],
+            host        = config.environ["mysql_host"],
+            port        = int(config.environ["mysql_port"]),
+            max_workers = int(config.environ.get("mysql_max_workers", 8))
         )
 
 class JsonField(peewee.TextField):
@@ -183,7 +248,7 @@ class LanguageField(peewee.TextField):
 class CountryField(peewee.TextField):
     def db_value(self, value):
         if value is not None:
-            return value.iso()["alpha2"]
+            return value.alpha_2
 
     def python_value(self, value):
         if value is not None:
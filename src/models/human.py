@@ -9,6 +9,8 @@ import pycountry
 
 from .base import BaseModel, EnumField, CountryField
 from src.utils.timezone import Timezone
+from src.utils.cache import LRUCache
+from src.utils.sampling import WeightedSampler
 import src.config as config
 from src.utils.zodiac import ZodiacSign
 
@@ -33,11 +35,22 @@ class Human(BaseModel):
     tester                = peewee.BooleanField     (null = False, default = False)
     currencies            = CurrenciesField         (null = False, default = lambda : set())
 
+    _cache = None
+
     class Meta:
         indexes = (
             (('user_id',), True),
         )
 
+    def save(self, *args, **kwargs):
+        if self._cache is not None:
+            if self.id is not None and not args and not kwargs and self._dirty == {"gold"}:
+                self._cache.mark_dirty(self)
+                self.notify_saved()
+                return 1
+            self._cache.discard(self)
+        return super().save(*args, **kwargs)
+
     @property
     def all_currencies(self):
         currencies = set()
@@ -55,9 +68,7 @@ class Human(BaseModel):
 
     @property
     def pigeon(self):
-        for pigeon in self.pigeons:
-            if pigeon.condition == pigeon.Condition.active:
-                return pigeon
+        return self.bot.profiles.get(self).pigeon
 
     @property
     def current_time(self):
@@ -82,9 +93,9 @@ class Human(BaseModel):
         current_date = datetime.datetime.utcnow()
         return self.date_of_birth.day == current_date.day and self.date_of_birth.month == current_date.month
 
-    def calculate_timezone(self):
+    async def calculate_timezone(self):
         if self.city is not None and self.country is not None:
-            city = self.bot.owm_api.by_q(self.city, self.country.alpha_2)
+            city = await self.bot.owm_api.fetch_by_q(self.city, self.country.alpha_2, max_age = None)
             if city is not None:
                 return str(city.timezone)
 
@@ -130,7 +141,7 @@ class Human(BaseModel):
         if self.date_of_birth is not None:
             return ZodiacSign.from_date(self.date_of_birth)
 
-    def get_embed_field(self, show_all = False):
+    async def get_embed_field(self, show_all = False):
         #TODO: clean up.
         name = self.user.name
         if show_all and self.country:
@@ -160,7 +171,7 @@ class Human(BaseModel):
             values.append("<:pigeon:767362416941203456> N/A")
 
         if self.city is not None:
-            city = self.bot.owm_api.by_q(self.city, self.country.alpha_2 if self.country else None)
+            city = await self.bot.owm_api.fetch_by_q(self.city, self.country.alpha_2 if self.country else None)
             if city is not None:
                 values.append(f"{city.weather_infos[0].emoji} {city.temperature_info.temperature}{city.unit.symbol}")
         elif show_all:
@@ -180,6 +191,121 @@ class Human(BaseModel):
 
         return {"name" : name, "value" : sep.join(values), "inline" : True}
 
+class HumanCache:
+    """ Identity map for humans. Gold-only saves are deferred and written in bulk by flush(). """
+
+    def __init__(self, max_size = 5000, ttl = 3600):
+        self._humans   = LRUCache(max_size = max_size, ttl = ttl, on_evict = self._on_evict)
+        self._user_ids = {}
+        self._dirty    = {}
+        self.flushes   = 0
+        self.written   = 0
+
+    @property
+    def stats(self):
+        stats = self._humans.stats
+        stats["dirty"]   = len(self._dirty)
+        stats["flushes"] = self.flushes
+        stats["written"] = self.written
+        return stats
+
+    def _on_evict(self, user_id, human):
+        if user_id not in self._dirty:
+            self._user_ids.pop(human.id, None)
+
+    def add(self, human):
+        human._cache = self
+        self._humans[human.user_id] = human
+        self._user_ids[human.id] = human.user_id
+        return human
+
+    def get(self, user_id):
+        human = self._humans.get(user_id)
+        if human is None:
+            human = self._dirty.get(user_id)
+        if human is None:
+            human, _ = Human.get_or_create(user_id = user_id)
+        if user_id not in self._humans:
+            self.add(human)
+        return human
+
+    def get_by_id(self, human_id):
+        user_id = self._user_ids.get(human_id)
+        if user_id is not None:
+            return self.get(user_id)
+        return self.add(Human.get_by_id(human_id))
+
+    def merge(self, human):
+        """ The cached instance of this human, caching the given one when there is none. """
+        cached = self._humans.get(human.user_id)
+        if cached is None:
+            cached = self.add(self._dirty.get(human.user_id, human))
+        return cached
+
+    @staticmethod
+    def add_gold(golds):
+        """ Adds gold to many humans in one UPDATE, relative to what is stored. """
+        if not golds:
+            return 0
+        case = peewee.Case(Human.id, list(golds.items()))
+        return Human.update(gold = Human.gold + case).where(Human.id.in_(list(golds))).execute()
+
+    def get_many(self, user_ids):
+        missing = [x for x in set(user_ids) if x not in self._humans and x not in self._dirty]
+        if missing:
+            for human in Human.select().where(Human.user_id.in_(missing)):
+                self.add(human)
+        return {x : self.get(x) for x in user_ids}
+
+    def mark_dirty(self, human):
+        self._dirty[human.user_id] = human
+
+    def discard(self, human):
+        self._dirty.pop(human.user_id, None)
+
+    def _collect(self):
+        dirty, self._dirty = self._dirty, {}
+        for human in dirty.values():
+            human._dirty.discard("gold")
+        return dirty, {x.id : x.gold for x in dirty.values()}
+
+    def _restore(self, dirty):
+        for user_id, human in dirty.items():
+            if user_id not in self._dirty:
+                human._dirty.add("gold")
+                self._dirty[user_id] = human
+
+    @staticmethod
+    def _write(golds):
+        if not golds:
+            return 0
+        case = peewee.Case(Human.id, list(golds.items()))
+        return Human.update(gold = case).where(Human.id.in_(list(golds))).execute()
+
+    def flush(self):
+        dirty, golds = self._collect()
+        try:
+            self._write(golds)
+        except Exception:
+            self._restore(dirty)
+            raise
+        self.flushes += 1
+        self.written += len(golds)
+        return len(golds)
+
+    async def flush_async(self):
+        dirty, golds = self._collect()
+        if not golds:
+            return 0
+        try:
+            await Human._meta.database.run(self._write, golds)
+        except Exception:
+            self._restore(dirty)
+            raise
+        self.flushes += 1
+        self.written += len(golds)
+        return len(golds)
+
 class ItemCategory(BaseModel):
     name   = peewee.CharField       (null = False)
     code   = peewee.CharField       (max_length = 45)
@@ -230,29 +356,20 @@ class Item(BaseModel):
     chance       = peewee.IntegerField    (null = False)
 
     @classmethod
-    def get_random(cls):
-        query = """
-            SELECT results.* FROM (
-            SELECT {table_name}.*, @running_total AS previous_total, @running_total := @running_total + {chance_column_name} AS running_total, until.rand
-            FROM (
-                SELECT round(rand() * init.max) AS rand FROM (
-                SELECT sum({chance_column_name}) - 1 AS max FROM {table_name} {where}
-                ) AS init
-            ) AS until,
-            (SELECT * FROM {table_name} {where}) AS {table_name},
-            ( SELECT @running_total := 0.00 ) AS vars
-            ) AS results
-            WHERE results.rand >= results.previous_total AND results.rand < results.running_total;
-        """
-
-        query = query.format(
-            table_name = cls._meta.table_name,
-            where = "WHERE (category_id != 1 OR category_id IS NULL) AND explorable = 1",
-            chance_column_name = "chance"
-        )
+    def weighted_rows(cls, key = None):
+        query = cls.select()
+        query = query.where((cls.category != 1) | (cls.category.is_null()))
+        query = query.where(cls.explorable == True)
+        return [(x.id, x, x.chance) for x in query]
+
+    @property
+    def sampler_keys(self):
+        return (None,) if self.explorable and self.category_id != 1 else ()
 
-        for item in cls.raw(query):
-            return item
+    @classmethod
+    def get_random(cls):
+        """ Random explorable item, weighted by chance. """
+        return cls.sampler.draw()
 
     @property
     def embed(self):
@@ -262,6 +379,9 @@ class Item(BaseModel):
         embed.description = self.description
         return embed
 
+Item.sampler = WeightedSampler(Item.weighted_rows)
+Item.add_save_listener(lambda x : Item.sampler.update(x.id, x, x.chance, x.sampler_keys))
+
 class HumanItem(BaseModel):
     human  = peewee.ForeignKeyField (Human, null = False, backref = "human_items")
     item   = peewee.ForeignKeyField (Item, null = False)
@@ -1,6 +1,5 @@
 import datetime
 from enum import Enum
-import asyncio
 import random
 
 import peewee
@@ -196,13 +195,41 @@ class Earthling(BaseModel):
             human = config.bot.get_human(user = member)
         )
 
+class ModerationRule(BaseModel):
+    guild_id   = peewee.BigIntegerField (null = False)
+    word       = peewee.TextField       (null = False)
+    whole_word = peewee.BooleanField    (null = False, default = False)
+
+class SpamThreshold(BaseModel):
+    guild_id   = peewee.BigIntegerField (null = False, unique = True)
+    messages   = peewee.IntegerField    (null = False, default = 6)
+    seconds    = peewee.IntegerField    (null = False, default = 5)
+    duplicates = peewee.IntegerField    (null = False, default = 4)
+    mentions   = peewee.IntegerField    (null = False, default = 10)
+
+class StaffVote(BaseModel):
+    message_id = peewee.BigIntegerField (null = False, unique = True)
+    channel_id = peewee.BigIntegerField (null = False)
+    content    = peewee.TextField       (null = False)
+    finished   = peewee.BooleanField    (null = False, default = False)
+
+class StaffVoteBallot(BaseModel):
+    vote    = peewee.ForeignKeyField (StaffVote, backref = "ballots", on_delete = "CASCADE")
+    user_id = peewee.BigIntegerField (null = False)
+    emoji   = peewee.CharField       (null = False, max_length = 32)
+
+    class Meta:
+        indexes = (
+            (('vote', 'user_id', 'emoji'), True),
+        )
+
 class TemporaryVoiceChannel(BaseModel):
     guild_id    = peewee.BigIntegerField  (null = False)
     channel_id  = peewee.BigIntegerField  (null = False)
 
     def delete_instance(self, *args, **kwargs):
         if self.channel is not None:
-            asyncio.gather(self.channel.delete(reason = "Temporary VC channel removed."))
+            self.bot.dispatcher.call(self.channel, "delete", reason = "Temporary VC channel removed.")
         super().delete_instance(*args, **kwargs)
 
 class RedditAdvertisement(BaseModel):
@@ -10,6 +10,8 @@ import peewee
 from .base import BaseModel, EnumField, EmojiField, PercentageField, TimeDeltaField, CountryField, LanguageField
 from .human import Human, Item, HumanItem
 from src.utils.enums import Gender
+from src.utils.geodesic import get_distance_matrix, travel_minutes
+import src.config as config
 
 class Activity(BaseModel):
     start_date = peewee.DateTimeField   (null = True, default = lambda : datetime.datetime.utcnow())
@@ -33,18 +35,7 @@ class TravelActivity(Activity):
         if self.residence is None or self.destination is None:
             return
 
-        R = 6373.0
-
-        lat1, lon1 = [math.radians(x) for x in self.residence.capital_latlng()]
-        lat2, lon2 = [math.radians(x) for x in self.destination.capital_latlng()]
-
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        return R * c
+        return get_distance_matrix().distance(self.residence, self.destination)
 
     def calculate_duration(self):
         min_time_in_minutes = 45
@@ -53,12 +44,7 @@ class TravelActivity(Activity):
         if km is None:
             return random.randint(min_time_in_minutes, max_time_in_minutes+1)
 
-        duration = int(km / 40)
-        if duration < min_time_in_minutes:
-            duration = min_time_in_minutes
-        elif duration > max_time_in_minutes:
-            duration = max_time_in_minutes
-        return duration
+        return int(travel_minutes(km, min_minutes = min_time_in_minutes, max_minutes = max_time_in_minutes))
 
 class Pigeon(BaseModel):
     emojis = {
@@ -135,25 +121,33 @@ class Pigeon(BaseModel):
                 human = self.human
             )
 
-    def update_stats(self, data, increment = True, save = True):
-        human = self.bot.get_human(user = self.human.user_id)
+    def apply_stats(self, data, increment = True):
+        """ Applies everything but gold in memory. Returns whether the pigeon died. """
+        died = False
         for key, value in data.items():
             if key == "gold":
-                human.gold += value
+                continue
+            if increment:
+                setattr(self, key, (getattr(self, key) + value))
             else:
-                if increment:
-                    setattr(self, key, (getattr(self, key) + value))
-                else:
-                    setattr(self, key, value)
-
-                # new_value = getattr(self, key)
-                # if key == "food" and new_value >= 100:
-                    # self.create_buff("fully_fed")
-
-                if key == "health":
-                    if self.health <= 0:
-                        self.condition = self.Condition.dead
-                        SystemMessage.create(text = self.bot.translate("pigeon_dead"), human = human)
+                setattr(self, key, value)
+
+            # new_value = getattr(self, key)
+            # if key == "food" and new_value >= 100:
+                # self.create_buff("fully_fed")
+
+            if key == "health":
+                if self.health <= 0:
+                    self.condition = self.Condition.dead
+                    died = True
+        return died
+
+    def update_stats(self, data, increment = True, save = True):
+        human = self.bot.human_cache.get_by_id(self.human_id)
+        if "gold" in data:
+            human.gold += data["gold"]
+        if self.apply_stats(data, increment = increment):
+            SystemMessage.create(text = self.bot.translate("pigeon_dead"), human = human)
         try:
             if save:
                 self.save()
@@ -161,6 +155,59 @@ class Pigeon(BaseModel):
         except ValueError:
             pass
 
+    @classmethod
+    def decay_stats(cls):
+        """ The hourly stat decay of every active idle pigeon in a constant number of queries.
+            Pigeons with the same decay share one UPDATE, deaths are marked and messaged in bulk.
+            Meant to run inside a transaction. Returns the (id, human_id) of the pigeons that died.
+        """
+        now = datetime.datetime.utcnow()
+
+        query = cls.select(cls.id, cls.human, cls.food, cls.cleanliness, cls.health)
+        query = query.where(cls.condition == cls.Condition.active)
+        query = query.where(cls.status == cls.Status.idle)
+        pigeons = list(query.tuples())
+        if not pigeons:
+            return []
+
+        query = PigeonBuff.select(PigeonBuff.pigeon, Buff.code)
+        query = query.join(Buff, on = (PigeonBuff.buff == Buff.id))
+        query = query.join(cls, on = (PigeonBuff.pigeon == cls.id))
+        query = query.where(cls.condition == cls.Condition.active)
+        query = query.where(cls.status == cls.Status.idle)
+        query = query.where(PigeonBuff.due_date > now)
+        query = query.where(Buff.code.in_(("fully_fed", "bleeding")))
+        buffs = {}
+        for pigeon_id, code in query.tuples():
+            buffs.setdefault(pigeon_id, set()).add(code)
+
+        groups = {}
+        dead   = []
+        for id, human_id, food, cleanliness, health in pigeons:
+            codes = buffs.get(id, ())
+            decay = {"food" : 0 if "fully_fed" in codes else 1, "health" : 0, "happiness" : 1, "cleanliness" : 1}
+            if "bleeding" in codes:
+                decay["health"] += 2
+            if food <= 20 or cleanliness <= 20:
+                decay["health"] += 1
+            if food == 0:
+                decay["health"] += 2
+
+            groups.setdefault(tuple(decay.items()), []).append(id)
+            if health - decay["health"] <= 0:
+                dead.append((id, human_id))
+
+        for decay, ids in groups.items():
+            fields = {getattr(cls, k) : peewee.fn.GREATEST(getattr(cls, k) - v, 0) for k, v in decay if v > 0}
+            cls.update(fields).where(cls.id.in_(ids)).execute()
+
+        if dead:
+            cls.update(condition = cls.Condition.dead).where(cls.id.in_([x[0] for x in dead])).execute()
+            text = config.bot.translate("pigeon_dead")
+            SystemMessage.insert_many([{"human" : x[1], "text" : text} for x in dead]).execute()
+
+        return dead
+
     @property
     def current_activity(self):
         if self.status == self.Status.exploring:
@@ -246,6 +293,25 @@ class PigeonRelationship(BaseModel):
         query = query.order_by(cls.score.asc())
         return query
 
+    @classmethod
+    def get_many_for(cls, pairs):
+        """ Relationships of many (pigeon1_id, pigeon2_id) pairs in one query, keyed by frozenset of the ids.
+            Missing relationships are returned unsaved.
+        """
+        ids = {x for pair in pairs for x in pair}
+        query = cls.select()
+        query = query.where(cls.pigeon1.in_(ids))
+        query = query.where(cls.pigeon2.in_(ids))
+        relationships = {}
+        for relationship in query:
+            relationships.setdefault(frozenset((relationship.pigeon1_id, relationship.pigeon2_id)), relationship)
+
+        for pigeon1, pigeon2 in pairs:
+            key = frozenset((pigeon1, pigeon2))
+            if key not in relationships:
+                relationships[key] = cls(pigeon1 = pigeon1, pigeon2 = pigeon2, score = 0)
+        return relationships
+
     @classmethod
     def get_or_create_for(cls, pigeon1, pigeon2):
         query = cls.select()
@@ -323,6 +389,19 @@ class Challenge(Activity):
     def validate(self, ctx):
         return None
 
+    @classmethod
+    def prefetch_pigeons(cls, challenges):
+        """ Loads the pigeons of many challenges, with their humans, in one query. """
+        ids = {x.pigeon1_id for x in challenges} | {x.pigeon2_id for x in challenges}
+        query = Pigeon.select(Pigeon, Human)
+        query = query.join(Human, on = (Pigeon.human == Human.id))
+        query = query.where(Pigeon.id.in_(ids))
+        pigeons = {x.id : x for x in query}
+        for challenge in challenges:
+            challenge.pigeon1 = pigeons[challenge.pigeon1_id]
+            challenge.pigeon2 = pigeons[challenge.pigeon2_id]
+        return pigeons
+
     def delete_instance(self, *args, **kwargs):
         self.pigeon1.status = Pigeon.status.idle
         self.pigeon2.status = Pigeon.status.idle
@@ -2,7 +2,6 @@ import datetime
 import discord
 from enum import Enum
 import io
-import asyncio
 
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
@@ -103,7 +102,7 @@ class Poll(BaseModel):
         for option in self.options:
             await msg.add_reaction(option.reaction)
         if self.pin:
-            asyncio.gather(msg.pin())
+            self.bot.dispatcher.call(msg, "pin")
         self.message_id = msg.id
         return msg
 
@@ -126,7 +125,15 @@ class Poll(BaseModel):
 
     @property
     def votes(self):
-        votes = {x:len(x.votes) for x in self.options}
+        counts = self.bot.poll_votes.counts(self.message_id)
+        if counts is not None:
+            votes = {x:counts.get(x.id, 0) for x in self.options}
+        else:
+            query = Option.select(Option, peewee.fn.COUNT(Vote.id).alias("vote_count"))
+            query = query.join(Vote, peewee.JOIN.LEFT_OUTER, on = (Vote.option == Option.id))
+            query = query.where(Option.poll == self.id)
+            query = query.group_by(Option.id)
+            votes = {x:x.vote_count for x in query}
 
         total = sum(votes.values())
 
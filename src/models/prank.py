@@ -93,7 +93,7 @@ class NicknamePrank(Prank):
 
     async def revert(self):
         member = self.victim.member
-        await member.edit(nick = self.old_nickname)
+        await self.bot.dispatcher.edit(member, nick = self.old_nickname)
 
 class RolePrank(Prank):
     duration   = datetime.timedelta(hours = 12)
@@ -131,7 +131,7 @@ class RolePrank(Prank):
 
     async def revert(self):
         try:
-            await self.role.delete(reason = "Prank expired")
+            await self.bot.dispatcher.call(self.role, "delete", reason = "Prank expired")
         except:
             pass
 
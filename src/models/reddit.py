@@ -55,18 +55,17 @@ class Subreddit(BaseModel):
         if post is None:
             return
 
-        args = []
         kwargs = {}
 
         embed = self.get_post_embed(post)
         if embed is None:
             lines = [post.url, f"<https://reddit.com{post.permalink}>", post.title]
-            args.append("\n".join(lines))
+            kwargs["content"] = "\n".join(lines)
         else:
             kwargs["embed"] = embed
         sendable = self.sendable
         if sendable is not None:
-            await self.sendable.send(*args, **kwargs)
+            await self.bot.dispatcher.send(sendable, **kwargs)
 
     @property
     def latest_post(self):
@@ -4,6 +4,7 @@ import discord
 import peewee
 
 from .base import BaseModel
+from src.utils.sampling import WeightedSampler
 
 class Scene(BaseModel):
     command_name         = peewee.CharField(column_name = "name", unique = True, max_length = 100)
@@ -33,35 +34,25 @@ class Scenario(BaseModel):
 
 
     @classmethod
-    def get_random(cls, scene = None, win = False):
-        query = """
-            SELECT results.* FROM (
-            SELECT {table_name}.*, @running_total AS previous_total, @running_total := @running_total + {chance_column_name} AS running_total, until.rand
-            FROM (
-                SELECT round(rand() * init.max) AS rand FROM (
-                SELECT sum({chance_column_name}) - 1 AS max FROM {table_name} {where}
-                ) AS init
-            ) AS until,
-            (SELECT * FROM {table_name} {where}) AS {table_name},
-            ( SELECT @running_total := 0.00 ) AS vars
-            ) AS results
-            WHERE results.rand >= results.previous_total AND results.rand < results.running_total;
-        """
-
-        where = "WHERE 1 = 1 "
+    def weighted_rows(cls, key):
+        scene_id, win = key
+        query = cls.select()
+        query = query.where((cls.min > 0) if win else (cls.min < 0))
+        if scene_id is not None:
+            query = query.where(cls.scene == scene_id)
+        return [(x.id, x, x.probability) for x in query]
 
-        if scene is not None:
-            where += f"AND scene_id = {scene.id} "
-        where += f"AND min " + (">" if win else "<") + " 0"
-
-        query = query.format(
-            table_name = cls._meta.table_name,
-            where = where,
-            chance_column_name = "probability"
-        )
+    @property
+    def sampler_keys(self):
+        if self.min == 0:
+            return ()
+        win = self.min > 0
+        return ((self.scene_id, win), (None, win))
 
-        for scenario in cls.raw(query):
-            return scenario
+    @classmethod
+    def get_random(cls, scene = None, win = False):
+        """ Random winning or losing scenario, of one scene or all of them, weighted by probability. """
+        return cls.sampler.draw((scene.id if scene is not None else None, win))
 
     @property
     def random_value(self):
@@ -74,4 +65,7 @@ class Scenario(BaseModel):
     @range.setter
     def range(self, value):
         self.min = value.start
-        self.max = value.stop
\ No newline at end of file
+        self.max = value.stop
+
+Scenario.sampler = WeightedSampler(Scenario.weighted_rows)
+Scenario.add_save_listener(lambda x : Scenario.sampler.update(x.id, x, x.probability, x.sampler_keys))
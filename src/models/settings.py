@@ -4,6 +4,7 @@ import peewee
 
 from .base import BaseModel, JsonField, EnumField
 from src.discord.errors.base import SendableException
+import src.config as config
 
 class Locale(BaseModel):
     name = peewee.CharField(primary_key = True, max_length = 5)
@@ -17,15 +18,139 @@ class Translation(BaseModel):
     locale      = peewee.ForeignKeyField(Locale, column_name = "locale", default = "en_US")
     value       = peewee.BigIntegerField  (null = False)
 
+class TranslationCatalogue:
+    """ All translations per locale, loaded in one query. Unknown keys are remembered as missing. """
+
+    def __init__(self):
+        self._translations = None
+        self.missing       = {}
+        self.version       = 0
+
+    @staticmethod
+    def _fetch():
+        translations = {}
+        query = Translation.select(Translation.locale, Translation.message_key, Translation.value)
+        for locale, key, value in query.tuples():
+            translations.setdefault(locale, {})[key] = value
+        return translations
+
+    def _swap(self, translations):
+        self._translations = translations
+        self.version += 1
+        for locale, missing in self.missing.items():
+            missing.difference_update(translations.get(locale, ()))
+
+    def load(self):
+        self._swap(self._fetch())
+
+    async def reload(self):
+        self._swap(await Translation._meta.database.run(self._fetch))
+
+    def get_missing(self, locale):
+        if locale not in self.missing:
+            self.missing[locale] = set()
+        return self.missing[locale]
+
+    def translate(self, key, locale = "en_US"):
+        if self._translations is None:
+            self.load()
+
+        try:
+            return self._translations[locale][key]
+        except KeyError:
+            self.get_missing(locale).add(key)
+            return key
+
 class Settings(BaseModel):
     guild_id = peewee.BigIntegerField(null = False)
     locale   = peewee.ForeignKeyField(Locale, column_name = "locale", default = "en_US")
 
+    def save(self, *args, **kwargs):
+        rows = super().save(*args, **kwargs)
+        if self.bot is not None:
+            self.bot.guild_settings.invalidate(self.guild_id)
+        return rows
+
     def get_channel(self, name):
-        for channel in self.channels:
-            if channel.name == name:
-                return channel.channel
-        raise SendableException(f"{name} channel was not found. '{self.bot.command_prefix}channel set {name} #mention' to set.")
+        return self.bot.guild_settings.get_channel(self.guild, name)
+
+class GuildSettings:
+    __slots__ = ("id", "guild_id", "locale", "channels", "embeds")
+
+    def __init__(self, id, guild_id, locale):
+        self.id       = id
+        self.guild_id = guild_id
+        self.locale   = locale
+        self.channels = {}
+        self.embeds   = {}
+
+class GuildSettingsCache:
+    """ Locale, named channels and named embeds of every guild, kept in memory. """
+
+    def __init__(self):
+        self._guilds = {}
+
+    def __contains__(self, guild_id):
+        return guild_id in self._guilds
+
+    @staticmethod
+    def _fetch(guild_ids = None):
+        guilds = {}
+        query = Settings.select(Settings.id, Settings.guild_id, Settings.locale).order_by(Settings.id.desc())
+        if guild_ids is not None:
+            query = query.where(Settings.guild_id.in_(guild_ids))
+        for id, guild_id, locale in query.tuples():
+            guilds[guild_id] = GuildSettings(id, guild_id, locale)
+
+        by_id = {x.id : x for x in guilds.values()}
+        if not by_id:
+            return guilds
+
+        query = NamedChannel.select(NamedChannel.settings, NamedChannel.name, NamedChannel.channel_id)
+        query = query.where(NamedChannel.settings.in_(list(by_id)))
+        for settings_id, name, channel_id in query.tuples():
+            by_id[settings_id].channels[name] = channel_id
+
+        query = NamedEmbed.select(NamedEmbed.settings, NamedEmbed.name, NamedEmbed.data)
+        query = query.where(NamedEmbed.settings.in_(list(by_id)))
+        for named_embed in query:
+            by_id[named_embed.settings_id].embeds[named_embed.name] = named_embed.data
+        return guilds
+
+    def load(self):
+        self._guilds = self._fetch()
+
+    async def reload(self):
+        self._guilds = await Settings._meta.database.run(self._fetch)
+
+    async def reload_guild(self, guild_id):
+        guilds = await Settings._meta.database.run(self._fetch, [guild_id])
+        self._guilds.update(guilds)
+
+    def invalidate(self, guild_id):
+        self._guilds.pop(guild_id, None)
+
+    def get(self, guild_id):
+        if guild_id not in self._guilds:
+            Settings.get_or_create(guild_id = guild_id)
+            self._guilds.update(self._fetch([guild_id]))
+        return self._guilds[guild_id]
+
+    def get_locale(self, guild, default = "en_US"):
+        if guild is None or guild.id not in self._guilds:
+            return default
+        return self._guilds[guild.id].locale
+
+    def get_channel(self, guild, name):
+        channel_id = self.get(guild.id).channels.get(name)
+        if channel_id is None:
+            raise SendableException(f"{name} channel was not found. '{config.bot.command_prefix}channel set {name} #mention' to set.")
+        return guild.get_channel(channel_id)
+
+    def get_embed(self, guild, name):
+        data = self.get(guild.id).embeds.get(name)
+        if data is not None:
+            return NamedEmbed.to_embed(data, guild)
 
 class NamedEmbed(BaseModel):
     settings    = peewee.ForeignKeyField   (Settings, backref="embeds")
@@ -36,15 +161,19 @@ class NamedEmbed(BaseModel):
         if "color" not in data:
             data["color"] = self.bot.get_dominant_color(self.settings.guild)
 
-    @property
-    def embed(self):
-        embed = discord.Embed.from_dict(self.data)
+    @classmethod
+    def to_embed(cls, data, guild):
+        embed = discord.Embed.from_dict(data)
 
         if embed.color == discord.Embed.Empty:
-            embed.color = self.bot.get_dominant_color(self.settings.guild)
+            embed.color = config.bot.get_dominant_color(guild)
 
         return embed
 
+    @property
+    def embed(self):
+        return self.to_embed(self.data, self.settings.guild)
+
     def get_embed_only_selected_fields(self, field_indexes):
         embed = self.embed
 
@@ -0,0 +1,127 @@
+import datetime
+
+from .human import Item, HumanItem
+from .pigeon import Pigeon, Buff, PigeonBuff, PigeonRelationship, LanguageMastery, Mail
+from src.utils.cache import LRUCache
+
+class ProfileSnapshot:
+    """ Everything the profile, inventory and pigeon commands show of one human, loaded in at most six queries. """
+
+    __slots__ = ("human", "pigeon", "human_items", "unread_mail", "buffs", "language_masteries", "relationships")
+
+    def __init__(self, human):
+        self.human = human
+
+        query = HumanItem.select(HumanItem, Item)
+        query = query.join(Item, on = (HumanItem.item == Item.id))
+        query = query.where(HumanItem.human == human.id)
+        self.human_items = list(query)
+
+        query = Mail.select()
+        query = query.where(Mail.recipient == human.id)
+        query = query.where(Mail.read == False)
+        query = query.where(Mail.finished == True)
+        self.unread_mail = query.count()
+
+        query = Pigeon.select()
+        query = query.where(Pigeon.human == human.id)
+        query = query.where(Pigeon.condition == Pigeon.Condition.active)
+        self.pigeon = query.first()
+
+        self.buffs              = []
+        self.language_masteries = []
+        self.relationships      = []
+        if self.pigeon is None:
+            return
+        self.pigeon.human = human
+
+        query = PigeonBuff.select(PigeonBuff, Buff)
+        query = query.join(Buff, on = (PigeonBuff.buff == Buff.id))
+        query = query.where(PigeonBuff.pigeon == self.pigeon.id)
+        query = query.where(PigeonBuff.due_date > datetime.datetime.utcnow())
+        self.buffs = list(query)
+
+        query = LanguageMastery.select()
+        query = query.where(LanguageMastery.pigeon == self.pigeon.id)
+        query = query.order_by(LanguageMastery.mastery.desc())
+        self.language_masteries = list(query)
+
+        pigeon1 = Pigeon.alias("pigeon1")
+        pigeon2 = Pigeon.alias("pigeon2")
+        query = PigeonRelationship.select(PigeonRelationship, pigeon1, pigeon2)
+        query = query.join(pigeon1, on = (PigeonRelationship.pigeon1 == pigeon1.id), attr = "pigeon1")
+        query = query.switch(PigeonRelationship)
+        query = query.join(pigeon2, on = (PigeonRelationship.pigeon2 == pigeon2.id), attr = "pigeon2")
+        query = query.where((PigeonRelationship.pigeon1 == self.pigeon.id) | (PigeonRelationship.pigeon2 == self.pigeon.id))
+        query = query.order_by(PigeonRelationship.score.asc())
+        self.relationships = list(query)
+
+    @property
+    def active_buffs(self):
+        now = datetime.datetime.utcnow()
+        return [x for x in self.buffs if x.due_date > now]
+
+    @property
+    def items_discovered(self):
+        return len([x for x in self.human_items if x.found])
+
+    @property
+    def items_in_possession(self):
+        if self.human_items:
+            return sum(x.amount for x in self.human_items)
+
+    def other_pigeons(self):
+        """ (relationship, other pigeon) pairs, lowest score first. """
+        for relationship in self.relationships:
+            if relationship.pigeon1_id != self.pigeon.id:
+                yield relationship, relationship.pigeon1
+            else:
+                yield relationship, relationship.pigeon2
+
+class ProfileCache:
+    """ ProfileSnapshots per human id. Saves of anything a snapshot contains drop it, bulk writes call invalidate. """
+
+    def __init__(self, max_size = 1000, ttl = 600):
+        self._snapshots = LRUCache(max_size = max_size, ttl = ttl, on_evict = self._on_evict)
+        self._owners    = {}
+        self.loads      = 0
+
+        Pigeon.add_save_listener(lambda x : self.invalidate(x.human_id))
+        HumanItem.add_save_listener(lambda x : self.invalidate(x.human_id))
+        Mail.add_save_listener(lambda x : self.invalidate(x.recipient_id))
+        PigeonBuff.add_save_listener(lambda x : self.invalidate_pigeons(x.pigeon_id))
+        LanguageMastery.add_save_listener(lambda x : self.invalidate_pigeons(x.pigeon_id))
+        PigeonRelationship.add_save_listener(lambda x : self.invalidate_pigeons(x.pigeon1_id, x.pigeon2_id))
+
+    @property
+    def stats(self):
+        stats = self._snapshots.stats
+        stats["loads"] = self.loads
+        return stats
+
+    def _on_evict(self, human_id, snapshot):
+        if snapshot.pigeon is not None:
+            self._owners.pop(snapshot.pigeon.id, None)
+
+    def get(self, human):
+        snapshot = self._snapshots.get(human.id)
+        if snapshot is None or snapshot.human is not human:
+            snapshot = ProfileSnapshot(human)
+            self.loads += 1
+            self._snapshots[human.id] = snapshot
+            if snapshot.pigeon is not None:
+                self._owners[snapshot.pigeon.id] = human.id
+        return snapshot
+
+    def invalidate(self, *human_ids):
+        for human_id in human_ids:
+            snapshot = self._snapshots.pop(human_id)
+            if snapshot is not None:
+                self._on_evict(human_id, snapshot)
+
+    def invalidate_pigeons(self, *pigeon_ids):
+        self.invalidate(*[self._owners[x] for x in pigeon_ids if x in self._owners])
+
+    def clear(self):
+        self._snapshots.clear()
+        self._owners.clear()
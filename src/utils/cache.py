@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """ Size and TTL bounded mapping that evicts the least recently used entry first. """
+
+    __slots__ = ("max_size", "ttl", "on_evict", "_data", "hits", "misses", "evictions")
+
+    def __init__(self, max_size = 1024, ttl = None, on_evict = None):
+        self.max_size  = max_size
+        self.ttl       = ttl
+        self.on_evict  = on_evict
+        self._data     = OrderedDict()
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and (time.monotonic() - stored_at) > self.ttl
+
+    def _evict(self, key):
+        value, _ = self._data.pop(key)
+        self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def get(self, key, default = None):
+        try:
+            value, stored_at = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        if self._expired(stored_at):
+            self._evict(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key, default = None):
+        """ Same as get, without touching recency or the counters. """
+        try:
+            value, stored_at = self._data[key]
+        except KeyError:
+            return default
+        return default if self._expired(stored_at) else value
+
+    def __setitem__(self, key, value):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (value, time.monotonic())
+        while len(self._data) > self.max_size:
+            self._evict(next(iter(self._data)))
+
+    def __getitem__(self, key):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        missing = object()
+        return self.peek(key, missing) is not missing
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(list(self._data))
+
+    def values(self):
+        return [value for value, _ in self._data.values()]
+
+    def pop(self, key, default = None):
+        try:
+            value, _ = self._data.pop(key)
+            return value
+        except KeyError:
+            return default
+
+    def clear(self):
+        self._data.clear()
+
+    def prune(self):
+        """ Drops every expired entry. """
+        for key in [k for k, (_, stored_at) in self._data.items() if self._expired(stored_at)]:
+            self._evict(key)
+
+    @property
+    def stats(self):
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,132 @@
+import re
+import functools
+from enum import Enum
+from collections import namedtuple
+
+import numpy as np
+import pycountry
+
+class MatchType(Enum):
+    currency    = 1
+    measurement = 2
+    timezone    = 3
+
+Match = namedtuple("Match", ("type", "unit", "value"))
+
+@functools.lru_cache(maxsize = None)
+def get_currency(alpha_3):
+    return pycountry.currencies.get(alpha_3 = alpha_3.upper())
+
+class ConversionScanner:
+    """ Finds values with units, currency symbols followed by values and gmt / utc offsets in one pass of one compiled pattern.
+        Messages without digits or a timezone are rejected before the pattern runs.
+    """
+
+    timezones = ("gmt", "utc")
+
+    def __init__(self, units, currencies, symbols, aliases):
+        """ units are the measurement units as they are written, currencies the supported alpha 3 codes,
+            symbols maps lowercase alpha 3 codes to their symbol and aliases maps canonical units to how they are written.
+        """
+        currencies = set(x.upper() for x in currencies)
+        # content is lowercased before scanning, symbols with capitals can never match.
+        symbols = {k : v for k, v in symbols.items() if v == v.lower()}
+
+        tokens = set(units) | set(x.lower() for x in currencies) | set(symbols.values())
+
+        self._aliases = {}
+        self._types   = {}
+        for token in tokens:
+            canonical = tuple(k for k, v in aliases.items() if v.lower() == token) or (token, )
+            self._aliases[token] = canonical
+            is_currency = token.upper() in currencies or token in symbols.values()
+            self._types[token] = MatchType.currency if is_currency else MatchType.measurement
+
+        self._symbols = {}
+        for alpha_3, symbol in symbols.items():
+            self._symbols.setdefault(symbol, []).append(alpha_3)
+
+        alternation = lambda x : "|".join(re.escape(y) for y in sorted(x, key = len, reverse = True))
+        number = r"\d+(?:\.\d+)*"
+        self._pattern = re.compile(
+            rf"(?P<value>[+-]?{number})(?P<unit>{alternation(tokens)})(?!\w)"
+            rf"|(?P<symbol>{alternation(self._symbols)})(?P<amount>{number})(?!\w)"
+            rf"|(?P<timezone>{alternation(self.timezones)})(?P<sign>[+-])?(?P<hours>\d+)?(?!\w)"
+        )
+        self._digit = re.compile(r"\d").search
+
+    def rejects(self, content):
+        return self._digit(content) is None and not any(x in content for x in self.timezones)
+
+    def scan(self, content):
+        content = content.lower()
+        if self.rejects(content):
+            return []
+
+        matches = []
+        for match in self._pattern.finditer(content):
+            groups = match.groupdict()
+            if groups["unit"] is not None:
+                unit = groups["unit"]
+                try:
+                    value = float(groups["value"])
+                except ValueError:
+                    continue
+                type = self._types[unit]
+                matches.extend(Match(type, x, value) for x in self._aliases[unit])
+            elif groups["symbol"] is not None:
+                try:
+                    value = float(groups["amount"])
+                except ValueError:
+                    continue
+                matches.extend(Match(MatchType.currency, x, value) for x in self._symbols[groups["symbol"]])
+            else:
+                hours = int(groups["hours"] or "0")
+                value = -hours if groups["sign"] == "-" else hours
+                matches.append(Match(MatchType.timezone, groups["timezone"], value))
+        return matches
+
+class RateMatrix:
+    """ Cross rates between every currency a CurrencyConverter knows in one matrix, each currency at its own last known rate
+        like CurrencyConverter.convert does without a date, so currencies the ECB stopped quoting keep their final rate.
+        matrix[i, j] is the amount of currency j one unit of currency i is worth, NaN when either has no rate at all.
+    """
+
+    def __init__(self, converter):
+        self.load(converter)
+
+    def load(self, converter):
+        date  = max(x.last_date for x in converter.bounds.values())
+        codes = sorted(converter.currencies)
+
+        rates = np.full(len(codes), np.nan)
+        for i, code in enumerate(codes):
+            try:
+                # converting from code uses the last date code has a rate for.
+                rates[i] = 1 / converter.convert(1, code, "EUR")
+            except Exception:
+                # newer versions raise RateNotFoundError, which is not a ValueError.
+                pass
+
+        self.date    = date
+        self.codes   = codes
+        self.indices = {x : i for i, x in enumerate(codes)}
+        self.matrix  = rates[np.newaxis, :] / rates[:, np.newaxis]
+
+    def __contains__(self, code):
+        return code in self.indices
+
+    def convert_many(self, amount, currency, others):
+        """ amount of currency in each of others, NaN where there is no rate. Raises ValueError for unknown currencies. """
+        try:
+            row     = self.matrix[self.indices[currency]]
+            columns = [self.indices[x] for x in others]
+        except KeyError as e:
+            raise ValueError(f"{e.args[0]} is not a supported currency")
+        return float(amount) * row[columns]
+
+    def convert(self, amount, currency, other):
+        value = self.convert_many(amount, currency, (other, ))[0]
+        if np.isnan(value):
+            raise ValueError(f"No rate for {currency} to {other}")
+        return float(value)
@@ -8,44 +8,126 @@ from covid import Covid
 class CountryNotFound(Exception):
     pass
 
-class Country(CountryInfo):
-    def __init__(self, argument):
-        super().__init__(argument)
-        if super().name() == argument:
-            raise CountryNotFound("Not found.")
+class Country:
+    """ Immutable, interned country. Instances are only created once, when the registry is built at import. """
+
+    __slots__ = ("_alpha_2", "_alpha_3", "_name", "_demonym", "_capital_latlng", "_languages", "_currencies")
+
+    _registry     = {}
+    _with_capital = ()
+    _covid_status = {}
+
+    def __new__(cls, argument):
         try:
-            iso = self.iso()
+            return cls._registry[str(argument).lower()]
         except KeyError:
             raise CountryNotFound("Not found.")
 
-        self._country = pycountry.countries.get(alpha_2 = iso["alpha2"])
+    def __init__(self, argument):
+        pass
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    @classmethod
+    def _create(cls, info, country):
+        obj = object.__new__(cls)
+        capital_latlng = info.get("capital_latlng")
+        values = {
+            "_alpha_2"        : info["ISO"]["alpha2"],
+            "_alpha_3"        : info["ISO"].get("alpha3"),
+            "_name"           : country.name if country is not None else info["name"],
+            "_demonym"        : info.get("demonym"),
+            "_capital_latlng" : tuple(capital_latlng) if capital_latlng else None,
+            "_languages"      : tuple(pycountry.languages.get(alpha_2 = x) for x in info.get("languages", ())),
+            "_currencies"     : tuple(pycountry.currencies.get(alpha_3 = x) for x in info.get("currencies", ())),
+        }
+        for attr, value in values.items():
+            object.__setattr__(obj, attr, value)
+        return obj
+
+    @classmethod
+    def _build_registry(cls):
+        registry = {}
+        names    = {}
+        codes    = {}
+        with_capital = []
+
+        for info in CountryInfo().all().values():
+            try:
+                alpha_2 = info["ISO"]["alpha2"]
+            except KeyError:
+                continue
+
+            country = pycountry.countries.get(alpha_2 = alpha_2)
+            obj = cls._create(info, country)
 
-        self._covid_status = None
+            for spelling in info.get("altSpellings", ()):
+                registry.setdefault(spelling.lower(), obj)
+            names[info["name"].lower()] = obj
+            if country is not None:
+                names[country.name.lower()] = obj
+            codes[alpha_2.lower()] = obj
+            if obj._alpha_3 is not None:
+                codes[obj._alpha_3.lower()] = obj
+
+            if obj._capital_latlng is not None and country is not None:
+                with_capital.append(obj)
+
+        registry.update(names)
+        registry.update(codes)
+        cls._registry = registry
+        cls._with_capital = tuple(sorted(with_capital, key = lambda x : x._alpha_2))
+
+    @classmethod
+    def all(cls):
+        return sorted(set(cls._registry.values()), key = lambda x : x._alpha_2)
 
     def name(self):
-        return self._country.name
+        return self._name
+
+    def demonym(self):
+        return self._demonym
+
+    def iso(self):
+        return {"alpha2" : self._alpha_2, "alpha3" : self._alpha_3}
+
+    def capital_latlng(self):
+        if self._capital_latlng is None:
+            raise KeyError("capital_latlng")
+        return list(self._capital_latlng)
 
     def languages(self):
-        return [pycountry.languages.get(alpha_2 = x) for x in super().languages()]
+        return list(self._languages)
 
     def currencies(self):
-        return [pycountry.currencies.get(alpha_3 = x) for x in super().currencies()]
+        return list(self._currencies)
 
     @property
     def covid_status(self):
-        if self._covid_status is None:
+        if self._alpha_2 not in self._covid_status:
             covid = Covid()
-            self._covid_status = covid.get_status_by_country_name(self.name())
+            self._covid_status[self._alpha_2] = covid.get_status_by_country_name(self.name())
 
-        return self._covid_status
+        return self._covid_status[self._alpha_2]
 
     @property
     def alpha_2(self):
-        return self.iso()["alpha2"]
+        return self._alpha_2
+
+    @property
+    def alpha_3(self):
+        return self._alpha_3
 
     def __str__(self):
         return self.alpha_2
 
+    def __repr__(self):
+        return f"<Country {self.alpha_2}>"
+
+    def __reduce__(self):
+        return (self.__class__, (self._alpha_2,))
+
     @classmethod
     def from_alpha_2(cls, alpha_2):
         return cls(alpha_2)
@@ -65,19 +147,16 @@ class Country(CountryInfo):
     def flag_emoji(self):
         return "".join(emojize(f":regional_indicator_symbol_letter_{x}:") for x in self.alpha_2.lower())
 
+    @classmethod
+    def with_capital(cls):
+        return cls._with_capital
+
     @classmethod
     def random(cls):
-        alpha_2 = None
-        countries = list(pycountry.countries)
-        while alpha_2 is None:
-            alpha_2 = random.choice(countries).alpha_2
-            try:
-                CountryInfo(alpha_2).capital_latlng()
-            except KeyError:
-                alpha_2 = None
+        return random.choice(cls._with_capital)
 
-        return cls.from_alpha_2(alpha_2)
+Country._build_registry()
 
 if __name__ == "__main__":
     country = Country.from_alpha_2("nl")
-    print(country.covid_status)
\ No newline at end of file
+    print(country.covid_status)
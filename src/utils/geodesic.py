@@ -0,0 +1,68 @@
+import numpy as np
+
+from src.utils.country import Country
+
+EARTH_RADIUS_IN_KM = 6373.0
+
+def haversine(lat1, lon1, lat2, lon2):
+    """ Great-circle distance in km, in degrees. Accepts scalars or arrays that broadcast together. """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype = np.float64)) for x in (lat1, lon1, lat2, lon2))
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_IN_KM * c
+
+def travel_minutes(km, speed = 40, min_minutes = 45, max_minutes = 180):
+    return np.clip((np.asarray(km) / speed).astype(np.int64), min_minutes, max_minutes)
+
+class DistanceMatrix:
+    """ Capital to capital distances of every country with a capital. """
+
+    __slots__ = ("countries", "indexes", "coordinates", "distances")
+
+    def __init__(self, countries):
+        self.countries   = []
+        coordinates      = []
+        for country in countries:
+            try:
+                coordinates.append(country.capital_latlng())
+            except KeyError:
+                continue
+            self.countries.append(country)
+
+        self.indexes     = {x.alpha_2 : i for i, x in enumerate(self.countries)}
+        self.coordinates = np.array(coordinates, dtype = np.float64).reshape(-1, 2)
+        lat, lon         = self.coordinates[:, 0], self.coordinates[:, 1]
+        self.distances   = haversine(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+
+    def __contains__(self, country):
+        return country.alpha_2 in self.indexes
+
+    def distance(self, origin, destination):
+        try:
+            return float(self.distances[self.indexes[origin.alpha_2], self.indexes[destination.alpha_2]])
+        except KeyError:
+            return None
+
+    def distances_from(self, origin):
+        return self.distances[self.indexes[origin.alpha_2]]
+
+    def within_km(self, origin, max_km):
+        distances = self.distances_from(origin)
+        return [self.countries[i] for i in np.flatnonzero(distances <= max_km)]
+
+    def within_minutes(self, origin, minutes, **kwargs):
+        durations = travel_minutes(self.distances_from(origin), **kwargs)
+        return [self.countries[i] for i in np.flatnonzero(durations <= minutes)]
+
+_matrix = None
+
+def get_distance_matrix():
+    global _matrix
+    if _matrix is None:
+        _matrix = DistanceMatrix(Country.all())
+    return _matrix
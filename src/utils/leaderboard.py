@@ -0,0 +1,58 @@
+import bisect
+
+class Leaderboard:
+    """ Scores kept sorted from high to low with bisect. Ties are ordered by key. """
+
+    __slots__ = ("_scores", "_entries")
+
+    def __init__(self, scores = None):
+        self._scores  = dict(scores or {})
+        self._entries = sorted((-v, k) for k, v in self._scores.items())
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, key):
+        return key in self._scores
+
+    def __iter__(self):
+        for score, key in self._entries:
+            yield key, -score
+
+    def score(self, key, default = None):
+        return self._scores.get(key, default)
+
+    def _index(self, key, score):
+        return bisect.bisect_left(self._entries, (-score, key))
+
+    def set(self, key, score):
+        old = self._scores.get(key)
+        if old == score:
+            return
+        if old is not None:
+            del self._entries[self._index(key, old)]
+        self._scores[key] = score
+        bisect.insort(self._entries, (-score, key))
+
+    def add(self, key, amount):
+        self.set(key, self._scores.get(key, 0) + amount)
+
+    def remove(self, key):
+        score = self._scores.pop(key, None)
+        if score is not None:
+            del self._entries[self._index(key, score)]
+
+    def rank(self, key):
+        """ Zero based position of key, or None when it is not on the board. """
+        score = self._scores.get(key)
+        if score is not None:
+            return self._index(key, score)
+
+    def slice(self, offset, limit):
+        """ The (key, score) pairs from zero based position offset on. """
+        return [(key, -score) for score, key in self._entries[offset:offset + limit]]
+
+    def page_of(self, key, size):
+        """ Zero based index of the page of size entries that key is on, 0 when it is not on the board. """
+        rank = self.rank(key)
+        return 0 if rank is None else rank // size
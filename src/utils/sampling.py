@@ -0,0 +1,129 @@
+import math
+import random
+import threading
+
+class AliasTable:
+    """ Walker's alias method. Building is O(n), every draw after that is O(1). """
+
+    __slots__ = ("values", "weights", "total", "_probabilities", "_aliases")
+
+    def __init__(self, values, weights):
+        self.values  = list(values)
+        self.weights = [float(x) for x in weights]
+        self.total   = sum(self.weights)
+
+        n = len(self.values)
+        self._probabilities = [0.0] * n
+        self._aliases       = [0] * n
+        if n == 0 or self.total <= 0:
+            return
+
+        scaled = [x * n / self.total for x in self.weights]
+        small  = [i for i, x in enumerate(scaled) if x < 1.0]
+        large  = [i for i, x in enumerate(scaled) if x >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less]       = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        for i in small + large:
+            self._probabilities[i] = 1.0
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw_index(self, rng = random):
+        i = int(rng.random() * len(self.values))
+        return i if rng.random() < self._probabilities[i] else self._aliases[i]
+
+    def draw(self, rng = random):
+        if not self.values or self.total <= 0:
+            return None
+        return self.values[self.draw_index(rng)]
+
+class WeightedSampler:
+    """ Alias tables per key, for example one per filter. Rows of a key are loaded once through
+        loader(key) as (id, value, weight) tuples, update() moves single rows between the keys
+        that are loaded and only the touched tables are rebuilt, from memory, on their next draw.
+    """
+
+    def __init__(self, loader, seed = None):
+        self.loader  = loader
+        self.rng     = random.Random(seed)
+        self._rows   = {}
+        self._tables = {}
+        self._lock   = threading.Lock()
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
+    def table(self, key = None):
+        table = self._tables.get(key)
+        if table is None:
+            rows = self._rows.get(key)
+            if rows is None:
+                rows = {id : (value, weight) for id, value, weight in self.loader(key) if weight > 0}
+            with self._lock:
+                self._rows.setdefault(key, rows)
+                values = list(self._rows[key].values())
+                table = AliasTable([x[0] for x in values], [x[1] for x in values])
+                self._tables[key] = table
+        return table
+
+    def draw(self, key = None):
+        return self.table(key).draw(self.rng)
+
+    def update(self, id, value, weight, keys):
+        """ Puts a row in exactly the given keys, with the given weight. """
+        keys = set(keys)
+        with self._lock:
+            for key, rows in self._rows.items():
+                if key in keys and weight > 0:
+                    rows[id] = (value, weight)
+                elif id in rows:
+                    del rows[id]
+                else:
+                    continue
+                self._tables.pop(key, None)
+
+    def remove(self, id):
+        self.update(id, None, 0, ())
+
+    def invalidate(self, key = None):
+        """ Forgets one key, or every key when none is given, so it is loaded again on the next draw. """
+        with self._lock:
+            if key is None:
+                self._rows.clear()
+                self._tables.clear()
+            else:
+                self._rows.pop(key, None)
+                self._tables.pop(key, None)
+
+def chi_square(table, draws = 100000, rng = None):
+    """ Pearson's chi-square statistic of draws from table against its weights, with its degrees of freedom. """
+    rng = rng or random.Random()
+    counts = [0] * len(table)
+    for _ in range(draws):
+        counts[table.draw_index(rng)] += 1
+
+    statistic = 0.0
+    for count, weight in zip(counts, table.weights):
+        expected = draws * weight / table.total
+        if expected > 0:
+            statistic += (count - expected) ** 2 / expected
+    return statistic, len(table) - 1
+
+def chi_square_p_value(statistic, degrees_of_freedom):
+    """ Upper tail probability, with the Wilson-Hilferty approximation of the chi-square distribution. """
+    if degrees_of_freedom <= 0:
+        return 1.0
+    k = degrees_of_freedom
+    z = ((statistic / k) ** (1 / 3) - (1 - 2 / (9 * k))) / math.sqrt(2 / (9 * k))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def matches_weights(table, draws = 100000, alpha = 0.001, rng = None):
+    """ Whether draws from table are consistent with its weights at significance level alpha. """
+    return chi_square_p_value(*chi_square(table, draws = draws, rng = rng)) >= alpha
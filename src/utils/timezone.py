@@ -1,4 +1,5 @@
 import datetime
+import functools
 import requests
 from timezonefinder import TimezoneFinder
 from geopy.geocoders import Nominatim
@@ -6,6 +7,61 @@ import pytz
 
 user_agent = "timezone_locator"
 
+class TimezoneIndex:
+    """ Process wide lookups for timezones: one TimezoneFinder, memoised coordinates, zone -> country and offset -> zones. """
+
+    __slots__ = ("precision", "_finder", "_zone_countries", "_offsets", "_offsets_hour", "timezone_at")
+
+    def __init__(self, precision = 2, max_size = 8192):
+        self.precision       = precision
+        self._finder         = None
+        self._zone_countries = None
+        self._offsets        = None
+        self._offsets_hour   = None
+        self.timezone_at     = functools.lru_cache(maxsize = max_size)(self._timezone_at)
+
+    @property
+    def finder(self):
+        if self._finder is None:
+            self._finder = TimezoneFinder()
+        return self._finder
+
+    def _timezone_at(self, lng, lat):
+        return self.finder.timezone_at(lng = lng, lat = lat)
+
+    def zone_at(self, lng, lat):
+        return self.timezone_at(round(lng, self.precision), round(lat, self.precision))
+
+    def country_code(self, zone):
+        if self._zone_countries is None:
+            zone_countries = {}
+            for code in pytz.country_timezones:
+                for name in pytz.country_timezones[code]:
+                    zone_countries.setdefault(name, code)
+            self._zone_countries = zone_countries
+        return self._zone_countries.get(zone)
+
+    def offsets(self, now = None):
+        """ UTC offset -> common timezones with that offset, rebuilt every hour to follow DST changes. """
+        now = now or datetime.datetime.utcnow()
+        hour = now.replace(minute = 0, second = 0, microsecond = 0)
+        if self._offsets_hour != hour:
+            offsets = {}
+            for name in sorted(pytz.common_timezones_set):
+                offset = pytz.utc.localize(now).astimezone(pytz.timezone(name)).utcoffset()
+                offsets.setdefault(offset, []).append(name)
+            self._offsets = offsets
+            self._offsets_hour = hour
+        return self._offsets
+
+    def zones_at_hour(self, hour):
+        now = datetime.datetime.utcnow()
+        for offset, zones in self.offsets(now).items():
+            if (now + offset).hour == hour:
+                yield from zones
+
+timezone_index = TimezoneIndex()
+
 class Timezone:
     geolocator = Nominatim(user_agent=user_agent)
 
@@ -18,9 +74,7 @@ class Timezone:
         # self.country = self.geolocator.geocode(self.country_code, language="en")
 
     def _get_country_code(self):
-        for code in pytz.country_timezones:
-            if self.name in pytz.country_timezones[code]:
-                return code
+        return timezone_index.country_code(self.name)
 
     @classmethod
     def from_city(cls, name):
@@ -29,11 +83,8 @@ class Timezone:
 
     @classmethod
     def from_hour(cls, hour):
-        for tz_name in pytz.common_timezones_set:
-            tz = pytz.timezone(tz_name)
-            dt = datetime.datetime.now().astimezone(tz)
-            if dt.hour == hour:
-                return cls(tz_name)
+        for tz_name in timezone_index.zones_at_hour(hour):
+            return cls(tz_name)
 
     @classmethod
     def from_state(cls, name):
@@ -41,7 +92,7 @@ class Timezone:
 
     @classmethod
     def from_location(cls, long, lat):
-        return cls(TimezoneFinder().timezone_at(lng = long, lat = lat))
+        return cls(timezone_index.zone_at(long, lat))
 
     @property
     def current_time(self):
@@ -12,6 +12,7 @@ __version__ = '0.2.1'
 
 import math
 
+import numpy as np
 from PIL import Image
 
 
@@ -38,19 +39,21 @@ class ColorThief(object):
         """
         self.image = Image.open(file)
 
-    def get_color(self, quality=10):
+    def get_color(self, quality=10, max_size=None):
         """Get the dominant color.
 
         :param quality: quality settings, 1 is the highest quality, the bigger
                         the number, the faster a color will be returned but
                         the greater the likelihood that it will not be the
                         visually most dominant color
+        :param max_size: downscale the image so neither side exceeds this
+                         many pixels before quantizing, None keeps it as is
         :return tuple: (r, g, b)
         """
-        palette = self.get_palette(5, quality)
+        palette = self.get_palette(5, quality, max_size)
         return palette[0]
 
-    def get_palette(self, color_count=10, quality=10):
+    def get_palette(self, color_count=10, quality=10, max_size=None):
         """Build a color palette.  We are using the median cut algorithm to
         cluster similar colors.
 
@@ -58,19 +61,18 @@ class ColorThief(object):
         :param quality: quality settings, 1 is the highest quality, the bigger
                         the number, the faster the palette generation, but the
                         greater the likelihood that colors will be missed.
+        :param max_size: downscale the image so neither side exceeds this
+                         many pixels before quantizing, None keeps it as is
         :return list: a list of tuple in the form (r, g, b)
         """
         image = self.image.convert('RGBA')
-        width, height = image.size
-        pixels = image.getdata()
-        pixel_count = width * height
-        valid_pixels = []
-        for i in range(0, pixel_count, quality):
-            r, g, b, a = pixels[i]
-            # If pixel is mostly opaque and not white
-            if a >= 125:
-                if not (r > 250 and g > 250 and b > 250):
-                    valid_pixels.append((r, g, b))
+        if max_size is not None and max(image.size) > max_size:
+            image.thumbnail((max_size, max_size))
+        pixels = np.asarray(image).reshape(-1, 4)[::quality]
+        r, g, b, a = pixels[:, 0], pixels[:, 1], pixels[:, 2], pixels[:, 3]
+        # If pixel is mostly opaque and not white
+        valid = (a >= 125) & ~((r > 250) & (g > 250) & (b > 250))
+        valid_pixels = pixels[valid, :3]
 
         # Send array to quantize function which clusters values
         # using median cut algorithm
@@ -81,49 +83,39 @@ class ColorThief(object):
 class MMCQ(object):
     """Basic Python port of the MMCQ (modified median cut quantization)
     algorithm from the Leptonica library (http://www.leptonica.com/).
+    The histogram is a (r, g, b) shaped NumPy array of pixel counts.
     """
 
     SIGBITS = 5
     RSHIFT = 8 - SIGBITS
     MAX_ITERATION = 1000
     FRACT_BY_POPULATIONS = 0.75
+    HISTO_SIZE = 1 << SIGBITS
 
     @staticmethod
     def get_color_index(r, g, b):
         return (r << (2 * MMCQ.SIGBITS)) + (g << MMCQ.SIGBITS) + b
 
+    @staticmethod
+    def quantized(pixels):
+        return np.asarray(pixels, dtype=np.int64).reshape(-1, 3) >> MMCQ.RSHIFT
+
     @staticmethod
     def get_histo(pixels):
-        """histo (1-d array, giving the number of pixels in each quantized
+        """histo (3-d array, giving the number of pixels in each quantized
         region of color space)
         """
-        histo = dict()
-        for pixel in pixels:
-            rval = pixel[0] >> MMCQ.RSHIFT
-            gval = pixel[1] >> MMCQ.RSHIFT
-            bval = pixel[2] >> MMCQ.RSHIFT
-            index = MMCQ.get_color_index(rval, gval, bval)
-            histo[index] = histo.setdefault(index, 0) + 1
-        return histo
+        rgb = MMCQ.quantized(pixels)
+        index = MMCQ.get_color_index(rgb[:, 0], rgb[:, 1], rgb[:, 2])
+        size = MMCQ.HISTO_SIZE
+        histo = np.bincount(index, minlength=size ** 3)
+        return histo.reshape(size, size, size)
 
     @staticmethod
     def vbox_from_pixels(pixels, histo):
-        rmin = 1000000
-        rmax = 0
-        gmin = 1000000
-        gmax = 0
-        bmin = 1000000
-        bmax = 0
-        for pixel in pixels:
-            rval = pixel[0] >> MMCQ.RSHIFT
-            gval = pixel[1] >> MMCQ.RSHIFT
-            bval = pixel[2] >> MMCQ.RSHIFT
-            rmin = min(rval, rmin)
-            rmax = max(rval, rmax)
-            gmin = min(gval, gmin)
-            gmax = max(gval, gmax)
-            bmin = min(bval, bmin)
-            bmax = max(bval, bmax)
+        rgb = MMCQ.quantized(pixels)
+        rmin, gmin, bmin = (int(x) for x in rgb.min(axis=0))
+        rmax, gmax, bmax = (int(x) for x in rgb.max(axis=0))
         return VBox(rmin, rmax, gmin, gmax, bmin, bmax, histo)
 
     @staticmethod
@@ -139,49 +131,27 @@ class MMCQ(object):
         if vbox.count == 1:
             return (vbox.copy, None)
         # Find the partial sum arrays along the selected axis.
-        total = 0
-        sum_ = 0
-        partialsum = {}
-        lookaheadsum = {}
-        do_cut_color = None
+        box = vbox.histo_view
         if maxw == rw:
             do_cut_color = 'r'
-            for i in range(vbox.r1, vbox.r2+1):
-                sum_ = 0
-                for j in range(vbox.g1, vbox.g2+1):
-                    for k in range(vbox.b1, vbox.b2+1):
-                        index = MMCQ.get_color_index(i, j, k)
-                        sum_ += histo.get(index, 0)
-                total += sum_
-                partialsum[i] = total
+            sums = box.sum(axis=(1, 2))
         elif maxw == gw:
             do_cut_color = 'g'
-            for i in range(vbox.g1, vbox.g2+1):
-                sum_ = 0
-                for j in range(vbox.r1, vbox.r2+1):
-                    for k in range(vbox.b1, vbox.b2+1):
-                        index = MMCQ.get_color_index(j, i, k)
-                        sum_ += histo.get(index, 0)
-                total += sum_
-                partialsum[i] = total
+            sums = box.sum(axis=(0, 2))
         else:  # maxw == bw
             do_cut_color = 'b'
-            for i in range(vbox.b1, vbox.b2+1):
-                sum_ = 0
-                for j in range(vbox.r1, vbox.r2+1):
-                    for k in range(vbox.g1, vbox.g2+1):
-                        index = MMCQ.get_color_index(j, k, i)
-                        sum_ += histo.get(index, 0)
-                total += sum_
-                partialsum[i] = total
-        for i, d in partialsum.items():
-            lookaheadsum[i] = total - d
+            sums = box.sum(axis=(0, 1))
 
         # determine the cut planes
         dim1 = do_cut_color + '1'
         dim2 = do_cut_color + '2'
         dim1_val = getattr(vbox, dim1)
         dim2_val = getattr(vbox, dim2)
+
+        partialsum = dict(zip(range(dim1_val, dim2_val + 1), np.cumsum(sums).tolist()))
+        total = partialsum[dim2_val]
+        lookaheadsum = {i: total - d for i, d in partialsum.items()}
+
         for i in range(dim1_val, dim2_val+1):
             if partialsum[i] > (total / 2):
                 vbox1 = vbox.copy
@@ -209,21 +179,16 @@ class MMCQ(object):
     def quantize(pixels, max_color):
         """Quantize.
 
-        :param pixels: a list of pixel in the form (r, g, b)
+        :param pixels: a list or (n, 3) array of pixels in the form (r, g, b)
         :param max_color: max number of colors
         """
-        if not pixels:
+        if len(pixels) == 0:
             raise Exception('Empty pixels when quantize.')
         if max_color < 2 or max_color > 256:
             raise Exception('Wrong number of max colors when quantize.')
 
         histo = MMCQ.get_histo(pixels)
 
-        # check that we aren't below maxcolors already
-        if len(histo) <= max_color:
-            # generate the new colors from the histo and return
-            pass
-
         # get the beginning vbox from the colors
         vbox = MMCQ.vbox_from_pixels(pixels, histo)
         pq = PQueue(lambda x: x.count)
@@ -295,27 +260,28 @@ class VBox(object):
         return VBox(self.r1, self.r2, self.g1, self.g2,
                     self.b1, self.b2, self.histo)
 
+    @property
+    def histo_view(self):
+        return self.histo[self.r1:self.r2 + 1,
+                          self.g1:self.g2 + 1,
+                          self.b1:self.b2 + 1]
+
     @cached_property
     def avg(self):
-        ntot = 0
         mult = 1 << (8 - MMCQ.SIGBITS)
-        r_sum = 0
-        g_sum = 0
-        b_sum = 0
-        for i in range(self.r1, self.r2 + 1):
-            for j in range(self.g1, self.g2 + 1):
-                for k in range(self.b1, self.b2 + 1):
-                    histoindex = MMCQ.get_color_index(i, j, k)
-                    hval = self.histo.get(histoindex, 0)
-                    ntot += hval
-                    r_sum += hval * (i + 0.5) * mult
-                    g_sum += hval * (j + 0.5) * mult
-                    b_sum += hval * (k + 0.5) * mult
+        box = self.histo_view
+        ntot = int(box.sum())
 
         if ntot:
-            r_avg = int(r_sum / ntot)
-            g_avg = int(g_sum / ntot)
-            b_avg = int(b_sum / ntot)
+            # (i + 0.5) * mult is a whole number, so the weighted sums are
+            # exact integers just like in the original float accumulation.
+            sums = []
+            for axis, start in ((0, self.r1), (1, self.g1), (2, self.b1)):
+                others = tuple(x for x in (0, 1, 2) if x != axis)
+                plane = box.sum(axis=others)
+                weights = (np.arange(start, start + len(plane)) * 2 + 1) * (mult // 2)
+                sums.append(int((plane * weights).sum()))
+            r_avg, g_avg, b_avg = (int(x / ntot) for x in sums)
         else:
             r_avg = int(mult * (self.r1 + self.r2 + 1) / 2)
             g_avg = int(mult * (self.g1 + self.g2 + 1) / 2)
@@ -338,13 +304,7 @@ class VBox(object):
 
     @cached_property
     def count(self):
-        npix = 0
-        for i in range(self.r1, self.r2 + 1):
-            for j in range(self.g1, self.g2 + 1):
-                for k in range(self.b1, self.b2 + 1):
-                    index = MMCQ.get_color_index(i, j, k)
-                    npix += self.histo.get(index, 0)
-        return npix
+        return int(self.histo_view.sum())
 
 
 class CMap(object):
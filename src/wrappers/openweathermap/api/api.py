@@ -1,5 +1,10 @@
+import time
+import asyncio
+
 import requests
+import aiohttp
 
+from src.utils.cache import LRUCache
 from ..models import *
 from ..enums import TemperatureUnit
 
@@ -11,13 +16,25 @@ api.openweathermap.org/data/2.5/weather?zip=94040,us
 
 
 class OpenWeatherMapApi:
-    base_url = "https://api.openweathermap.org"
     version = 2.5
 
-    __slots__ = ("key")
+    # Weather goes stale after this many seconds, coordinates never do.
+    weather_ttl = 600
+    # Stale weather is still served when OWM is down, but not older than this.
+    cache_ttl   = 86400
+    cache_size  = 2048
+    # Queries OWM answered with a 4xx (an unknown city) are not asked again for this long.
+    missing_ttl = 300
+
+    __slots__ = ("key", "base_url", "_cache", "_missing", "_pending", "_session")
 
-    def __init__(self, key):
-        self.key = key
+    def __init__(self, key, base_url = "https://api.openweathermap.org"):
+        self.key      = key
+        self.base_url = base_url
+        self._cache   = LRUCache(max_size = self.cache_size, ttl = self.cache_ttl)
+        self._missing = LRUCache(max_size = self.cache_size, ttl = self.missing_ttl)
+        self._pending = {}
+        self._session = None
 
 
     @property
@@ -30,22 +47,98 @@ class OpenWeatherMapApi:
         return {"appid" : self.key}
 
 
-    def call(self, params):
-        url = self.url
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout = aiohttp.ClientTimeout(total = 10))
+        return self._session
+
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+    @staticmethod
+    def _cache_key(params):
+        return tuple(sorted((k, str(v)) for k, v in params.items() if k != "appid"))
+
 
-        req = requests.get(url, params = params)
+    def _get_cached(self, key, max_age):
+        cached = self._cache.get(key)
+        if cached is not None:
+            city, fetched_at = cached
+            if max_age is None or (time.monotonic() - fetched_at) <= max_age:
+                return city
+
+
+    def _store(self, key, params, json):
+        city = City(TemperatureUnit(params.get("units", "")), json)
+        self._cache[key] = (city, time.monotonic())
+        return city
+
+
+    def _stale(self, key):
+        cached = self._cache.peek(key)
+        if cached is not None:
+            return cached[0]
+
+
+    def call(self, params, max_age = weather_ttl):
+        key = self._cache_key(params)
+        city = self._get_cached(key, max_age)
+        if city is not None:
+            return city
+
+        if key in self._missing:
+            return None
 
         try:
+            req = requests.get(self.url, params = params, timeout = 10)
             req.raise_for_status()
-        except:
+        except requests.exceptions.HTTPError:
+            if req.status_code >= 500:
+                return self._stale(key)
+            self._missing[key] = True
             return None
+        except requests.exceptions.RequestException:
+            return self._stale(key)
 
-        json = req.json()
+        return self._store(key, params, req.json())
 
-        return City(TemperatureUnit(params["units"]), json)
 
+    async def _fetch(self, key, params):
+        try:
+            async with self.session.get(self.url, params = params) as response:
+                if response.status >= 500:
+                    return self._stale(key)
+                if response.status >= 400:
+                    self._missing[key] = True
+                    return None
+                json = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return self._stale(key)
+        finally:
+            self._pending.pop(key, None)
+
+        return self._store(key, params, json)
+
+
+    async def fetch(self, params, max_age = weather_ttl):
+        """ Cached, coalesced version of call(). Falls back to stale data when OWM can't be reached. """
+        key = self._cache_key(params)
+        city = self._get_cached(key, max_age)
+        if city is not None:
+            return city
+        if key in self._missing:
+            return None
 
-    def by_id(self, id, unit = TemperatureUnit.Celsius):
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._fetch(key, params))
+        return await asyncio.shield(self._pending[key])
+
+
+    def _params_by_id(self, id, unit):
         params = self.default_params
 
         params["id"] = id
@@ -53,10 +146,10 @@ class OpenWeatherMapApi:
         if unit.value != "":
             params["units"] = unit.value
 
-        return self.call(params)
+        return params
 
 
-    def by_q(self, name, country_code = None,  unit = TemperatureUnit.Celsius):
+    def _params_by_q(self, name, country_code, unit):
         params = self.default_params
 
         q = name
@@ -70,4 +163,20 @@ class OpenWeatherMapApi:
         if unit.value != "":
             params["units"] = unit.value
 
-        return self.call(params)
\ No newline at end of file
+        return params
+
+
+    def by_id(self, id, unit = TemperatureUnit.Celsius):
+        return self.call(self._params_by_id(id, unit))
+
+
+    def by_q(self, name, country_code = None,  unit = TemperatureUnit.Celsius):
+        return self.call(self._params_by_q(name, country_code, unit))
+
+
+    async def fetch_by_id(self, id, unit = TemperatureUnit.Celsius, max_age = weather_ttl):
+        return await self.fetch(self._params_by_id(id, unit), max_age = max_age)
+
+
+    async def fetch_by_q(self, name, country_code = None, unit = TemperatureUnit.Celsius, max_age = weather_ttl):
+        return await self.fetch(self._params_by_q(name, country_code, unit), max_age = max_age)
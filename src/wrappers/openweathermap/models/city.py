@@ -1,12 +1,12 @@
 import datetime
 import pytz
-import math
 import pycountry
-from timezonefinder import TimezoneFinder
 
 from .coordinate import Coordinate
 from .weather_info import WeatherInfo
 from .temperature_info import TemperatureInfo
+from src.utils.timezone import timezone_index
+from src.utils.geodesic import haversine
 
 class City:
     __slots__ = ("id", "coordinates", "name",
@@ -31,7 +31,7 @@ class City:
 
     @property
     def timezone(self):
-        return pytz.timezone(TimezoneFinder().timezone_at(lng = self.coordinates.longitude, lat = self.coordinates.latitude))
+        return pytz.timezone(timezone_index.zone_at(self.coordinates.longitude, self.coordinates.latitude))
 
     @property
     def current_time(self):
@@ -43,18 +43,7 @@ class City:
         pass
 
     def get_distance(self, other_city):
-        R = 6373.0
-
-        lat1 = math.radians(self.coordinates.latitude)
-        lon1 = math.radians(self.coordinates.longitude)
-
-        lat2 = math.radians(other_city.coordinates.latitude)
-        lon2 = math.radians(other_city.coordinates.longitude)
-
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-        return R * c
\ No newline at end of file
+        return float(haversine(
+            self.coordinates.latitude, self.coordinates.longitude,
+            other_city.coordinates.latitude, other_city.coordinates.longitude
+        ))
\ No newline at end of file
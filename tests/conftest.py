@@ -0,0 +1,56 @@
+import peewee
+import pytest
+
+import src.config as config
+from src.utils.environmental_variables import EnvironmentalVariables
+
+# models read the connection settings on import, nothing connects until a query runs.
+config.environ = EnvironmentalVariables({x : "0" for x in EnvironmentalVariables.required})
+
+from src.models import database
+
+@pytest.fixture
+def sqlite(monkeypatch):
+    """ Binds the given models to an in memory sqlite database and runs database.run() calls inline. """
+    db = peewee.SqliteDatabase(":memory:")
+
+    async def run(callback, *args, **kwargs):
+        return callback(*args, **kwargs)
+
+    async def atomic_run(callback, *args, **kwargs):
+        with db.atomic():
+            return callback(*args, **kwargs)
+
+    monkeypatch.setattr(database, "run", run)
+    monkeypatch.setattr(database, "atomic_run", atomic_run)
+    monkeypatch.setattr(database, "atomic", db.atomic)
+    # for code that reaches the database through a model.
+    db.run        = run
+    db.atomic_run = atomic_run
+
+    bound = []
+    def bind(*models):
+        for model in models:
+            # the mysql charset option is not valid sqlite.
+            monkeypatch.setattr(model._meta, "table_settings", [])
+        db.bind(models)
+        db.create_tables(models)
+        bound.extend(models)
+        return db
+    yield bind
+
+    for model in bound:
+        model._meta.set_database(database)
+    db.close()
+
+@pytest.fixture
+def bulk_insert():
+    """ insert_many without peewee generating the statement, which takes most of the time at tens of thousands of rows. """
+    def bulk_insert(model, rows):
+        fields  = [x for x in model._meta.sorted_fields if x is not model._meta.primary_key]
+        columns = ", ".join(x.column_name for x in fields)
+        sql     = f"INSERT INTO {model._meta.table_name} ({columns}) VALUES ({', '.join('?' * len(fields))})"
+        default = lambda x : x.default() if callable(x.default) else x.default
+        values  = [[x.db_value(row[x.name] if x.name in row else default(x)) for x in fields] for row in rows]
+        model._meta.database.connection().executemany(sql, values)
+    return bulk_insert
@@ -0,0 +1,76 @@
+import time
+import datetime
+
+import pytest
+
+from src.models import Human, Earthling
+from src.discord.helpers.activity import ActivityTracker
+
+start = datetime.datetime(2020, 1, 1)
+
+class Writes(list):
+    """ Stands in for _write, the mysql upsert it runs has no sqlite equivalent. """
+
+    def __call__(self, pending):
+        self.append(dict(pending))
+        return []
+
+@pytest.fixture
+def tracker(sqlite, monkeypatch):
+    sqlite()
+    tracker = ActivityTracker()
+    monkeypatch.setattr(tracker, "_write", Writes())
+    return tracker
+
+def test_flush_keeps_only_the_last_activity(tracker):
+    assert tracker.flush() == []
+    for minutes in range(10):
+        tracker.touch(1, 10, start + datetime.timedelta(minutes = minutes))
+    tracker.touch(2, 10, start)
+    tracker.flush()
+
+    assert tracker._write == [{(1, 10) : start + datetime.timedelta(minutes = 9), (2, 10) : start}]
+    assert len(tracker) == 0
+    assert tracker.last_seen(1, 10) is None
+    assert tracker.written == 2
+
+def test_failed_flush_keeps_the_newest_activity(tracker, monkeypatch):
+    tracker.touch(1, 10, start)
+    tracker.touch(1, 20, start)
+    def fail(pending):
+        tracker.touch(1, 10, start - datetime.timedelta(hours = 1))
+        tracker.touch(1, 20, start + datetime.timedelta(hours = 1))
+        raise RuntimeError()
+    monkeypatch.setattr(tracker, "_write", fail)
+    with pytest.raises(RuntimeError):
+        tracker.flush()
+
+    assert tracker.last_seen(1, 10) == start
+    assert tracker.last_seen(1, 20) == start + datetime.timedelta(hours = 1)
+    assert tracker.flushes == 0
+
+def test_missing_humans_and_earthlings_are_found_in_bulk(sqlite, monkeypatch):
+    # an empty currency set is stored as NULL, which the live table accepts.
+    monkeypatch.setattr(Human.currencies, "null", True)
+    sqlite(Human, Earthling)
+    human = Human.create(user_id = 10)
+    Earthling.create(guild_id = 1, user_id = 10, human = human)
+    tracker = ActivityTracker()
+
+    tracker._load_human_ids({10, 20, 30})
+    assert Human.select().count() == 3
+    assert tracker._human_ids[10] == human.id
+
+    assert sorted(tracker._find_new([(1, 10), (1, 20), (2, 10)])) == [(1, 20), (2, 10)]
+
+def test_replay_many_messages(tracker):
+    messages = 1000000
+    begin = time.perf_counter()
+    for i in range(messages):
+        tracker.touch(i % 5, i % 2000, start)
+    touched = time.perf_counter() - begin
+    tracker.flush()
+
+    print(f"{messages} messages in {touched * 1000:.0f}ms, {tracker.written} rows in {tracker.flushes} flush")
+    assert tracker.written == 2000
+    assert len(tracker._write[0]) == 2000
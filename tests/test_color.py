@@ -0,0 +1,37 @@
+import asyncio
+
+from src.discord.helpers.color import DominantColorService
+
+class BrokenSession:
+    closed = False
+
+    def __init__(self):
+        self.requests = 0
+
+    def get(self, url):
+        self.requests += 1
+        raise ConnectionError(url)
+
+def test_failed_urls_are_not_fetched_again():
+    service = DominantColorService()
+    session = service._session = BrokenSession()
+
+    async def main():
+        for _ in range(5):
+            assert service.get("https://example.com/icon.png") == service.default
+            await asyncio.sleep(0)
+    asyncio.run(main())
+
+    assert session.requests == 1
+
+def test_failures_expire():
+    service = DominantColorService(failure_ttl = 0)
+    session = service._session = BrokenSession()
+
+    async def main():
+        for _ in range(3):
+            service.get("https://example.com/icon.png")
+            await asyncio.sleep(0.01)
+    asyncio.run(main())
+
+    assert session.requests == 3
@@ -0,0 +1,45 @@
+import io
+import json
+import time
+import pathlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.wrappers.color_thief import ColorThief
+
+root = pathlib.Path(__file__).parent.parent
+# palettes of the pure python median cut the numpy one replaced.
+expected = json.loads((root / "tests" / "data" / "sprite_palettes.json").read_text())
+
+@pytest.mark.parametrize("path", sorted(expected))
+def test_same_palettes_as_before(path):
+    assert list(ColorThief(root / path).get_color(quality = 1)) == expected[path]["color"]
+    assert [list(x) for x in ColorThief(root / path).get_palette(color_count = 5, quality = 10)] == expected[path]["palette"]
+
+def avatar(size = 512):
+    pixels = np.random.default_rng(0).integers(0, 256, (size, size, 4), dtype = np.uint8)
+    pixels[..., 3] = 255
+    data = io.BytesIO()
+    Image.fromarray(pixels, "RGBA").save(data, format = "png")
+    data.seek(0)
+    return data
+
+def test_downscaling_stays_close():
+    full  = np.array(ColorThief(avatar()).get_color(quality = 1))
+    small = np.array(ColorThief(avatar()).get_color(quality = 1, max_size = 64))
+    assert np.abs(full - small).max() < 48
+
+def test_avatar_benchmark():
+    thief = ColorThief(avatar())
+    start = time.perf_counter()
+    thief.get_color(quality = 1)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    thief.get_color(quality = 1, max_size = 128)
+    downscaled = time.perf_counter() - start
+
+    print(f"512x512: {elapsed * 1000:.0f}ms, downscaled to 128: {downscaled * 1000:.0f}ms")
+    assert elapsed < 1
@@ -0,0 +1,49 @@
+import time
+
+from src.utils.conversion import ConversionScanner, Match, MatchType
+
+units   = ["c", "f", "kg", "lb", "km", "mi", "°f", "°c", '"', "cup"]
+symbols = {"eur" : "€", "gbp" : "£", "jpy" : "¥"}
+aliases = {"f" : "°F", "c" : "°C", "inch" : '"', "us_cup" : "cup", "eur" : "€", "gbp" : "£", "jpy" : "¥"}
+scanner = ConversionScanner(units, ["EUR", "GBP", "JPY", "USD"], symbols, aliases)
+
+corpus = [
+    "hey how is everyone doing today",
+    "lol that is so true",
+    "did you see the game last night?",
+    "i'm going to bed, good night all",
+    "can someone help me with my homework",
+    "brb getting food",
+]
+
+def test_messages_without_digits_are_rejected():
+    assert all(scanner.rejects(x) for x in corpus)
+    assert not scanner.rejects("it is 30c outside")
+    assert not scanner.rejects("what time is it in utc")
+
+def test_units_and_aliases():
+    assert scanner.scan("it is 30C and 86°F") == [Match(MatchType.measurement, "c", 30.0), Match(MatchType.measurement, "f", 86.0)]
+    assert scanner.scan('she is 5.5" taller') == [Match(MatchType.measurement, "inch", 5.5)]
+    assert scanner.scan("1 kg") == []
+    assert scanner.scan("10kgs") == []
+
+def test_currencies():
+    assert scanner.scan("it costs 20usd") == [Match(MatchType.currency, "usd", 20.0)]
+    assert scanner.scan("€15 or 15€") == [Match(MatchType.currency, "eur", 15.0), Match(MatchType.currency, "eur", 15.0)]
+
+def test_timezones():
+    assert scanner.scan("meet at gmt+2 or utc-5 or just utc") == [
+        Match(MatchType.timezone, "gmt", 2),
+        Match(MatchType.timezone, "utc", -5),
+        Match(MatchType.timezone, "utc", 0),
+    ]
+
+def test_reject_throughput():
+    messages = corpus * 50000
+    start = time.perf_counter()
+    for message in messages:
+        scanner.scan(message)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(messages) / elapsed:.0f} rejected messages per second")
+    assert len(messages) / elapsed > 100000
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import peewee
+
+from src.models.base import Database
+
+# long enough to stand in for a slow MySQL round trip, sqlite lets go of the GIL while it counts.
+slow_query = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 20000) SELECT count(*) FROM c"
+
+class SqliteDatabase(peewee.SqliteDatabase):
+    """ The executor facade of Database on top of sqlite, so it can run without a MySQL server. """
+    _run       = Database._run
+    run        = Database.run
+    atomic_run = Database.atomic_run
+
+    def __init__(self, *args, max_workers = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers = max_workers)
+
+def p99(values):
+    values = sorted(values)
+    return values[int(len(values) * 0.99)]
+
+async def measure_lag(commands):
+    """ Runs the commands concurrently and returns how late a 1ms ticker woke up meanwhile. """
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    await asyncio.gather(*commands)
+    done = True
+    await task
+    return lags
+
+def test_run_and_atomic_run(tmp_path):
+    db = SqliteDatabase(str(tmp_path / "locus.db"))
+
+    class Row(peewee.Model):
+        value = peewee.IntegerField()
+        class Meta:
+            database = db
+
+    db.create_tables([Row])
+
+    def fail():
+        Row.create(value = 2)
+        raise ValueError()
+
+    async def main():
+        await db.atomic_run(Row.create, value = 1)
+        try:
+            await db.atomic_run(fail)
+        except ValueError:
+            pass
+        return await db.run(lambda : [x.value for x in Row.select()])
+
+    assert asyncio.run(main()) == [1]
+    db.executor.shutdown()
+
+def test_event_loop_lag_benchmark(tmp_path):
+    db = SqliteDatabase(str(tmp_path / "locus.db"))
+    db.connect()
+
+    def query():
+        return db.execute_sql(slow_query).fetchone()[0]
+
+    async def inline_command():
+        await asyncio.sleep(0)
+        return query()
+
+    async def executor_command():
+        await asyncio.sleep(0)
+        return await db.run(query)
+
+    inline   = asyncio.run(measure_lag([inline_command() for _ in range(50)]))
+    executor = asyncio.run(measure_lag([executor_command() for _ in range(50)]))
+    db.executor.shutdown()
+
+    print(f"p99 event loop lag, 50 concurrent commands: inline {p99(inline) * 1000:.1f}ms, database.run {p99(executor) * 1000:.1f}ms")
+    assert p99(executor) < p99(inline) / 2
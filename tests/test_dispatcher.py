@@ -0,0 +1,115 @@
+import asyncio
+
+import discord
+
+from src.discord.helpers.dispatcher import Dispatcher
+
+class Response:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "fake"
+
+class FakeChannel:
+    """ Records sends and edits, failing with the given statuses first. """
+
+    def __init__(self, id, failures = ()):
+        self.id       = id
+        self.failures = list(failures)
+        self.sent     = []
+
+    async def send(self, **kwargs):
+        await asyncio.sleep(0)
+        if self.failures:
+            raise discord.HTTPException(Response(self.failures.pop(0)), "fake")
+        self.sent.append(kwargs)
+        return FakeMessage(len(self.sent), self)
+
+class FakeMessage:
+    def __init__(self, id, channel):
+        self.id      = id
+        self.channel = channel
+        self.edits   = []
+
+    async def edit(self, **kwargs):
+        self.edits.append(kwargs)
+
+    async def add_reaction(self, emoji):
+        self.edits.append(("reaction", emoji, len(self.channel.sent)))
+
+def dispatcher(**kwargs):
+    dispatcher = Dispatcher(**kwargs)
+    dispatcher.channel_rate = (1000, 1)
+    dispatcher.base_delay   = 0.01
+    return dispatcher
+
+def test_sends_in_order():
+    async def main():
+        channel = FakeChannel(1)
+        futures = [dispatcher().send(channel, content = i) for i in range(3)]
+        await asyncio.gather(*futures)
+        return channel
+
+    channel = asyncio.run(main())
+    assert [x["content"] for x in channel.sent] == [0, 1, 2]
+
+def test_edits_are_coalesced():
+    async def main():
+        d = dispatcher()
+        message = FakeMessage(1, FakeChannel(1))
+        d.send(FakeChannel(1), content = "first")
+        d.edit(message, content = "a")
+        await d.edit(message, embed = "b")
+        return d, message
+
+    d, message = asyncio.run(main())
+    assert message.edits == [{"content" : "a", "embed" : "b"}]
+    assert d.metrics["coalesced"] == 1
+
+def test_retries_server_errors():
+    async def main():
+        channel = FakeChannel(1, failures = (500, 429))
+        d = dispatcher()
+        await d.send(channel, content = "hello")
+        return d, channel
+
+    d, channel = asyncio.run(main())
+    assert channel.sent == [{"content" : "hello"}]
+    assert d.metrics["retried"] == 2
+
+def test_client_errors_are_not_retried():
+    async def main():
+        d = dispatcher()
+        try:
+            await d.send(FakeChannel(1, failures = (403, )), content = "hello")
+        except discord.HTTPException:
+            return d
+
+    d = asyncio.run(main())
+    assert d.metrics["failed"] == 1 and d.metrics["retried"] == 0
+
+def test_backoff_does_not_hold_the_semaphore():
+    async def main():
+        d = dispatcher(concurrency = 1)
+        d.base_delay = 0.5
+        failing = FakeChannel(1, failures = (500, ))
+        healthy = FakeChannel(2)
+        d.send(failing, content = "retried")
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(d.send(healthy, content = "quick"), 0.2)
+        d.stop()
+        return healthy
+
+    assert asyncio.run(main()).sent == [{"content" : "quick"}]
+
+def test_other_requests_share_the_channel_queue():
+    async def main():
+        d = dispatcher()
+        channel = FakeChannel(1)
+        message = FakeMessage(1, channel)
+        d.send(channel, content = "first")
+        await d.call(message, "add_reaction", "👍")
+        return d, message
+
+    d, message = asyncio.run(main())
+    assert message.edits == [("reaction", "👍", 1)]
+    assert d.metrics["called"] == 1 and d.metrics["sent"] == 1
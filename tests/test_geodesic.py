@@ -0,0 +1,119 @@
+import math
+import random
+
+import pytest
+
+from src.models import Mail
+from src.utils.country import Country
+from src.utils.geodesic import DistanceMatrix, haversine, travel_minutes, get_distance_matrix
+from src.wrappers.openweathermap import City, TemperatureUnit
+
+def scalar_haversine(lat1, lon1, lat2, lon2):
+    """ The haversine TravelActivity.distance_in_km and City.get_distance each carried before. """
+    R = 6373.0
+
+    lat1, lon1, lat2, lon2 = [math.radians(x) for x in (lat1, lon1, lat2, lon2)]
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return R * c
+
+def scalar_duration(km):
+    """ The clamp calculate_duration did before. """
+    duration = int(km / 40)
+    if duration < 45:
+        duration = 45
+    elif duration > 180:
+        duration = 180
+    return duration
+
+def city(name, country_code, lat, lon):
+    data = {
+        "id"      : 1,
+        "name"    : name,
+        "coord"   : {"lat" : lat, "lon" : lon},
+        "sys"     : {"country" : country_code},
+        "weather" : [],
+        "main"    : {"temp" : 20, "feels_like" : 20, "pressure" : 1000, "humidity" : 50, "temp_min" : 20, "temp_max" : 20},
+    }
+    return City(TemperatureUnit.Celsius, data)
+
+cities = {
+    "amsterdam" : city("Amsterdam", "NL", 52.3740, 4.8897),
+    "new york"  : city("New York", "US", 40.7143, -74.0060),
+    "sydney"    : city("Sydney", "AU", -33.8679, 151.2073),
+    "tokyo"     : city("Tokyo", "JP", 35.6895, 139.6917),
+    "madrid"    : city("Madrid", "ES", 40.4165, -3.7026),
+    "wellington": city("Wellington", "NZ", -41.2866, 174.7756),
+}
+
+pairs = [
+    ("amsterdam", "new york"),
+    ("amsterdam", "sydney"),
+    ("tokyo", "new york"),
+    ("sydney", "wellington"),
+    # the antipode of Madrid is close to Wellington.
+    ("madrid", "wellington"),
+    ("amsterdam", "amsterdam"),
+]
+
+@pytest.mark.parametrize("first, second", pairs)
+def test_city_distance_matches_scalar_formula(first, second):
+    first, second = cities[first], cities[second]
+    expected = scalar_haversine(first.coordinates.latitude, first.coordinates.longitude, second.coordinates.latitude, second.coordinates.longitude)
+    assert first.get_distance(second) == pytest.approx(expected, abs = 1e-9)
+    assert second.get_distance(first) == pytest.approx(expected, abs = 1e-9)
+
+def test_same_city_is_zero():
+    assert cities["tokyo"].get_distance(cities["tokyo"]) == 0
+
+def test_antipodes_are_half_the_circumference():
+    assert float(haversine(0, 0, 0, 180)) == pytest.approx(math.pi * 6373.0)
+    assert float(haversine(90, 0, -90, 0)) == pytest.approx(math.pi * 6373.0)
+    assert float(haversine(52.37, 4.89, -52.37, -175.11)) == pytest.approx(scalar_haversine(52.37, 4.89, -52.37, -175.11))
+
+def test_vectorised_haversine_matches_scalar_formula():
+    rng = random.Random(0)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180), rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(1000)]
+    distances = haversine(*zip(*points))
+    for point, distance in zip(points, distances):
+        assert distance == pytest.approx(scalar_haversine(*point), abs = 1e-8)
+
+def test_matrix_matches_scalar_formula_for_every_capital_pair():
+    matrix = get_distance_matrix()
+    assert len(matrix.countries) > 200
+    for origin in matrix.countries:
+        lat1, lon1 = origin.capital_latlng()
+        for destination in matrix.countries:
+            lat2, lon2 = destination.capital_latlng()
+            assert matrix.distance(origin, destination) == pytest.approx(scalar_haversine(lat1, lon1, lat2, lon2), abs = 1e-8)
+
+def test_travel_minutes_matches_calculate_duration():
+    for km in (0, 100, 1799.99, 1800, 1840, 5000, 7199, 7200, 7240, 20000):
+        assert int(travel_minutes(km)) == scalar_duration(km)
+    matrix = get_distance_matrix()
+    durations = travel_minutes(matrix.distances)
+    expected = [[scalar_duration(x) for x in row] for row in matrix.distances.tolist()]
+    assert durations.tolist() == expected
+
+def test_mail_distance_and_duration_use_the_matrix():
+    netherlands, japan = Country.from_alpha_2("NL"), Country.from_alpha_2("JP")
+    mail = Mail(residence = netherlands, destination = japan)
+    expected = scalar_haversine(*netherlands.capital_latlng(), *japan.capital_latlng())
+    assert mail.distance_in_km == pytest.approx(expected, abs = 1e-8)
+    assert mail.calculate_duration() == scalar_duration(expected)
+
+    assert Mail(residence = netherlands, destination = netherlands).distance_in_km == 0
+    assert Mail(residence = netherlands, destination = netherlands).calculate_duration() == 45
+
+def test_within_minutes_matches_scalar_durations():
+    matrix = DistanceMatrix(Country.all())
+    origin = Country.from_alpha_2("NL")
+    lat1, lon1 = origin.capital_latlng()
+    expected = [x for x in matrix.countries if scalar_duration(scalar_haversine(lat1, lon1, *x.capital_latlng())) <= 60]
+    assert matrix.within_minutes(origin, 60) == expected
+    assert origin in expected
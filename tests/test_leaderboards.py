@@ -0,0 +1,59 @@
+import asyncio
+
+import pycountry
+
+from src.models import Human, Earthling, Pigeon, Prankster, NicknamePrank
+from src.utils.leaderboard import Leaderboard
+from src.discord.helpers.leaderboards import GuildLeaderboards
+
+def test_board_order_and_slices():
+    board = Leaderboard({x : x % 100 for x in range(1000)})
+    board.set(5, 1000)
+    board.add(6, 2000)
+    assert board.slice(0, 2) == [(6, 2006), (5, 1000)]
+    assert board.rank(5) == 1
+    assert board.page_of(5, 15) == 0
+    assert board.page_of(-1, 15) == 0
+    assert len(board.slice(990, 15)) == 10
+
+    board.remove(6)
+    assert board.slice(0, 1) == [(5, 1000)]
+    assert [x for x, _ in board] == [x for x, _ in board.slice(0, len(board))]
+
+def create_earthling(user_id, gold, guild_id = 1):
+    human = Human.create(user_id = user_id, gold = gold, currencies = {pycountry.currencies.get(alpha_3 = "EUR")})
+    return Earthling.create(guild_id = guild_id, user_id = user_id, human = human)
+
+def load(sqlite, is_member = None):
+    sqlite(Human, Earthling, Pigeon, Prankster, NicknamePrank)
+    leaderboards = GuildLeaderboards()
+    return leaderboards, lambda : asyncio.run(leaderboards.load(is_member = is_member))
+
+def test_departed_members_leave_the_boards(sqlite):
+    leaderboards, run = load(sqlite, is_member = lambda guild_id, user_id : user_id != 2)
+    for user_id in range(1, 4):
+        create_earthling(user_id, gold = user_id * 10)
+    run()
+
+    board = leaderboards.get_gold(1)
+    assert [leaderboards.user_id(x) for x, _ in board] == [3, 1]
+
+    leaderboards.remove_member(1, 3)
+    assert [leaderboards.user_id(x) for x, _ in board] == [1]
+
+    human = Human.get(Human.user_id == 3)
+    human.gold = 500
+    human.save()
+    assert len(board) == 1
+
+    leaderboards.add_member(1, 3)
+    assert board.slice(0, 1) == [(human.id, 500)]
+
+def test_deleted_earthlings_leave_the_boards(sqlite):
+    leaderboards, run = load(sqlite)
+    earthling = create_earthling(1, gold = 10)
+    run()
+    assert len(leaderboards.get_gold(1)) == 1
+
+    earthling.delete_instance()
+    assert len(leaderboards.get_gold(1)) == 0
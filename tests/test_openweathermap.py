@@ -0,0 +1,198 @@
+import asyncio
+import threading
+from collections import Counter
+
+import discord
+import pytest
+from aiohttp import web
+
+import src.config as config
+from src.wrappers.openweathermap import OpenWeatherMapApi
+from src.discord.cogs.profile import CityWaiter
+
+def city_json(id, name, country_code, lat, lon, temperature = 20):
+    return {
+        "id"      : id,
+        "name"    : name,
+        "coord"   : {"lat" : lat, "lon" : lon},
+        "sys"     : {"country" : country_code},
+        "weather" : [{"id" : 800, "main" : "Clear", "description" : "clear sky", "icon" : "01d"}],
+        "main"    : {"temp" : temperature, "feels_like" : temperature, "pressure" : 1000, "humidity" : 50, "temp_min" : temperature, "temp_max" : temperature},
+    }
+
+class FakeOpenWeatherMap:
+    """ The weather endpoint of OWM on a local port, in a thread of its own so blocking clients can use it too. """
+
+    def __init__(self):
+        self.cities   = {}
+        self.requests = Counter()
+        self.status   = 200
+        self.delay    = 0
+        self.loop     = asyncio.new_event_loop()
+        self.url      = None
+
+    def add(self, **kwargs):
+        data = city_json(**kwargs)
+        self.cities[data["name"].lower()] = self.cities[str(data["id"])] = data
+
+    async def weather(self, request):
+        query = request.query.get("id") or request.query["q"].split(",")[0].lower()
+        self.requests[query] += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status != 200:
+            return web.json_response({"cod" : self.status}, status = self.status)
+        if query not in self.cities:
+            return web.json_response({"cod" : "404", "message" : "city not found"}, status = 404)
+        return web.json_response(self.cities[query])
+
+    def start(self):
+        app = web.Application()
+        app.router.add_get("/data/2.5/weather", self.weather)
+        self.runner = web.AppRunner(app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self.thread = threading.Thread(target = self.loop.run_forever, daemon = True)
+        self.thread.start()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+@pytest.fixture
+def owm():
+    server = FakeOpenWeatherMap()
+    server.add(id = 2759794, name = "Amsterdam", country_code = "NL", lat = 52.37, lon = 4.89)
+    server.add(id = 1850147, name = "Tokyo", country_code = "JP", lat = 35.69, lon = 139.69)
+    server.start()
+    yield server
+    server.stop()
+
+def run(api, *coroutines):
+    async def main():
+        try:
+            return await asyncio.gather(*coroutines)
+        finally:
+            await api.close()
+    return asyncio.run(main())
+
+def test_fetch_by_query_and_id(owm):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    amsterdam, tokyo = run(api, api.fetch_by_q("Amsterdam", "NL"), api.fetch_by_id(1850147))
+    assert (amsterdam.name, amsterdam.country_code) == ("Amsterdam", "NL")
+    assert tokyo.name == "Tokyo"
+
+def test_weather_is_cached(owm):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    run(api, api.fetch_by_q("Amsterdam"))
+    run(api, api.fetch_by_q("Amsterdam"), api.fetch_by_q("Amsterdam", max_age = None))
+    assert owm.requests["amsterdam"] == 1
+
+    run(api, api.fetch_by_q("Amsterdam", max_age = 0))
+    assert owm.requests["amsterdam"] == 2
+
+def test_identical_requests_are_coalesced(owm):
+    owm.delay = 0.1
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    cities = run(api, *[api.fetch_by_q("Tokyo") for _ in range(20)])
+    assert owm.requests["tokyo"] == 1
+    assert all(x is cities[0] for x in cities)
+
+def test_unknown_cities_are_cached_for_a_while(owm, monkeypatch):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    assert run(api, api.fetch_by_q("Atlantis"), api.fetch_by_q("Atlantis")) == [None, None]
+    assert run(api, api.fetch_by_q("Atlantis")) == [None]
+    assert api.by_q("Atlantis") is None
+    assert owm.requests["atlantis"] == 1
+
+    api._missing.ttl = 0
+    assert run(api, api.fetch_by_q("Atlantis")) == [None]
+    assert owm.requests["atlantis"] == 2
+
+def test_stale_weather_when_owm_is_down(owm):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    amsterdam, = run(api, api.fetch_by_q("Amsterdam"))
+
+    owm.status = 503
+    assert run(api, api.fetch_by_q("Amsterdam", max_age = 0)) == [amsterdam]
+    assert api.call(api._params_by_q("Amsterdam", None, amsterdam.unit), max_age = 0) is amsterdam
+    assert run(api, api.fetch_by_q("Tokyo")) == [None]
+    # a failing server is not an unknown city.
+    assert not api._missing
+
+def test_blocking_client_shares_the_cache(owm):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    tokyo = api.by_id(1850147)
+    assert tokyo.name == "Tokyo"
+    assert run(api, api.fetch_by_id(1850147)) == [tokyo]
+    assert owm.requests["1850147"] == 1
+
+class Channel:
+    id = 1
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, *args, **kwargs):
+        self.sent.append(kwargs.get("embed") or args[0])
+
+class Message:
+    def __init__(self, content, channel, author):
+        self.content = content
+        self.channel = channel
+        self.author  = author
+
+class Context:
+    def __init__(self, bot):
+        self.bot     = bot
+        self.channel = Channel()
+        self.author  = discord.Object(id = 1)
+
+    async def send(self, content):
+        await self.channel.send(content)
+
+class Dispatcher:
+    def send(self, sendable, **kwargs):
+        return asyncio.ensure_future(sendable.send(**kwargs))
+
+class Bot:
+    def __init__(self, owm_api, answers):
+        self.owm_api = owm_api
+        self.answers = list(answers)
+
+    def get_base_embed(self, **kwargs):
+        return discord.Embed(**kwargs)
+
+    async def wait_for(self, event, timeout, check):
+        while self.answers:
+            message = self.answers.pop(0)
+            if check(message):
+                return message
+        raise asyncio.TimeoutError()
+
+def test_city_waiter_looks_cities_up_without_blocking(owm, monkeypatch):
+    api = OpenWeatherMapApi("key", base_url = owm.url)
+    def blocking(*args, **kwargs):
+        raise AssertionError("blocking request on the event loop")
+    monkeypatch.setattr(OpenWeatherMapApi, "call", blocking)
+    bot = Bot(api, [])
+    bot.dispatcher = Dispatcher()
+    ctx = Context(bot)
+    bot.answers = [Message(x, ctx.channel, ctx.author) for x in ("Atlantis", "Tokyo,JP")]
+    monkeypatch.setattr(config, "bot", bot, raising = False)
+
+    async def main():
+        city = await CityWaiter(ctx, prompt = "Where do you live?").wait()
+        await asyncio.sleep(0)
+        await api.close()
+        return city
+    city = asyncio.run(main())
+
+    assert city.name == "Tokyo"
+    assert [x.description for x in ctx.channel.sent[1:]] == ["City was not found. Try again."]
+    assert owm.requests == {"atlantis" : 1, "tokyo" : 1}
@@ -0,0 +1,144 @@
+import asyncio
+import time
+import tracemalloc
+
+import discord
+import pycountry
+
+from src.models import Human
+from src.utils.leaderboard import Leaderboard
+from src.discord.helpers.paginating import ListSource, Page, PageSource, Paginator
+from src.discord.helpers.pretty import Row, Table, TableSource
+
+header = Row(("#", "name", "gold"), header = True)
+
+class Message:
+    def __init__(self):
+        self.id    = 1
+        self.edits = []
+
+class Dispatcher:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, sendable, **kwargs):
+        self.sent.append(kwargs["embed"])
+        return Message()
+
+    async def edit(self, message, **kwargs):
+        message.edits.append(kwargs["embed"])
+
+class Bot:
+    def __init__(self):
+        self.dispatcher = Dispatcher()
+
+class Context:
+    guild_color = discord.Color.green()
+
+    def __init__(self):
+        self.bot = Bot()
+
+def scoreboard(count):
+    return Leaderboard({x : (x * 7919) % 100000 for x in range(count)})
+
+def to_row(rank, key, score):
+    return Row((rank, f"human {key}", score))
+
+def eager(ctx, board, rows_per_page):
+    """ What Table.to_paginator did before: a Row for every entry and an embed for every page, up front. """
+    rows = [to_row(i + 1, key, score) for i, (key, score) in enumerate(board)]
+    paginator = Paginator(ctx)
+    for offset in range(0, len(rows), rows_per_page):
+        table = Table(rows = rows[offset:offset + rows_per_page])
+        table.add_row(header)
+        embed = discord.Embed(color = ctx.guild_color)
+        embed.description = table.generate()
+        paginator.add_page(Page(embed))
+    return paginator
+
+def lines(page):
+    return page.embed.description.strip("`").splitlines()[1:]
+
+def test_pages_are_rendered_on_demand():
+    ctx = Context()
+    renders = []
+    def render(index):
+        renders.append(index)
+        return Page(discord.Embed(description = str(index)))
+
+    paginator = Paginator(ctx, source = PageSource(render, 100), cache_size = 2)
+
+    async def main():
+        await paginator.reload()
+        for _ in range(3):
+            paginator.next()
+            await asyncio.sleep(0)
+        paginator.previous()
+        await asyncio.sleep(0)
+    asyncio.run(main())
+
+    assert renders == [0, 1, 2, 3]
+    assert [x.description for x in ctx.bot.dispatcher.sent] == ["0"]
+    assert len(paginator._rendered) == 2
+    assert paginator.page_count == 100
+    assert "Page 3/100" in paginator._rendered.get(2).embed.footer.text
+
+def test_column_widths_are_per_page():
+    source = TableSource.from_list([("a", 1), ("abcdefghij", 2), ("b", 3), ("c", 4)], Row(("name", "gold"), header = True), 2, to_row = Row)
+    first, second = [asyncio.run(source.render(x)) for x in range(2)]
+    assert lines(first)[2] == "a".ljust(12) + " | " + "1".ljust(6)
+    assert lines(second)[3] == "c".ljust(6) + " | " + "4".ljust(6)
+
+def test_leaderboard_source_matches_the_eager_pages():
+    ctx   = Context()
+    board = scoreboard(1000)
+    pages = eager(ctx, board, 15).page_count
+    source = TableSource.from_leaderboard(board, header, 15, to_row)
+    assert source.page_count == pages
+    for index in (0, 1, pages - 1):
+        rows = [Row(x.split(" | ")) for x in lines(asyncio.run(source.render(index)))[2:]]
+        expected = [to_row(index * 15 + i + 1, key, score) for i, (key, score) in enumerate(board.slice(index * 15, 15))]
+        assert [[y.strip() for y in x] for x in rows] == expected
+
+def test_query_source_fetches_one_page(sqlite):
+    db = sqlite(Human)
+    euro = {pycountry.currencies.get(alpha_3 = "EUR")}
+    with db.atomic():
+        for user_id in range(1, 41):
+            Human.create(user_id = user_id, gold = user_id * 10, currencies = euro)
+
+    query = Human.select().order_by(Human.gold.desc())
+    source = TableSource.from_query(query, Row(("user", "gold"), header = True), 15, lambda x : Row((x.user_id, x.gold)))
+    assert source.page_count == 3
+    page = asyncio.run(source.render(2))
+    assert [x.split("|")[0].strip() for x in lines(page)[2:]] == [str(x) for x in range(10, 0, -1)]
+
+def test_scoreboard_benchmark():
+    """ Opening a 100k row scoreboard and flipping through a few pages, against building every page up front. """
+    board = scoreboard(100000)
+
+    async def browse(paginator):
+        await paginator.reload()
+        for _ in range(5):
+            paginator.next()
+            await asyncio.sleep(0)
+
+    def measure(create):
+        ctx = Context()
+        tracemalloc.start()
+        start = time.perf_counter()
+        paginator = create(ctx)
+        asyncio.run(browse(paginator))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return paginator, elapsed, peak
+
+    lazy, lazy_time, lazy_peak = measure(lambda ctx : TableSource.from_leaderboard(board, header, 15, to_row).to_paginator(ctx))
+    full, full_time, full_peak = measure(lambda ctx : eager(ctx, board, 15))
+
+    print(f"100k row scoreboard, first 6 pages: lazy {lazy_time * 1000:.1f}ms / {lazy_peak / 1024:.0f}KiB, eager {full_time * 1000:.0f}ms / {full_peak / 1024 / 1024:.1f}MiB")
+    assert lazy.page_count == full.page_count == 6667
+    assert isinstance(full._source, ListSource)
+    assert lazy_time * 20 < full_time
+    assert lazy_peak * 20 < full_peak
@@ -0,0 +1,142 @@
+import datetime
+import random
+import time
+
+import pycountry
+import pytest
+
+import src.config as config
+import src.models.base as base
+from src.models import Human, Pigeon, Buff, PigeonBuff, SystemMessage
+
+class Bot:
+    def translate(self, key):
+        return key
+
+@pytest.fixture
+def db(sqlite, monkeypatch):
+    monkeypatch.setattr(base, "_save_listeners", {})
+    monkeypatch.setattr(config, "bot", Bot(), raising = False)
+    db = sqlite(Human, Pigeon, Buff, PigeonBuff, SystemMessage)
+    # the decay clamps with the mysql GREATEST.
+    db.register_function(max, "GREATEST", 2)
+    return db
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    executed = []
+    execute_sql = db.execute_sql
+    def counting(sql, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+    monkeypatch.setattr(db, "execute_sql", counting)
+    return executed
+
+def populate(bulk_insert, count, seed = 0):
+    """ count pigeons with random stats spread over a few hundred humans, a fifth of them with a buff. """
+    rng = random.Random(seed)
+    Human.insert_many([{"user_id" : x, "currencies" : {pycountry.currencies.get(alpha_3 = "EUR")}} for x in range(1, 301)]).execute()
+    human_ids = [x.id for x in Human.select(Human.id)]
+
+    rows = []
+    for i in range(count):
+        rows.append({
+            "name"        : f"pigeon {i}",
+            "human"       : rng.choice(human_ids),
+            "food"        : rng.choice((0, 1, 15, 20, 21, 50, 100)),
+            "cleanliness" : rng.choice((0, 20, 21, 60, 100)),
+            "happiness"   : rng.randint(0, 100),
+            "health"      : rng.choice((1, 2, 3, 5, 40, 100)),
+            "condition"   : Pigeon.Condition.active if rng.random() < 0.95 else Pigeon.Condition.dead,
+            "status"      : Pigeon.Status.idle if rng.random() < 0.9 else Pigeon.Status.mailing,
+        })
+    bulk_insert(Pigeon, rows)
+
+    buffs = [Buff.create(name = x, description = x, code = x, duration = datetime.timedelta(hours = 1)) for x in ("fully_fed", "bleeding", "fast")]
+    now = datetime.datetime.utcnow()
+    pigeon_buffs = []
+    for pigeon_id, in Pigeon.select(Pigeon.id).tuples():
+        if rng.random() < 0.2:
+            expired = rng.random() < 0.25
+            due_date = now + datetime.timedelta(hours = -1 if expired else 1)
+            pigeon_buffs.append({"pigeon" : pigeon_id, "buff" : rng.choice(buffs), "due_date" : due_date})
+    bulk_insert(PigeonBuff, pigeon_buffs)
+
+def per_pigeon_decay():
+    """ The pigeon by pigeon loop stats_ticker ran before, minus the gold it never changed. """
+    query = Pigeon.select()
+    query = query.where(Pigeon.condition == Pigeon.Condition.active)
+    query = query.where(Pigeon.status == Pigeon.Status.idle)
+
+    dead = []
+    for pigeon in query:
+        data = {
+            "food"        : -1,
+            "health"      : -0,
+            "happiness"   : -1,
+            "cleanliness" : -1,
+        }
+
+        for pigeon_buff in pigeon.buffs:
+            if pigeon_buff.buff.code == "fully_fed":
+                data["food"] = 0
+            if pigeon_buff.buff.code == "bleeding":
+                data["health"] += -2
+
+        if pigeon.food <= 20 or pigeon.cleanliness <= 20:
+            data["health"] += -1
+        if pigeon.food == 0:
+            data["health"] += -2
+
+        if pigeon.apply_stats(data):
+            SystemMessage.create(text = "pigeon_dead", human = pigeon.human_id)
+            dead.append((pigeon.id, pigeon.human_id))
+        pigeon.save()
+    return dead
+
+def state():
+    pigeons  = Pigeon.select(Pigeon.id, Pigeon.food, Pigeon.health, Pigeon.happiness, Pigeon.cleanliness, Pigeon.condition).order_by(Pigeon.id)
+    messages = SystemMessage.select(SystemMessage.human, SystemMessage.text).order_by(SystemMessage.human)
+    return list(pigeons.tuples()), list(messages.tuples())
+
+def test_same_result_as_the_per_pigeon_loop(db, bulk_insert):
+    populate(bulk_insert, 2000)
+    before = state()
+    with db.atomic() as transaction:
+        expected_dead = per_pigeon_decay()
+        expected = state()
+        transaction.rollback()
+    assert state() == before
+
+    with db.atomic():
+        dead = Pigeon.decay_stats()
+    assert sorted(dead) == sorted(expected_dead)
+    assert state() == expected
+    assert len(dead) > 0
+
+def test_nothing_to_decay(db, queries):
+    assert Pigeon.decay_stats() == []
+    assert len(queries) == 1
+
+def test_decay_benchmark(db, queries, bulk_insert):
+    populate(bulk_insert, 2000, seed = 1)
+    start = time.perf_counter()
+    with db.atomic() as transaction:
+        per_pigeon_decay()
+        transaction.rollback()
+    per_pigeon = time.perf_counter() - start
+
+    for model in (Human, Pigeon, Buff, PigeonBuff):
+        model.delete().execute()
+    populate(bulk_insert, 50000, seed = 1)
+    queries.clear()
+    start = time.perf_counter()
+    with db.atomic():
+        dead = Pigeon.decay_stats()
+    batched = time.perf_counter() - start
+
+    print(f"per pigeon loop: {per_pigeon * 25:.1f}s for 50k pigeons (2k measured), decay_stats: {batched:.2f}s for 50k pigeons in {len(queries)} queries")
+    # two selects, at most 2 x 6 distinct decays, the deaths and their messages.
+    assert len(queries) <= 2 + 12 + 2
+    assert len(dead) > 0
+    assert batched < per_pigeon * 25 / 10
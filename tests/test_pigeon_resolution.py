@@ -0,0 +1,172 @@
+import asyncio
+import datetime
+import random
+import time
+
+import discord
+import pycountry
+import pytest
+
+import src.config as config
+import src.models.base as base
+from src.models import Human, Item, Pigeon, Fight, Date, PigeonRelationship, SystemMessage
+from src.models.human import HumanCache
+from src.models.snapshot import ProfileCache
+from src.discord.cogs.pigeon import PigeonCog
+from src.discord.helpers.leaderboards import GuildLeaderboards
+
+models = (Human, Item, Pigeon, Fight, Date, PigeonRelationship, SystemMessage)
+
+class Guild:
+    def __init__(self, id):
+        self.id = id
+
+    def get_channel(self, id):
+        return ("channel", id)
+
+class GuildSettings:
+    def get_channel(self, guild, name):
+        return guild.get_channel(guild.id)
+
+class Dispatcher:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, sendable, **kwargs):
+        self.sent.append((sendable, kwargs))
+
+class Bot:
+    production = False
+
+    def __init__(self):
+        self.human_cache    = HumanCache()
+        self.profiles       = ProfileCache()
+        self.leaderboards   = GuildLeaderboards()
+        self.dispatcher     = Dispatcher()
+        self.guild_settings = GuildSettings()
+        self.guilds         = {}
+
+    def get_guild(self, id):
+        return self.guilds.setdefault(id, Guild(id))
+
+    def get_user(self, id):
+        return f"user {id}"
+
+    def get_dominant_color(self, guild):
+        return discord.Color.green()
+
+    def translate(self, key):
+        return key
+
+@pytest.fixture
+def db(sqlite, monkeypatch):
+    monkeypatch.setattr(base, "_save_listeners", {})
+    return sqlite(*models)
+
+@pytest.fixture
+def cog(db, monkeypatch):
+    bot = Bot()
+    monkeypatch.setattr(config, "bot", bot, raising = False)
+    return PigeonCog(bot)
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    executed = []
+    execute_sql = db.execute_sql
+    def counting(sql, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+    monkeypatch.setattr(db, "execute_sql", counting)
+    return executed
+
+def populate(bulk_insert, model, count, seed = 0, **kwargs):
+    """ count challenges between 2 x count pigeons of their own humans, spread over ten guilds. """
+    rng = random.Random(seed)
+    euro = {pycountry.currencies.get(alpha_3 = "EUR")}
+    bulk_insert(Human, [{"user_id" : x, "gold" : 100, "currencies" : euro} for x in range(1, count * 2 + 1)])
+    human_ids = [x for x, in Human.select(Human.id).order_by(Human.id).tuples()]
+
+    pigeons = []
+    for i, human_id in enumerate(human_ids):
+        pigeons.append({
+            "name"        : f"pigeon {i}",
+            "human"       : human_id,
+            "status"      : Pigeon.Status.fighting if model is Fight else Pigeon.Status.dating,
+            "health"      : rng.choice((5, 20, 100)),
+            "food"        : rng.randint(0, 100),
+            "cleanliness" : rng.randint(0, 100),
+            "happiness"   : rng.randint(0, 100),
+        })
+    bulk_insert(Pigeon, pigeons)
+    pigeon_ids = [x for x, in Pigeon.select(Pigeon.id).order_by(Pigeon.id).tuples()]
+
+    now = datetime.datetime.utcnow()
+    rows = [{"pigeon1" : pigeon_ids[i * 2], "pigeon2" : pigeon_ids[i * 2 + 1], "guild_id" : i % 10, "accepted" : True, "end_date" : now, **kwargs} for i in range(count)]
+    bulk_insert(model, rows)
+    return list(model.select().order_by(model.id))
+
+def test_fights_are_resolved_in_bulk(cog, queries, bulk_insert):
+    fights = populate(bulk_insert, Fight, 5000, bet = 50)
+    before = {x.id : x for x in Pigeon.select()}
+
+    random.seed(0)
+    queries.clear()
+    start = time.perf_counter()
+    asyncio.run(cog.resolve_fights(fights))
+    elapsed = time.perf_counter() - start
+    print(f"resolved 5000 fights in {elapsed:.2f}s and {len(queries)} queries")
+
+    # one prefetch, the bulk updates in batches of 1000, the gold and the death messages.
+    assert len(queries) < 40
+    assert all(x.finished for x in Fight.select())
+
+    after = {x.id : x for x in Pigeon.select()}
+    golds = {x.id : x.gold for x in Human.select()}
+    dead  = 0
+    for fight in Fight.select():
+        winner, loser = (fight.pigeon1_id, fight.pigeon2_id) if fight.won else (fight.pigeon2_id, fight.pigeon1_id)
+        for pigeon_id, experience, health in ((winner, 30, 10), (loser, 5, 25)):
+            pigeon = after[pigeon_id]
+            assert pigeon.status == Pigeon.Status.idle
+            assert pigeon.experience == before[pigeon_id].experience + experience
+            assert pigeon.health == max(before[pigeon_id].health - health, 0)
+            if before[pigeon_id].health - health <= 0:
+                assert pigeon.condition == Pigeon.Condition.dead
+                dead += 1
+        assert golds[after[winner].human_id] == 100 + fight.bet * 2
+        assert golds[after[loser].human_id] == 100
+
+    assert SystemMessage.select().count() == dead > 0
+    sent = cog.bot.dispatcher.sent
+    assert [x for x, _ in sent] == [("channel", x.guild_id) for x in fights]
+    winner, loser = (fights[0].pigeon1, fights[0].pigeon2) if fights[0].won else (fights[0].pigeon2, fights[0].pigeon1)
+    assert sent[0][1]["content"] == f"<@{winner.human.user_id}> | <@{loser.human.user_id}>"
+
+def test_dates_are_resolved_in_bulk(cog, queries, bulk_insert):
+    dates = populate(bulk_insert, Date, 5000)
+    # half of the couples already know each other.
+    PigeonRelationship.insert_many([{"pigeon1" : x.pigeon2_id, "pigeon2" : x.pigeon1_id, "score" : 3} for x in dates[::2]]).execute()
+    expected = []
+    for date in Date.select().order_by(Date.id):
+        expected.append(cog.score_date(date))
+
+    queries.clear()
+    start = time.perf_counter()
+    asyncio.run(cog.resolve_dates(dates))
+    elapsed = time.perf_counter() - start
+    print(f"resolved 5000 dates in {elapsed:.2f}s and {len(queries)} queries")
+
+    assert len(queries) < 40
+    scores = [x.score for x in Date.select().order_by(Date.id)]
+    assert scores == [x for x, _ in expected]
+    assert all(x.finished for x in Date.select())
+    assert Pigeon.select().where(Pigeon.status != Pigeon.Status.idle).count() == 0
+
+    relationships = {frozenset((x.pigeon1_id, x.pigeon2_id)) : x.score for x in PigeonRelationship.select()}
+    assert len(relationships) == len(dates)
+    for i, (date, score) in enumerate(zip(dates, scores)):
+        assert relationships[frozenset((date.pigeon1_id, date.pigeon2_id))] == (3 if i % 2 == 0 else 0) + score // 10
+
+    sent = cog.bot.dispatcher.sent
+    assert len(sent) == len(dates)
+    assert sent[0][1]["embed"].description.endswith(f"Score: **{scores[0]}**")
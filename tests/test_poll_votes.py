@@ -0,0 +1,116 @@
+import time
+import asyncio
+
+import peewee
+import pytest
+
+from src.models import Poll, Option, Vote
+from src.discord.helpers.poll_votes import PollVoteLedger
+
+def create_poll(message_id, max_votes = 1, options = 3):
+    poll = Poll.create(question = "?", guild_id = 1, author_id = 1, message_id = message_id, max_votes_per_user = max_votes)
+    poll.create_options([str(x) for x in range(options)])
+    return poll
+
+def stored(poll):
+    query = Vote.select(Vote.option, Vote.user_id).join(Option).where(Option.poll == poll)
+    return set(query.tuples())
+
+def in_memory(ledger, message_id):
+    entry = ledger.get(message_id)
+    return set((x, y) for y, options in entry.votes.items() for x in options)
+
+@pytest.fixture
+def ledger(sqlite):
+    sqlite(Poll, Option, Vote)
+    return PollVoteLedger()
+
+def test_oldest_votes_are_dropped(ledger):
+    poll = create_poll(10, max_votes = 2)
+    ledger.add_poll(poll)
+    first, second, third = [x.id for x in poll.options]
+
+    ledger.vote(10, 1, first)
+    ledger.vote(10, 1, second)
+    assert ledger.vote(10, 1, second) == []
+    assert ledger.vote(10, 1, third) == [first]
+    assert ledger.counts(10) == {first : 0, second : 1, third : 1}
+
+    ledger.flush()
+    assert stored(poll) == in_memory(ledger, 10) == {(second, 1), (third, 1)}
+
+    assert ledger.vote(10, 1, first) == [second]
+    ledger.flush()
+    assert stored(poll) == {(third, 1), (first, 1)}
+
+def test_load(ledger):
+    poll = create_poll(10, max_votes = 1)
+    ended = create_poll(11)
+    ended.ended = True
+    ended.save()
+    option = poll.options[0]
+    Vote.create(option = option, user_id = 5)
+
+    asyncio.run(ledger.load())
+    assert 10 in ledger and 11 not in ledger
+    assert ledger.counts(10)[option.id] == 1
+    assert ledger.vote(10, 5, poll.options[1].id) == [option.id]
+
+def test_reload_keeps_pending_votes(ledger):
+    poll = create_poll(10)
+    asyncio.run(ledger.load())
+    ledger.vote(10, 1, poll.options[0].id)
+
+    asyncio.run(ledger.load())
+    assert ledger.counts(10)[poll.options[0].id] == 1
+    assert ledger.pending == 1
+
+def test_failed_flush_is_restored(ledger, monkeypatch):
+    poll = create_poll(10)
+    ledger.add_poll(poll)
+    first, second, _ = [x.id for x in poll.options]
+    ledger.vote(10, 1, first)
+
+    write = PollVoteLedger._write
+    def failing(*args, **kwargs):
+        raise peewee.OperationalError("gone away")
+    monkeypatch.setattr(PollVoteLedger, "_write", staticmethod(failing))
+    with pytest.raises(peewee.OperationalError):
+        ledger.flush()
+    monkeypatch.setattr(PollVoteLedger, "_write", staticmethod(write))
+
+    ledger.vote(10, 1, second)
+    ledger.flush()
+    assert stored(poll) == in_memory(ledger, 10) == {(second, 1)}
+
+def test_votes_without_a_poll_are_not_tracked(ledger):
+    assert 123 not in ledger
+    assert ledger.counts(123) is None
+    assert ledger.message_ids == set()
+
+def test_benchmark_10k_votes(ledger, monkeypatch):
+    poll = create_poll(10, max_votes = 2, options = 5)
+    ledger.add_poll(poll)
+    options = [x.id for x in poll.options]
+
+    start = time.perf_counter()
+    for user_id in range(10000):
+        for i in range(3):
+            ledger.vote(10, user_id, options[(user_id + i) % len(options)])
+    voted = time.perf_counter() - start
+
+    queries = []
+    execute_sql = Vote._meta.database.execute_sql
+    def counting(sql, *args, **kwargs):
+        queries.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+    monkeypatch.setattr(Vote._meta.database, "execute_sql", counting)
+    start = time.perf_counter()
+    ledger.flush()
+    flushed = time.perf_counter() - start
+    monkeypatch.setattr(Vote._meta.database, "execute_sql", execute_sql)
+
+    print(f"30000 reactions in {voted * 1000:.0f}ms, flushed in {flushed * 1000:.0f}ms with {len(queries)} queries")
+    assert sum(ledger.counts(10).values()) == 20000
+    assert len(stored(poll)) == 20000
+    assert len(queries) == 20
@@ -0,0 +1,49 @@
+import time
+import math
+
+from currency_converter import CurrencyConverter
+
+from src.utils.conversion import RateMatrix
+
+converter = CurrencyConverter()
+rates = RateMatrix(converter)
+
+def test_matches_the_converter():
+    for currency, other in (("USD", "EUR"), ("GBP", "JPY"), ("EUR", "CHF")):
+        expected = converter.convert(100, currency, other)
+        assert math.isclose(rates.convert(100, currency, other), expected, rel_tol = 1e-9)
+
+def test_currencies_no_longer_quoted_keep_their_last_rate():
+    for currency in ("RUB", "HRK"):
+        expected = 1 / converter.convert(1, currency, "EUR")
+        assert math.isclose(rates.convert(1, "EUR", currency), expected, rel_tol = 1e-9)
+    assert not any(math.isnan(x) for x in rates.convert_many(1, "USD", rates.codes))
+
+def test_unknown_currency():
+    try:
+        rates.convert(1, "EUR", "XXX")
+    except ValueError:
+        return
+    assert False
+
+def test_benchmark():
+    """ One message converted to every other currency, pair by pair against the matrix row. """
+    others = [x for x in rates.codes if x != "USD"]
+    runs = 200
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        for other in others:
+            try:
+                converter.convert(25, "USD", other)
+            except Exception:
+                pass
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        rates.convert_many(25, "USD", others)
+    after = time.perf_counter() - start
+
+    print(f"{len(others)} currencies x {runs}: converter {before * 1000:.1f}ms, matrix {after * 1000:.1f}ms")
+    assert after < before
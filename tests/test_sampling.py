@@ -0,0 +1,90 @@
+import random
+from collections import Counter
+
+from src.utils.sampling import AliasTable, WeightedSampler, chi_square, chi_square_p_value, matches_weights
+
+def test_alias_table_matches_weights():
+    rng = random.Random(0)
+    for weights in ([1], [1, 1], [1, 2, 3, 4], [1, 1000], [5, 0, 5], [rng.randint(1, 100) for _ in range(200)]):
+        table = AliasTable(range(len(weights)), weights)
+        assert matches_weights(table, draws = 50000, rng = random.Random(1))
+
+def test_wrong_weights_are_detected():
+    table = AliasTable("abc", [1, 2, 3])
+    table.weights = [3, 2, 1]
+    assert not matches_weights(table, draws = 50000, rng = random.Random(1))
+
+def test_chi_square_p_value():
+    assert chi_square_p_value(0, 0) == 1.0
+    # 95th percentiles of the chi-square distribution.
+    for statistic, degrees_of_freedom in ((3.841, 1), (11.07, 5), (124.3, 100)):
+        assert abs(chi_square_p_value(statistic, degrees_of_freedom) - 0.05) < 0.01
+
+def test_zero_weights_are_never_drawn():
+    table = AliasTable("abc", [0, 1, 0])
+    assert set(table.draw(random.Random(x)) for x in range(1000)) == {"b"}
+    assert AliasTable([], []).draw() is None
+    assert AliasTable("ab", [0, 0]).draw() is None
+
+class Loader:
+    def __init__(self, rows):
+        self.rows  = rows
+        self.loads = Counter()
+
+    def __call__(self, key):
+        self.loads[key] += 1
+        return [x[:3] for x in self.rows if key in x[3]]
+
+def test_sampler_is_seeded():
+    rows = [(x, f"item {x}", x + 1, (None, )) for x in range(10)]
+    first, second = WeightedSampler(Loader(rows), seed = 5), WeightedSampler(Loader(rows), seed = 5)
+    assert [first.draw() for _ in range(100)] == [second.draw() for _ in range(100)]
+
+def test_sampler_distributions_per_key():
+    rows = [(1, "a", 1, ("x", )), (2, "b", 3, ("x", "y")), (3, "c", 6, ("y", ))]
+    sampler = WeightedSampler(Loader(rows), seed = 0)
+    assert sampler.table("x").values == ["a", "b"]
+    assert sampler.table("y").weights == [3, 6]
+    for key in ("x", "y"):
+        assert matches_weights(sampler.table(key), draws = 50000, rng = sampler.rng)
+
+def test_update_rebuilds_only_touched_tables():
+    rows = [(1, "a", 1, ("x", )), (2, "b", 1, ("x", )), (3, "c", 1, ("y", ))]
+    loader = Loader(rows)
+    sampler = WeightedSampler(loader, seed = 0)
+    x, y = sampler.table("x"), sampler.table("y")
+
+    sampler.update(2, "b", 9, ("x", "y"))
+    assert sampler.table("x") is not x and sampler.table("y") is not y
+    assert sorted(zip(sampler.table("x").values, sampler.table("x").weights)) == [("a", 1), ("b", 9)]
+    assert sorted(zip(sampler.table("y").values, sampler.table("y").weights)) == [("b", 9), ("c", 1)]
+    assert matches_weights(sampler.table("x"), draws = 50000, rng = sampler.rng)
+
+    y = sampler.table("y")
+    sampler.update(1, "a", 0, ("x", ))
+    assert sampler.table("y") is y
+    assert sampler.table("x").values == ["b"]
+
+    sampler.update(4, "d", 5, ("z", ))
+    assert "z" not in sampler._rows
+
+    sampler.remove(2)
+    assert sampler.table("x").draw(sampler.rng) is None
+    assert sampler.table("y").values == ["c"]
+    assert loader.loads == {"x" : 1, "y" : 1}
+
+def test_invalidate_loads_again():
+    loader = Loader([(1, "a", 1, (None, ))])
+    sampler = WeightedSampler(loader, seed = 0)
+    sampler.draw()
+    loader.rows.append((2, "b", 1, (None, )))
+    assert sampler.table().values == ["a"]
+    sampler.invalidate()
+    assert sampler.table().values == ["a", "b"]
+    assert loader.loads[None] == 2
+
+def test_chi_square_counts_every_draw():
+    table = AliasTable("ab", [1, 1])
+    statistic, degrees_of_freedom = chi_square(table, draws = 10, rng = random.Random(0))
+    assert degrees_of_freedom == 1
+    assert statistic >= 0
@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+
+import peewee
+
+from src.models import BaseModel, database
+from src.discord.helpers.scheduler import Scheduler
+
+class Task(BaseModel):
+    due_date = peewee.DateTimeField ()
+    done     = peewee.BooleanField  (default = False)
+
+class Clock:
+    def __init__(self):
+        self.time = datetime.datetime(2021, 1, 1)
+
+    def __call__(self):
+        return self.time
+
+    def advance(self, **kwargs):
+        self.time += datetime.timedelta(**kwargs)
+
+def setup_scheduler(sqlite, callback):
+    sqlite(Task)
+    clock = Clock()
+    scheduler = Scheduler(clock = clock)
+    return clock, scheduler, scheduler.register(Task, callback, due = lambda x : x.due_date if not x.done else None, where = (Task.done == False))
+
+def test_fires_when_due(sqlite):
+    fired = []
+    async def callback(tasks):
+        fired.extend(x.id for x in tasks)
+
+    async def main():
+        clock, scheduler, register = setup_scheduler(sqlite, callback)
+        first  = Task.create(due_date = clock() + datetime.timedelta(minutes = 1))
+        second = Task.create(due_date = clock() + datetime.timedelta(minutes = 5))
+        await register
+
+        clock.advance(seconds = 59)
+        assert await scheduler.run_pending() == 0
+        clock.advance(seconds = 1)
+        assert await scheduler.run_pending() == 1
+        assert fired == [first.id]
+        clock.advance(minutes = 10)
+        await scheduler.run_pending()
+        assert fired == [first.id, second.id]
+        assert len(scheduler) == 0
+    asyncio.run(main())
+
+def test_saves_reschedule(sqlite):
+    fired = []
+    async def callback(tasks):
+        fired.extend(x.id for x in tasks)
+
+    async def main():
+        clock, scheduler, register = setup_scheduler(sqlite, callback)
+        await register
+        task = Task.create(due_date = clock() + datetime.timedelta(minutes = 1))
+        task.due_date = clock() + datetime.timedelta(hours = 1)
+        task.save()
+        assert scheduler.next_due == task.due_date
+
+        clock.advance(minutes = 2)
+        assert await scheduler.run_pending() == 0
+        task.done = True
+        task.save()
+        assert scheduler.next_due is None
+        assert fired == []
+    asyncio.run(main())
+
+def test_failed_callback_is_retried(sqlite):
+    calls = []
+    async def callback(tasks):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise Exception("boom")
+
+    async def main():
+        clock, scheduler, register = setup_scheduler(sqlite, callback)
+        Task.create(due_date = clock())
+        await register
+
+        await scheduler.run_pending()
+        assert len(calls) == 1
+        clock.advance(seconds = Scheduler.retry_delay.total_seconds())
+        await scheduler.run_pending()
+        assert len(calls) == 2
+    asyncio.run(main())
+
+def test_failed_query_is_retried(sqlite, monkeypatch):
+    fired = []
+    async def callback(tasks):
+        fired.extend(x.id for x in tasks)
+
+    async def main():
+        clock, scheduler, register = setup_scheduler(sqlite, callback)
+        task = Task.create(due_date = clock())
+        await register
+
+        run = database.run
+        async def failing(*args, **kwargs):
+            raise peewee.OperationalError("gone away")
+        monkeypatch.setattr(database, "run", failing)
+        await scheduler.run_pending()
+        assert fired == [] and len(scheduler) == 1
+
+        monkeypatch.setattr(database, "run", run)
+        clock.advance(seconds = Scheduler.retry_delay.total_seconds())
+        await scheduler.run_pending()
+        assert fired == [task.id]
+    asyncio.run(main())
+
+def test_run_survives_errors():
+    async def main():
+        scheduler = Scheduler(clock = Clock())
+        calls = []
+        async def run_pending():
+            calls.append(None)
+            raise Exception("boom")
+        scheduler.run_pending = run_pending
+        scheduler.start()
+        scheduler.call_at(scheduler.now(), None)
+        await asyncio.sleep(0.01)
+        assert len(calls) >= 2
+        assert not scheduler._task.done()
+        scheduler.stop()
+    asyncio.run(main())
+
+def test_many_rows_fire_in_one_query(sqlite):
+    batches = []
+    async def callback(tasks):
+        batches.append(len(tasks))
+
+    async def main():
+        clock, scheduler, register = setup_scheduler(sqlite, callback)
+        Task.insert_many([{"due_date" : clock() + datetime.timedelta(seconds = i % 60)} for i in range(10000)]).execute()
+        await register
+        clock.advance(minutes = 1)
+        assert await scheduler.run_pending() == 10000
+        assert batches == [10000]
+    asyncio.run(main())
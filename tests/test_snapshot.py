@@ -0,0 +1,129 @@
+import datetime
+
+import pycountry
+import pytest
+
+import src.models.base as base
+from src.models import Human, Item, HumanItem, Pigeon, Buff, PigeonBuff, PigeonRelationship, LanguageMastery, Mail
+from src.models.snapshot import ProfileCache
+
+models = (Human, Item, HumanItem, Pigeon, Buff, PigeonBuff, PigeonRelationship, LanguageMastery, Mail)
+
+@pytest.fixture
+def db(sqlite, monkeypatch):
+    monkeypatch.setattr(base, "_save_listeners", {})
+    return sqlite(*models)
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    executed = []
+    execute_sql = db.execute_sql
+    def counting(sql, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+    monkeypatch.setattr(db, "execute_sql", counting)
+    return executed
+
+def create_human(user_id):
+    return Human.create(user_id = user_id, currencies = {pycountry.currencies.get(alpha_3 = "EUR")})
+
+def create_item(name):
+    return Item.create(name = name, code = name, description = name, image_url = "", chance = 1)
+
+def create_profile(human, items = 20):
+    for i in range(items):
+        HumanItem.create(human = human, item = create_item(f"item {human.id} {i}"), amount = 2, found = True)
+    pigeon = Pigeon.create(name = "bob", human = human)
+    other  = Pigeon.create(name = "alice", human = create_human(human.user_id + 1000))
+    buff   = Buff.create(name = "fast", description = "fast", code = "fast", duration = datetime.timedelta(hours = 1))
+    PigeonBuff.create(pigeon = pigeon, buff = buff)
+    PigeonBuff.create(pigeon = pigeon, buff = buff, due_date = datetime.datetime.utcnow() - datetime.timedelta(hours = 1))
+    LanguageMastery.create(pigeon = pigeon, language = pycountry.languages.get(alpha_2 = "nl"), mastery = 10)
+    PigeonRelationship.create(pigeon1 = other, pigeon2 = pigeon, score = 5)
+    Mail.create(recipient = human, sender = other, read = False, finished = True)
+    return pigeon
+
+def render(snapshot):
+    """ Touches everything the profile, inventory and pigeon status commands show. """
+    values = [snapshot.items_discovered, snapshot.items_in_possession, snapshot.unread_mail]
+    values += [x.item.name for x in snapshot.human_items]
+    values += [x.buff.name for x in snapshot.active_buffs]
+    values += [x.language.name for x in snapshot.language_masteries]
+    values += [(x.score, y.name, y.human_id) for x, y in snapshot.other_pigeons()]
+    values.append(snapshot.pigeon.human.user_id)
+    return values
+
+def test_snapshot_loads_in_six_queries(db, queries):
+    human = create_human(1)
+    create_profile(human)
+    human = Human.get_by_id(human.id)
+
+    queries.clear()
+    snapshot = ProfileCache().get(human)
+    values = render(snapshot)
+
+    assert len(queries) == 6
+    assert values[:3] == [20, 40, 1]
+    assert values[-2:] == [(5, "alice", snapshot.relationships[0].pigeon1.human_id), 1]
+    assert len(snapshot.active_buffs) == 1
+
+def test_snapshot_without_pigeon_loads_in_three_queries(db, queries):
+    human = create_human(1)
+    HumanItem.create(human = human, item = create_item("stick"))
+
+    queries.clear()
+    snapshot = ProfileCache().get(human)
+    assert [x.item.name for x in snapshot.human_items] == ["stick"]
+    assert snapshot.pigeon is None
+    assert len(queries) == 3
+
+def test_cached_snapshot_costs_no_queries(db, queries):
+    human = create_human(1)
+    create_profile(human)
+    cache = ProfileCache()
+    cache.get(human)
+
+    queries.clear()
+    render(cache.get(human))
+    assert queries == []
+    assert cache.loads == 1
+
+def test_writes_invalidate_the_snapshot(db):
+    human = create_human(1)
+    pigeon = create_profile(human)
+    cache = ProfileCache()
+
+    snapshot = cache.get(human)
+    HumanItem.create(human = human, item = create_item("stick"), found = True)
+    assert cache.get(human) is not snapshot
+    assert cache.get(human).items_discovered == 21
+
+    snapshot = cache.get(human)
+    mastery = LanguageMastery.get(LanguageMastery.pigeon == pigeon)
+    mastery.mastery = 50
+    mastery.save()
+    assert cache.get(human) is not snapshot
+    assert cache.get(human).language_masteries[0].mastery == 50
+
+    snapshot = cache.get(human)
+    other = PigeonRelationship.get().pigeon1
+    PigeonRelationship.create(pigeon1 = pigeon, pigeon2 = other, score = 1)
+    assert cache.get(human) is not snapshot
+    assert cache.loads == 4
+
+def test_snapshot_versus_lazy_loading(db, queries):
+    human = create_human(1)
+    create_profile(human, items = 50)
+    human = Human.get_by_id(human.id)
+
+    queries.clear()
+    pigeon = Pigeon.get((Pigeon.human == human) & (Pigeon.condition == Pigeon.Condition.active))
+    [x.item.name for x in human.human_items]
+    [x.buff.name for x in pigeon._buffs]
+    lazy = len(queries)
+
+    queries.clear()
+    render(ProfileCache().get(human))
+    print(f"lazy: {lazy} queries, snapshot: {len(queries)} queries")
+    assert lazy > 50
+    assert len(queries) == 6
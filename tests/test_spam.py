@@ -0,0 +1,58 @@
+from src.models import SpamThreshold
+from src.discord.helpers.moderation import SpamDetector
+
+thresholds = SpamThreshold(guild_id = 1)
+
+def observe(detector, content, now, user_id = 1, channel_id = 1, mentions = 0):
+    return detector.observe(1, channel_id, user_id, content, mentions, thresholds, now = now)
+
+def test_message_burst_is_flagged():
+    detector = SpamDetector()
+    results = [observe(detector, f"message number {i}", i * 0.5) for i in range(thresholds.messages)]
+    assert results[:-1] == [None] * (thresholds.messages - 1)
+    assert results[-1] is not None
+
+def test_slow_messages_are_not_flagged():
+    detector = SpamDetector()
+    assert all(observe(detector, f"message number {i}", i * 2) is None for i in range(50))
+
+def test_duplicates_are_flagged():
+    detector = SpamDetector()
+    results = [observe(detector, "buy my stuff now", i * 10) for i in range(thresholds.duplicates)]
+    assert results[-1] is not None
+
+def test_short_and_empty_content_is_not_a_duplicate():
+    detector = SpamDetector()
+    for content in ("", "lol", "!daily"):
+        assert all(observe(detector, content, i * 10, user_id = hash(content)) is None for i in range(10))
+
+def test_mentions_are_flagged():
+    detector = SpamDetector()
+    assert observe(detector, "hello there everyone", 0, mentions = 6) is None
+    assert observe(detector, "hello there again", 1, mentions = 6) is not None
+
+def test_flagging_starts_over():
+    detector = SpamDetector()
+    for i in range(thresholds.messages):
+        observe(detector, f"message number {i}", i * 0.1)
+    assert observe(detector, "one more message", 1) is None
+    assert detector.flagged == 1
+
+def test_users_are_bounded():
+    detector = SpamDetector(max_users = 100)
+    for user_id in range(1000):
+        observe(detector, "hello there everyone", 0, user_id = user_id)
+    assert len(detector._users) <= 100
+
+def test_message_check_can_be_turned_off():
+    detector = SpamDetector()
+    off = SpamThreshold(guild_id = 1, messages = 0)
+    for i in range(100):
+        assert detector.observe(1, 1, i % 3, f"message number {i}", 0, off, now = i * 0.01) is None
+    assert len(detector._channels) == 0
+
+def test_other_checks_still_work_with_message_check_off():
+    detector = SpamDetector()
+    off = SpamThreshold(guild_id = 1, messages = 0)
+    results = [detector.observe(1, 1, 1, "buy my stuff now", 0, off, now = i) for i in range(off.duplicates)]
+    assert results[-1] is not None
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from src.models import StaffVote, StaffVoteBallot
+from src.discord.helpers.staff_votes import StaffVoteTally, StaffVoteStore
+
+emojis = ["✅", "❎"]
+
+class User:
+    def __init__(self, id, bot = False):
+        self.id  = id
+        self.bot = bot
+
+class Reaction:
+    def __init__(self, emoji, users):
+        self.emoji  = emoji
+        self._users = users
+
+    async def users(self):
+        for user in self._users:
+            yield user
+
+class Message:
+    def __init__(self, id, channel, reactions = ()):
+        self.id        = id
+        self.channel   = channel
+        self.content   = "should we?"
+        self.reactions = list(reactions)
+
+class Channel:
+    def __init__(self, id = 1):
+        self.id       = id
+        self.messages = {}
+        self.fetches  = 0
+
+    async def fetch_message(self, message_id):
+        self.fetches += 1
+        await asyncio.sleep(0)
+        return self.messages[message_id]
+
+@pytest.fixture
+def store(sqlite):
+    sqlite(StaffVote, StaffVoteBallot)
+    return StaffVoteStore(emojis)
+
+def stored_ballots():
+    return set(StaffVoteBallot.select(StaffVoteBallot.user_id, StaffVoteBallot.emoji).tuples())
+
+def test_tally_counts_first_emoji():
+    tally = StaffVoteTally(None, emojis, [(1, "❎"), (1, "✅"), (2, "❎")])
+    assert tally.votes() == {"✅" : 1, "❎" : 1}
+    assert tally.remove(1, "✅")
+    assert tally.votes() == {"✅" : 0, "❎" : 2}
+    assert not tally.remove(3, "✅")
+
+def test_reaction_before_create_is_kept(store):
+    channel = Channel()
+    message = channel.messages[10] = Message(10, channel, [Reaction("✅", [User(1), User(2, bot = True)])])
+
+    async def main():
+        tally, _ = await asyncio.gather(store.get(channel, 10), store.create(message))
+        return tally
+    tally = asyncio.run(main())
+
+    assert StaffVote.select().count() == 1
+    assert stored_ballots() == {(1, "✅")}
+    assert tally.votes() == {"✅" : 1, "❎" : 0}
+    assert asyncio.run(store.get(channel, 10)) is tally
+
+def test_create_before_reaction_skips_fetch(store):
+    channel = Channel()
+    message = Message(10, channel)
+    asyncio.run(store.create(message))
+    tally = asyncio.run(store.get(channel, 10))
+    asyncio.run(store.add(tally, 1, "❎"))
+
+    assert channel.fetches == 0
+    assert stored_ballots() == {(1, "❎")}
+
+def test_seed_reuses_stored_vote(store):
+    channel = Channel()
+    channel.messages[10] = Message(10, channel, [Reaction("✅", [User(1)])])
+    vote = StaffVote.create(message_id = 10, channel_id = 1, content = "should we?")
+    StaffVoteBallot.create(vote = vote, user_id = 1, emoji = "✅")
+
+    tally = asyncio.run(store._seed(channel, 10))
+    assert tally.vote.id == vote.id
+    assert stored_ballots() == {(1, "✅")}
@@ -0,0 +1,157 @@
+import asyncio
+import datetime
+import random
+import time
+
+import pytest
+import pytz
+from timezonefinder import TimezoneFinder
+
+import src.config as config
+from src.models import Human
+from src.utils.country import Country
+from src.utils.timezone import Timezone, TimezoneIndex, timezone_index
+from src.wrappers.openweathermap import City, TemperatureUnit
+
+def scanned_country_code(self):
+    """ The scan over every country Timezone._get_country_code did before. """
+    for code in pytz.country_timezones:
+        if self.name in pytz.country_timezones[code]:
+            return code
+
+def fresh_finder_zone_at(self, lng, lat):
+    """ City.timezone and Timezone.from_location built a new TimezoneFinder for every lookup. """
+    return TimezoneFinder().timezone_at(lng = lng, lat = lat)
+
+def capitals():
+    countries = []
+    for country in Country.all():
+        try:
+            countries.append((country, country.capital_latlng()))
+        except KeyError:
+            pass
+    return countries
+
+def test_country_codes_match_the_scan():
+    for name in pytz.all_timezones:
+        assert timezone_index.country_code(name) == scanned_country_code(Timezone(name))
+
+def test_zones_match_a_fresh_finder():
+    finder = TimezoneFinder()
+    for country, (lat, lng) in capitals()[::10]:
+        assert Timezone.from_location(lng, lat).name == finder.timezone_at(lng = lng, lat = lat)
+
+def test_from_hour_finds_a_zone_for_every_hour_the_scan_did():
+    now = datetime.datetime.now()
+    hours = set(now.astimezone(pytz.timezone(x)).hour for x in pytz.common_timezones_set)
+    for hour in range(24):
+        timezone = Timezone.from_hour(hour)
+        if hour in hours:
+            assert timezone.current_time.hour == hour
+        else:
+            assert timezone is None
+
+def test_offsets_follow_the_hour():
+    index = TimezoneIndex()
+    now = datetime.datetime(2026, 3, 29, 0, 30)
+    winter = index.offsets(now)
+    assert "Europe/Amsterdam" in winter[datetime.timedelta(hours = 1)]
+    assert index.offsets(now + datetime.timedelta(minutes = 20)) is winter
+    summer = index.offsets(now + datetime.timedelta(hours = 1))
+    assert "Europe/Amsterdam" in summer[datetime.timedelta(hours = 2)]
+
+class User:
+    def __init__(self, id):
+        self.name = f"user {id}"
+
+class Snapshot:
+    pigeon = None
+
+class Profiles:
+    def get(self, human):
+        return Snapshot()
+
+class OpenWeatherMap:
+    def __init__(self, cities):
+        self.cities = cities
+
+    async def fetch_by_q(self, city, country_code = None, max_age = None):
+        return self.cities[city]
+
+class Bot:
+    gold_emoji = "🪙"
+
+    def __init__(self, cities):
+        self.profiles = Profiles()
+        self.owm_api  = OpenWeatherMap(cities)
+
+    def get_user(self, id):
+        return User(id)
+
+def city(name, country_code, lat, lon):
+    data = {
+        "id"      : 1,
+        "name"    : name,
+        "coord"   : {"lat" : lat, "lon" : lon},
+        "sys"     : {"country" : country_code},
+        "weather" : [{"id" : 800, "main" : "Clear", "description" : "clear sky", "icon" : "01d"}],
+        "main"    : {"temp" : 20, "feels_like" : 20, "pressure" : 1000, "humidity" : 50, "temp_min" : 20, "temp_max" : 20},
+    }
+    return City(TemperatureUnit.Celsius, data)
+
+@pytest.fixture
+def humans(monkeypatch):
+    """ A few thousand humans in a few hundred places: half live in a city, the others only gave their country. """
+    rng = random.Random(0)
+    places = capitals()
+    cities = {}
+    for country, (lat, lng) in places:
+        # a few kilometres off the capital, inside the same zone.
+        cities[country.alpha_2] = city(country.alpha_2, country.alpha_2, lat + rng.uniform(-0.05, 0.05), lng + rng.uniform(-0.05, 0.05))
+    monkeypatch.setattr(config, "bot", Bot(cities), raising = False)
+
+    humans = []
+    zones = sorted(pytz.common_timezones_set)
+    countries = [x for x, _ in places if x.alpha_2 not in ("US", "CA")]
+    # next_birthday has no answer for the 29th of february.
+    birthdays = [x for x in (datetime.date(1990, 1, 1) + datetime.timedelta(days = i) for i in range(10000)) if (x.month, x.day) != (2, 29)]
+    for user_id in range(3000):
+        country = rng.choice(countries)
+        humans.append(Human(
+            user_id       = user_id,
+            country       = country,
+            city          = country.alpha_2 if user_id % 2 == 0 else None,
+            timezone      = rng.choice(zones),
+            date_of_birth = rng.choice(birthdays),
+            gold          = rng.randrange(1000),
+        ))
+    return humans
+
+async def render(humans):
+    """ The profile field of every human and the timezone the profile setup would pick for them. """
+    rendered = []
+    for human in humans:
+        field = await human.get_embed_field(show_all = True)
+        # the clock may tick over between two runs.
+        value = "\n".join(x for x in field["value"].splitlines() if not x.startswith("🕑"))
+        rendered.append((field["name"], value, await human.calculate_timezone()))
+    return rendered
+
+def test_profile_rendering_benchmark(humans, monkeypatch):
+    sample = humans[:300]
+
+    timezone_index.timezone_at.cache_clear()
+    start = time.perf_counter()
+    after = asyncio.run(render(humans))
+    indexed = time.perf_counter() - start
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Timezone, "_get_country_code", scanned_country_code)
+        patch.setattr(TimezoneIndex, "zone_at", fresh_finder_zone_at)
+        start = time.perf_counter()
+        before = asyncio.run(render(sample))
+        scanned = (time.perf_counter() - start) * len(humans) / len(sample)
+
+    print(f"{len(humans)} profiles: before {scanned:.1f}s ({len(sample)} measured), timezone index {indexed * 1000:.0f}ms")
+    assert after[:len(sample)] == before
+    assert indexed * 10 < scanned
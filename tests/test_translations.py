@@ -0,0 +1,105 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from src.models import Locale, Translation, TranslationCatalogue
+
+locales = ("en_US", "nl_NL", "de_DE")
+
+class PerKeyTranslations:
+    """ How Locus.translate looked translations up before: one select per new key and locale, missing keys every time. """
+
+    def __init__(self):
+        self.cached  = {}
+        self.missing = {}
+
+    def translate(self, key, locale = "en_US"):
+        missing = self.missing.setdefault(locale, set())
+        cached  = self.cached.setdefault(locale, {})
+        try:
+            if key in cached:
+                return cached[key]
+            translation = Translation.get(locale = locale, message_key = key)
+            missing.discard(key)
+            cached[key] = translation.value
+            return translation.value
+        except Translation.DoesNotExist:
+            missing.add(key)
+            return key
+
+@pytest.fixture
+def db(sqlite):
+    db = sqlite(Locale, Translation)
+    Locale.insert_many([{"name" : x} for x in locales]).execute()
+    return db
+
+@pytest.fixture
+def queries(db, monkeypatch):
+    executed = []
+    execute_sql = db.execute_sql
+    def counting(sql, *args, **kwargs):
+        executed.append(sql)
+        return execute_sql(sql, *args, **kwargs)
+    monkeypatch.setattr(db, "execute_sql", counting)
+    return executed
+
+def populate(keys):
+    rows = [{"locale" : x, "message_key" : f"key_{i}", "value" : f"{x} {i}"} for x in locales for i in range(keys)]
+    with Translation._meta.database.atomic():
+        for batch in range(0, len(rows), 300):
+            Translation.insert_many(rows[batch:batch + 300]).execute()
+
+def test_catalogue_translates_and_remembers_missing_keys(db, queries):
+    populate(10)
+    queries.clear()
+    catalogue = TranslationCatalogue()
+    assert catalogue.translate("key_1", "nl_NL") == "nl_NL 1"
+    assert catalogue.translate("key_1") == "en_US 1"
+    assert catalogue.translate("nope", "de_DE") == "nope"
+    assert catalogue.translate("nope", "de_DE") == "nope"
+    assert catalogue.translate("key_1", "xx_XX") == "key_1"
+    assert len(queries) == 1
+    assert catalogue.get_missing("de_DE") == {"nope"}
+    assert catalogue.get_missing("xx_XX") == {"key_1"}
+
+def test_reload_swaps_in_new_translations(db):
+    populate(1)
+    catalogue = TranslationCatalogue()
+    assert catalogue.translate("new", "nl_NL") == "new"
+    version = catalogue.version
+
+    Translation.create(locale = "nl_NL", message_key = "new", value = "nieuw")
+    Translation.delete().where(Translation.message_key == "key_0").execute()
+    assert catalogue.translate("new", "nl_NL") == "new"
+
+    asyncio.run(catalogue.reload())
+    assert catalogue.version == version + 1
+    assert catalogue.translate("new", "nl_NL") == "nieuw"
+    assert catalogue.translate("key_0", "nl_NL") == "key_0"
+    assert catalogue.get_missing("nl_NL") == {"key_0"}
+
+def test_lookup_latency_benchmark(db, queries):
+    """ A cold bot serving its first 20k lookups, a tenth of them for keys without a translation. """
+    populate(500)
+    rng = random.Random(0)
+    lookups = []
+    for _ in range(20000):
+        key = f"key_{rng.randrange(550)}"
+        lookups.append((key, rng.choice(locales)))
+
+    def measure(translations):
+        queries.clear()
+        start = time.perf_counter()
+        values = [translations.translate(key, locale) for key, locale in lookups]
+        return values, time.perf_counter() - start, len(queries)
+
+    before, per_key_time, per_key_queries = measure(PerKeyTranslations())
+    after, catalogue_time, catalogue_queries = measure(TranslationCatalogue())
+
+    print(f"20k cold lookups: per key {per_key_time * 1000:.0f}ms in {per_key_queries} queries, catalogue {catalogue_time * 1000:.0f}ms in {catalogue_queries} query")
+    assert after == before
+    assert catalogue_queries == 1
+    assert per_key_queries > 1500
+    assert catalogue_time * 10 < per_key_time
@@ -0,0 +1,54 @@
+import time
+import random
+import asyncio
+
+from src.models import ModerationRule
+from src.discord.helpers.moderation import WordAutomaton, ModerationEngine
+
+corpus = [
+    ("you are a retard",                 ["retard"]),
+    ("R3T4RD",                           ["retard"]),
+    ("what a nice day",                  []),
+    ("classic assessment",               []),
+    ("you ass!",                         ["ass"]),
+    ("badword and retard in one go",     ["badword", "retard"]),
+    ("",                                 []),
+]
+
+def test_corpus():
+    automaton = WordAutomaton([("retard", False), ("ass", True), ("badword", False)])
+    for text, expected in corpus:
+        assert sorted(automaton.find(text)) == sorted(expected), text
+
+def test_partial_words():
+    automaton = WordAutomaton([("he", False), ("she", False), ("hers", False)])
+    assert sorted(automaton.find("ushers")) == ["he", "hers", "she"]
+
+def test_empty_automaton():
+    automaton = WordAutomaton([])
+    assert not automaton
+    assert automaton.find("anything") == []
+
+def test_defaults_stay_with_guild_rules(sqlite):
+    sqlite(ModerationRule)
+
+    async def main():
+        engine = ModerationEngine(bot = None)
+        assert (await engine.get_automaton(1)).find("retard") == ["retard"]
+
+        ModerationRule.create(guild_id = 1, word = "badword", whole_word = False)
+        automaton = await engine.get_automaton(1)
+        assert sorted(automaton.find("retard badword")) == ["badword", "retard"]
+    asyncio.run(main())
+
+def test_throughput():
+    words = [("".join(random.choices("abcdefghij", k = 6)), i % 2 == 0) for i in range(1000)]
+    automaton = WordAutomaton(words)
+    messages = [" ".join("".join(random.choices("abcdefghijklmnop ", k = 8)) for _ in range(12)) for _ in range(5000)]
+
+    start = time.perf_counter()
+    for message in messages:
+        automaton.find(message)
+    elapsed = time.perf_counter() - start
+    print(f"{len(messages) / elapsed:.0f} messages per second against {len(words)} words")
+    assert elapsed < 5